@@ -2,11 +2,14 @@
 """
 EduGuideBot - Main application entry point.
 This script initializes and runs the Telegram bot for educational recommendations.
+
+Run with --startup-profile to print how long each startup phase takes and exit.
 """
+import argparse
 import os
 import logging
-from dotenv import load_dotenv
-from src.bot.app import main as run_bot
+
+from src.bot.startup import StartupProfiler
 
 # Configure logging
 logging.basicConfig(
@@ -19,12 +22,24 @@ def main():
     """
     Main entry point for the EduGuideBot application.
     """
+    parser = argparse.ArgumentParser(description="Run the EduGuideBot Telegram bot.")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="time each startup phase, print a report and exit without polling")
+    args = parser.parse_args()
+    profiler = StartupProfiler(enabled=args.startup_profile)
+
+    # Imported here so the profile can attribute time to them
+    with profiler.phase("import dotenv"):
+        from dotenv import load_dotenv
+    with profiler.phase("import bot (telegram, numpy)"):
+        from src.bot.app import main as run_bot
+
     # Load environment variables
     load_dotenv()
     
     # Check if required environment variables are set
     telegram_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not telegram_token:
+    if not telegram_token and not profiler.enabled:
         logger.error("TELEGRAM_BOT_TOKEN not set in .env file. Bot cannot start.")
         return
     
@@ -35,7 +50,7 @@ def main():
     
     # Run the bot
     logger.info("Starting EduGuideBot...")
-    run_bot()
+    run_bot(profiler)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
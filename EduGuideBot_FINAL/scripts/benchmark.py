@@ -0,0 +1,249 @@
+# scripts/benchmark.py
+"""
+Performance benchmarks for the catalog loader, recommender, result pipeline and admission model.
+
+    python scripts/benchmark.py run --output bench/baseline.json
+    python scripts/benchmark.py run --output bench/current.json --compare-to bench/baseline.json
+    python scripts/benchmark.py compare bench/baseline.json bench/current.json --threshold 0.15
+
+Catalogs are scaled from the real data.json by replicating its universities under new IDs
+(with jittered tuition) until they hold the requested number of programs (majors).
+`compare` exits with status 1 when any benchmark's median slowed down by more than the threshold.
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from src.core.admission_predictor import AdmissionPredictor
+from src.core.compiled_model import load_compiled_model
+from src.core.data_loader import UniversityDataManager
+from src.core.recommender import CAREER_FIELD_MAP, UniversityRecommender
+from src.web.result_generator import ResultGenerator
+
+# --- Configuration ---
+DATA_PATH = os.path.join(PROJECT_ROOT, 'data', 'data.json')
+MODEL_DIR = os.path.join(PROJECT_ROOT, 'src', 'core', 'ml_models')
+DEFAULT_PROGRAMS = [541, 10_000, 100_000]
+DEFAULT_THRESHOLD = 0.10
+SEED = 42
+NUM_PROFILES = 256
+BATCH_SIZE = 1000
+
+
+def count_programs(universities: list) -> int:
+    return sum(len(faculty.get('majors', [])) for uni in universities for faculty in uni.get('faculties', []))
+
+
+def build_scaled_catalog(base: list, target_programs: int, path: str, seed: int = SEED) -> int:
+    """Writes a catalog with at least `target_programs` majors to `path`; returns its university count."""
+    rng = random.Random(seed)
+    universities, programs = [], 0
+    while programs < target_programs:
+        uni = copy.deepcopy(base[len(universities) % len(base)])
+        uni['id'] = len(universities) + 1
+        fees = uni['tuition_fees']
+        spread = fees['range_max'] - fees['range_min']
+        fees['range_min'] = max(0, fees['range_min'] + rng.randint(-300, 300))
+        fees['range_max'] = fees['range_min'] + spread
+        programs += count_programs([uni])
+        universities.append(uni)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(universities, f, ensure_ascii=False)
+    return len(universities)
+
+
+def make_profiles(data_manager: UniversityDataManager, count: int, seed: int = SEED) -> list:
+    """Seeded quiz answers drawn from the catalog's own categories and locations."""
+    rng = random.Random(seed)
+    categories = data_manager.get_categories()
+    locations = ['Any'] + data_manager.get_locations()
+    career_goals = list(CAREER_FIELD_MAP) + ['ផ្សេងៗ']
+    return [{
+        'location': rng.choice(locations),
+        'max_budget': rng.choice([0, 500, 1000, 1500, 2000, 3000, 5000, 8000]),
+        'core_field': rng.choice(categories),
+        'career_goal': rng.choice(career_goals),
+        'english_proficiency': rng.randint(1, 10),
+    } for _ in range(count)]
+
+
+def time_case(func, min_time: float, min_rounds: int = 3, max_rounds: int = 10_000) -> dict:
+    """Calls `func` repeatedly (after one warm-up call) and returns timing statistics in milliseconds."""
+    func()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_rounds and (len(samples) < min_rounds or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        'rounds': len(samples),
+        'min_ms': samples[0],
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def cycle(items: list):
+    """Returns a zero-argument callable that yields the next item on each call, wrapping around."""
+    state = {'i': -1}
+    def next_item():
+        state['i'] = (state['i'] + 1) % len(items)
+        return items[state['i']]
+    return next_item
+
+
+def benchmark_scale(catalog_path: str, workdir: str, min_time: float) -> dict:
+    results = {}
+
+    def record(name: str, func, **options):
+        results[name] = time_case(func, min_time, **options)
+        print(f"  {name:<28} median {results[name]['median_ms']:10.3f} ms  ({results[name]['rounds']} rounds)")
+
+    # Catalog load: straight from JSON, then from the compiled snapshot (written by the first snapshot load)
+    record('catalog_load_json', lambda: UniversityDataManager(catalog_path, use_snapshot=False))
+    UniversityDataManager(catalog_path)
+    record('catalog_load_snapshot', lambda: UniversityDataManager(catalog_path))
+
+    data_manager = UniversityDataManager(catalog_path)
+    recommender = UniversityRecommender(data_manager)
+    profiles = make_profiles(data_manager, NUM_PROFILES)
+    next_profile = cycle(profiles)
+    record('recommender_build', lambda: UniversityRecommender(data_manager))
+    record('recommend_single', lambda: recommender.recommend(next_profile(), top_n=5))
+    batch = make_profiles(data_manager, BATCH_SIZE, seed=SEED + 1)
+    record(f'recommend_batch_{BATCH_SIZE}', lambda: recommender.recommend_many(batch, top_n=5))
+
+    # Result pipeline against a throwaway results directory, full and compact record formats
+    for label, compact in (('full', False), ('compact', True)):
+        generator = ResultGenerator(catalog_path, results_dir=os.path.join(workdir, f'results_{label}'),
+                                    compact_results=compact)
+        result_ids = []
+        record(f'result_write_{label}', lambda: result_ids.append(generator.generate_results(next_profile())))
+        next_id = cycle(result_ids)
+        record(f'result_read_{label}', lambda: generator.get_result_by_id(next_id()))
+        generator.close()
+
+    # Admission chances for every (university, category) pair, compiled model and sklearn
+    compiled = load_compiled_model(os.path.join(MODEL_DIR, 'admission_model.npz'))
+    predictor = AdmissionPredictor(compiled, compiled.columns, data_manager)
+    record('admission_predict_compiled', lambda: predictor.predict_all(3.5, 8, 2))
+    import joblib
+    artifact = joblib.load(os.path.join(MODEL_DIR, 'admission_model.pkl'))
+    predictor = AdmissionPredictor(artifact['model'], artifact['columns'], data_manager)
+    record('admission_predict_sklearn', lambda: predictor.predict_all(3.5, 8, 2))
+    return results
+
+
+def environment_info() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run(args) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    with open(DATA_PATH, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    report = {'meta': environment_info(), 'benchmarks': {}}
+    with tempfile.TemporaryDirectory(prefix='eduguide_bench_') as workdir:
+        for programs in args.programs:
+            catalog_path = os.path.join(workdir, f'catalog_{programs}.json')
+            universities = build_scaled_catalog(base, programs, catalog_path)
+            print(f"--- {programs} programs ({universities} universities) ---")
+            for name, stats in benchmark_scale(catalog_path, os.path.join(workdir, str(programs)), args.min_time).items():
+                report['benchmarks'][f'{name}[{programs}]'] = stats
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results saved to: {args.output}")
+    if args.compare_to:
+        with open(args.compare_to, 'r', encoding='utf-8') as f:
+            return compare_reports(json.load(f), report, args.threshold)
+    return 0
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float) -> int:
+    """Prints median-to-median ratios; returns 1 if any benchmark slowed down by more than `threshold`."""
+    regressions = 0
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, stats in current['benchmarks'].items():
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            print(f"{name:<40} {'-':>12} {stats['median_ms']:>10.3f}ms {'new':>7}")
+            continue
+        ratio = stats['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  ❌ REGRESSION'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  ✅ faster'
+        print(f"{name:<40} {before['median_ms']:>10.3f}ms {stats['median_ms']:>10.3f}ms {ratio:>6.2f}x{flag}")
+    for name in baseline['benchmarks'].keys() - current['benchmarks'].keys():
+        print(f"{name:<40} missing from the current run")
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def compare(args) -> int:
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+    return compare_reports(baseline, current, args.threshold)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the catalog loader, recommender, result pipeline and admission model.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('--programs', type=int, nargs='+', default=DEFAULT_PROGRAMS,
+                            help="catalog sizes to benchmark, in programs (the real catalog has 541)")
+    run_parser.add_argument('--min-time', type=float, default=0.5, help="seconds to spend on each benchmark")
+    run_parser.add_argument('--output', help="write results to this JSON file")
+    run_parser.add_argument('--compare-to', help="baseline JSON to compare the new results against")
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="allowed slowdown before a benchmark counts as a regression (0.10 = 10%%)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="allowed slowdown before a benchmark counts as a regression (0.10 = 10%%)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
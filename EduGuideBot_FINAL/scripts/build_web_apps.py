@@ -1,38 +1,227 @@
 # scripts/build_web_apps.py
+import glob
+import gzip
+import hashlib
 import json
 import os
 import shutil
 
-def inject_data_into_template(data: list, template_path: str, output_path: str):
-    """A reusable function to inject JSON data into an HTML template."""
+try:
+    import brotli
+except ImportError:  # optional: without it only the .gz sibling is written
+    brotli = None
+
+# --- Per-app projections ---
+# Each mini-app gets only the fields it renders. A projection mirrors the record's shape:
+# VALUE keeps a value as is, INTERN replaces a string with its index in a shared string table
+# (for names that repeat across universities), a dict keeps the listed keys, and a one-item
+# list applies its item's projection to every element.
+VALUE = 'v'
+INTERN = 's'
+
+PROJECTIONS = {
+    'browser': {
+        'id': VALUE, 'name_km': VALUE, 'name_en': VALUE, 'location': INTERN, 'type': INTERN,
+        'established_year': VALUE, 'total_majors': VALUE,
+        'tuition_fees': {'range_min': VALUE, 'range_max': VALUE},
+        'contact': {'phones': [VALUE], 'email': VALUE, 'website': VALUE},
+        'admission_requirements_km': [INTERN],
+        'faculties': [{'name_km': INTERN, 'majors': [{'name_km': INTERN, 'category_km': INTERN}]}],
+    },
+    'calculator': {
+        'id': VALUE, 'name_km': VALUE, 'name_en': VALUE,
+        'tuition_fees': {'range_min': VALUE, 'range_max': VALUE},
+        'faculties': [{'name_km': INTERN, 'majors': [{'name_km': INTERN}]}],
+    },
+    # Not a mini-app: static/templates/results.html joins compact results against this one
+    'results': {
+        'id': VALUE, 'name_km': VALUE, 'name_en': VALUE, 'location': INTERN, 'type': INTERN,
+        'established_year': VALUE, 'total_majors': VALUE,
+        'tuition_fees': {'range_min': VALUE, 'range_max': VALUE},
+    },
+}
+# Bumped when the compact layout changes; js/catalog.js refuses versions it does not know
+COMPACT_CATALOG_FORMAT = 1
+
+def projection_schema(projection):
+    """The projection in the JSON form js/catalog.js decodes with: 'v', 's', {"obj": [[key, node], ...]} or {"list": node}."""
+    if isinstance(projection, dict):
+        return {'obj': [[key, projection_schema(node)] for key, node in projection.items()]}
+    if isinstance(projection, list):
+        return {'list': projection_schema(projection[0])}
+    return projection
+
+def collect_strings(value, projection, counts: dict):
+    if value is None:
+        return
+    if isinstance(projection, dict):
+        for key, node in projection.items():
+            collect_strings(value.get(key), node, counts)
+    elif isinstance(projection, list):
+        for item in value:
+            collect_strings(item, projection[0], counts)
+    elif projection == INTERN:
+        counts[value] = counts.get(value, 0) + 1
+
+def encode_value(value, projection, string_index: dict):
+    """Objects become positional arrays in projection key order; missing values become null."""
+    if value is None:
+        return None
+    if isinstance(projection, dict):
+        return [encode_value(value.get(key), node, string_index) for key, node in projection.items()]
+    if isinstance(projection, list):
+        return [encode_value(item, projection[0], string_index) for item in value]
+    if projection == INTERN:
+        return string_index[value]
+    return value
+
+def project_catalog(universities: list, projection: dict, catalog_version: str) -> dict:
+    """Compact catalog for one app: {"format", "catalog_version", "schema", "strings", "rows"}.
+
+    catalog_version is the data.json hash the bot stamps on compact results, so a page can tell
+    whether a result was scored against the catalog it loaded.
+    """
+    counts = {}
+    for uni in universities:
+        collect_strings(uni, projection, counts)
+    # Most frequent first, so the common strings get the shortest indices
+    strings = sorted(counts, key=lambda string: -counts[string])
+    string_index = {string: i for i, string in enumerate(strings)}
+    return {
+        'format': COMPACT_CATALOG_FORMAT,
+        'catalog_version': catalog_version,
+        'schema': projection_schema(projection),
+        'strings': strings,
+        'rows': [encode_value(uni, projection, string_index) for uni in universities],
+    }
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+def write_bytes(path: str, data: bytes):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def write_compressed_siblings(path: str, data: bytes) -> dict:
+    """Writes precompressed .gz (and .br when brotli is installed) next to an asset; returns their sizes."""
+    sizes = {}
+    # mtime=0 keeps the .gz byte-identical across builds of the same data
+    gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+    write_bytes(path + '.gz', gz_data)
+    sizes['gz'] = len(gz_data)
+    if brotli is not None:
+        br_data = brotli.compress(data, quality=11)
+        write_bytes(path + '.br', br_data)
+        sizes['br'] = len(br_data)
+    return sizes
+
+def write_catalog_asset(data, assets_dir: str, name: str) -> tuple:
+    """Writes data once as assets/<name>.<hash>.json (+ .gz/.br); returns (file name, hash, sizes)."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = content_hash(payload)
+    file_name = f"{name}.{digest}.json"
+    path = os.path.join(assets_dir, file_name)
+    sizes = {'json': len(payload)}
+    if os.path.exists(path) and os.path.exists(path + '.gz'):
+        sizes['gz'] = os.path.getsize(path + '.gz')
+        if os.path.exists(path + '.br'):
+            sizes['br'] = os.path.getsize(path + '.br')
+    else:
+        write_bytes(path, payload)
+        sizes.update(write_compressed_siblings(path, payload))
+    return file_name, digest, sizes
+
+def remove_stale_catalogs(assets_dir: str, keep: list):
+    """Deletes catalog assets (and their compressed siblings) that are not in `keep`."""
+    for path in glob.glob(os.path.join(assets_dir, 'catalog.*.json*')):
+        name = os.path.basename(path)
+        if not any(name == kept or name.startswith(kept + '.') for kept in keep):
+            os.remove(path)
+
+def inject_catalog_into_template(catalog_url, template_path: str, output_path: str):
+    """Points a template at its catalog asset (content-hashed, so it can be cached forever) instead of inlining the data."""
     try:
         with open(template_path, 'r', encoding='utf-8') as f:
             template_content = f.read()
-        
-        json_string = json.dumps(data, ensure_ascii=False)
-        # This creates a JavaScript variable `universityData` inside the HTML
-        data_injection_script = f"const universityData = {json_string};"
-        
-        final_html = template_content.replace('// %%UNIVERSITY_DATA%%', data_injection_script)
+
+        # Starts the download in <head>, before app.js asks for it
+        preload = f'<link rel="preload" href="{catalog_url}" as="fetch" crossorigin="anonymous">' if catalog_url else ''
+        # This sets the URL js/catalog.js loads the university data from
+        catalog_script = f"window.CATALOG_URL = {json.dumps(catalog_url)};" if catalog_url else ''
+
+        final_html = template_content.replace('<!-- %%CATALOG_PRELOAD%% -->', preload)
+        final_html = final_html.replace('// %%UNIVERSITY_DATA%%', catalog_script)
 
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(final_html)
         print(f"✅ Successfully built: {os.path.basename(output_path)}")
+        return True
 
     except Exception as e:
         print(f"❌ ERROR building {os.path.basename(output_path)}: {e}")
+        return False
+
+def rotate_previous(manifest: dict, current: dict) -> list:
+    """Asset file names to keep from earlier builds, for pages still cached with an older URL.
+
+    A projection whose file name changed keeps the one it replaced; one that did not change
+    carries its previous generation forward, so rebuilding unchanged data deletes nothing.
+    """
+    old_assets = manifest.get('assets', {})
+    old_previous = manifest.get('previous', [])
+    previous = []
+    for projection, file_name in current.items():
+        old_name = old_assets.get(projection)
+        if old_name is None:
+            continue
+        if old_name != file_name:
+            previous.append(old_name)
+        else:
+            prefix = f"catalog.{projection}."
+            previous.extend(name for name in old_previous if name.startswith(prefix) and name != file_name)
+    return previous
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
-def main():
+def print_size_report(assets: dict, full_size: int, apps: list):
+    print("\n--- Size Report ---")
+    print(f"{'file':<40}{'raw':>10}{'gzip':>10}{'brotli':>10}{'vs full':>10}")
+    def kb(size):
+        return f"{size / 1024:.1f} KB" if size is not None else '-'
+    for file_name, sizes in assets.values():
+        share = f"{100 * sizes['json'] / full_size:.0f}%"
+        print(f"{'assets/' + file_name:<40}{kb(sizes['json']):>10}{kb(sizes.get('gz')):>10}"
+              f"{kb(sizes.get('br')):>10}{share:>10}")
+    for app in apps:
+        if os.path.exists(app['output']):
+            with open(app['output'], 'rb') as f:
+                html = f.read()
+            label = os.path.relpath(app['output'], os.path.dirname(os.path.dirname(app['output'])))
+            print(f"{label:<40}{kb(len(html)):>10}{kb(len(gzip.compress(html, mtime=0))):>10}")
+    print(f"\nFull catalog: {kb(full_size)}, previously inlined into each of the {len(apps)} pages")
+
+def main(project_root: str | None = None):
     """Builds all data-driven Web Apps for the project."""
     print("--- Starting Web App Build Process ---")
-    
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    project_root = project_root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     data_path = os.path.join(project_root, 'data', 'data.json')
+    static_dir = os.path.join(project_root, 'static')
+    assets_dir = os.path.join(static_dir, 'assets')
+    manifest_path = os.path.join(assets_dir, 'manifest.json')
 
     # Load master data once
     try:
-        with open(data_path, 'r', encoding='utf-8') as f:
-            universities = json.load(f)
+        with open(data_path, 'rb') as f:
+            raw = f.read()
+        universities = json.loads(raw)
+        # Same hash as UniversityDataManager.version
+        catalog_version = hashlib.sha256(raw).hexdigest()[:16]
         print(f"Loaded {len(universities)} universities from data.json.")
     except Exception as e:
         print(f"❌ CRITICAL ERROR: Could not read master data file at {data_path}. Error: {e}")
@@ -41,21 +230,53 @@ def main():
     # --- Define Web Apps to Build ---
     # We must ensure the template files exist first.
     # We assume the AI has created them. If not, this script will fail gracefully.
-    
+    # "projection" names the slice of the catalog an app loads (None: the app needs no catalog).
+
     apps_to_build = [
-        {"name": "University Catalog", "template": os.path.join(project_root, 'static', 'browser', 'index.template.html'), "output": os.path.join(project_root, 'static', 'browser', 'index.html')},
-        {"name": "Cost Calculator", "template": os.path.join(project_root, 'static', 'calculator', 'index.template.html'), "output": os.path.join(project_root, 'static', 'calculator', 'index.html')},
-        {"name": "Student DNA Quiz", "template": os.path.join(project_root, 'static', 'quiz', 'index.template.html'), "output": os.path.join(project_root, 'static', 'quiz', 'index.html')}
+        {"name": "University Catalog", "key": "browser", "projection": "browser", "template": os.path.join(project_root, 'static', 'browser', 'index.template.html'), "output": os.path.join(project_root, 'static', 'browser', 'index.html')},
+        {"name": "Cost Calculator", "key": "calculator", "projection": "calculator", "template": os.path.join(project_root, 'static', 'calculator', 'index.template.html'), "output": os.path.join(project_root, 'static', 'calculator', 'index.html')},
+        {"name": "Student DNA Quiz", "key": "quiz", "projection": None, "template": os.path.join(project_root, 'static', 'quiz', 'index.template.html'), "output": os.path.join(project_root, 'static', 'quiz', 'index.html')}
     ]
 
+    # --- Content-hashed catalog assets, one per projection ---
+    os.makedirs(assets_dir, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+    assets = {}
+    # The results page is not built from a template but loads the 'results' asset through the manifest
+    for projection in sorted({app['projection'] for app in apps_to_build if app['projection']} | {'results'}):
+        compact = project_catalog(universities, PROJECTIONS[projection], catalog_version)
+        file_name, _, sizes = write_catalog_asset(compact, assets_dir, f"catalog.{projection}")
+        assets[projection] = (file_name, sizes)
+        print(f"Catalog asset: assets/{file_name}")
+
+    built_apps = dict(manifest.get('apps', {}))
     for app in apps_to_build:
-        if os.path.exists(app['template']):
-            print(f"\nBuilding {app['name']}...")
-            inject_data_into_template(universities, app['template'], app['output'])
-        else:
+        if not os.path.exists(app['template']):
             print(f"\n⚠️ WARNING: Template file not found, skipping build for {app['name']}: {app['template']}")
-    
+            continue
+        with open(app['template'], 'rb') as f:
+            template_hash = content_hash(f.read())
+        asset_name = assets[app['projection']][0] if app['projection'] else None
+        state = {'template_hash': template_hash, 'catalog': asset_name}
+        if built_apps.get(app['key']) == state and os.path.exists(app['output']):
+            print(f"\n⏭️ {app['name']} is up to date, skipping.")
+            continue
+        print(f"\nBuilding {app['name']}...")
+        catalog_url = f"../assets/{asset_name}" if asset_name else None
+        if inject_catalog_into_template(catalog_url, app['template'], app['output']):
+            built_apps[app['key']] = state
+
+    # Keep the previous generation's assets too, for pages still cached with an older URL
+    current = {projection: file_name for projection, (file_name, _) in assets.items()}
+    previous = rotate_previous(manifest, current)
+    manifest = {'assets': current, 'previous': previous, 'apps': built_apps}
+    remove_stale_catalogs(assets_dir, list(current.values()) + previous)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    full_size = len(json.dumps(universities, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    print_size_report(assets, full_size, apps_to_build)
     print("\n--- Build Process Finished ---")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
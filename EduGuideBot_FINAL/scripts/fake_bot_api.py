@@ -0,0 +1,533 @@
+# scripts/fake_bot_api.py
+"""
+A local stand-in for the Telegram Bot API for load testing the bot offline, in either serving mode.
+
+    python scripts/fake_bot_api.py --mode polling --users 1000
+    python scripts/fake_bot_api.py --mode webhook --users 1000 --concurrency 100 --output bench/webhook.json
+    python scripts/fake_bot_api.py --scenario menu --mode webhook
+    python scripts/fake_bot_api.py --edit-mode separate --api-rate-limit 30 --bot-rate-limit 25
+    python scripts/fake_bot_api.py --compare-edit-modes --users 50
+
+It starts an HTTP server speaking the Bot API subset the bot uses (getMe, getUpdates, setWebhook,
+sendMessage, editMessageText, answerCallbackQuery...), then launches the bot against it with
+TELEGRAM_API_URL set. Synthetic users play a scenario step by step. Each update is queued for
+getUpdates (polling) or POSTed to the bot's webhook with the secret token (webhook). A step
+counts as done once the bot has sent the expected number of visible replies to that user's chat.
+The report gives end-to-end step latency and the Bot API calls made per completed scenario.
+
+Every run checks the conversation calls (visible replies plus answerCallbackQuery) per completed
+flow against what the scenario expects, and exits with status 1 if the bot made more.
+--compare-edit-modes plays the scenario with 'separate' and then 'combined' edits and fails
+unless the combined layout needs fewer calls per flow.
+
+--api-rate-limit makes the fake API answer 429 with retry_after, as Telegram does, once the bot
+sends more visible calls per second than allowed; the bot's limiter is expected to absorb them.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.parse
+from collections import Counter, deque
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from src.core.career_data import CAREER_PATHS
+
+# --- Configuration ---
+HOST = '127.0.0.1'
+API_PORT = 8081
+WEBHOOK_PORT = 8444
+TOKEN = '123456:FAKE-TOKEN'
+WEBHOOK_SECRET = 'fake-bot-api-secret'
+BOT_USER = {'id': 123456, 'is_bot': True, 'first_name': 'EduGuideBot', 'username': 'EduGuideBot'}
+FIRST_USER_ID = 10_000_000
+STARTUP_TIMEOUT = 60.0
+STEP_TIMEOUT = 10.0
+# Calls that change what the user sees; steps complete on these
+VISIBLE_METHODS = {'sendMessage', 'editMessageText', 'editMessageReplyMarkup'}
+# Calls a conversation step makes: its visible replies, plus one answer per button tap
+CONVERSATION_METHODS = VISIBLE_METHODS | {'answerCallbackQuery'}
+
+# --- Scenarios ---
+# Steps are (kind, payload, replies): kind is 'command', 'text' or 'callback' (a tap on the
+# keyboard of the last message the bot sent), and replies is how many visible calls the bot
+# makes to the chat in response, or a dict of those counts per ONBOARDING_EDIT_MODE.
+SCENARIOS = {
+    # The onboarding flow of src/bot/bot.py, ending with a saved result
+    'onboarding': {
+        'command': [sys.executable, '-m', 'src.bot.bot'],
+        'steps': [
+            ('command', '/start', {'combined': 1, 'separate': 2}),
+            ('callback', 'Phnom Penh', {'combined': 1, 'separate': 2}),
+            ('text', '1500', 1),
+            ('callback', 'បច្ចេកវិទ្យា', {'combined': 1, 'separate': 2}),
+            ('callback', 'វិស្វករ', {'combined': 1, 'separate': 2}),
+            ('callback', '8', {'combined': 1, 'separate': 2}),
+            ('callback', 'confirm_yes', {'combined': 1, 'separate': 2}),
+        ],
+    },
+    # The main menu and career planner of src/bot/app.py
+    'menu': {
+        'command': [sys.executable, 'app.py'],
+        'steps': [
+            ('command', '/start', 2),
+            ('callback', 'career_start', 1),
+            ('callback', f"career_show:{next(iter(CAREER_PATHS))}", 1),
+            ('callback', 'back_to_main', 1),
+        ],
+    },
+}
+
+
+def expected_calls_per_flow(steps: list) -> int:
+    """Conversation calls one user's flow should cost: every visible reply plus an answer per callback."""
+    return sum(replies for _, _, replies in steps) + sum(1 for kind, _, _ in steps if kind == 'callback')
+
+
+def decode_param(value: str):
+    # PTB form-encodes parameters with non-string values JSON-encoded
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class WebhookClient:
+    """Keep-alive HTTP/1.1 client that POSTs updates to the bot's webhook, as Telegram would."""
+
+    def __init__(self, url: str, secret_token: str | None, max_connections: int = 64):
+        parts = urllib.parse.urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.path = parts.path or '/'
+        self.secret_token = secret_token
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def post(self, update: dict) -> int:
+        body = json.dumps(update, ensure_ascii=False).encode('utf-8')
+        headers = (f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                   f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n")
+        if self.secret_token:
+            headers += f"X-Telegram-Bot-Api-Secret-Token: {self.secret_token}\r\n"
+        request = (headers + "\r\n").encode('latin-1') + body
+        async with self._slots:
+            # An idle connection may have been closed by the server; retry once on a fresh one
+            for attempt in range(2):
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await asyncio.open_connection(self.host, self.port)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status, keep_alive = await self._read_response(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return status
+
+    @staticmethod
+    async def _read_response(reader) -> tuple:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("webhook closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        await reader.readexactly(int(headers.get('content-length', 0)))
+        return status, headers.get('connection', '').lower() != 'close'
+
+    def close(self) -> None:
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+class FakeBotAPI:
+    """The Bot API side: answers the bot's calls and delivers synthetic user updates to it."""
+
+    def __init__(self, token: str = TOKEN, rate_limit: float = 0):
+        self.token = token
+        self.rate_limit = rate_limit
+        self.calls = Counter()
+        self.rejected = Counter()
+        self._recent_visible = deque()
+        self.ready = asyncio.Event()
+        self.webhook = None
+        self._pending = deque()
+        self._update_available = asyncio.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._last_message = {}
+        # chat id -> [visible replies still expected, future resolved when they have all arrived]
+        self._waiters = {}
+
+    # --- HTTP server ---
+
+    async def handle_connection(self, reader, writer) -> None:
+        try:
+            while request_line := await reader.readline():
+                target = request_line.decode('latin-1').split(' ')[1]
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self.handle_request(target, headers, body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+                             .encode('latin-1') + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled: a long poll still open when the replay ends
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, target: str, headers: dict, body: bytes) -> tuple:
+        url = urllib.parse.urlsplit(target)
+        prefix, _, method = url.path.lstrip('/').partition('/')
+        if prefix != f"bot{self.token}":
+            return 401, {'ok': False, 'error_code': 401, 'description': 'Unauthorized'}
+        params = {name: decode_param(value) for name, value in urllib.parse.parse_qsl(url.query)}
+        if headers.get('content-type', '').startswith('application/json') and body:
+            params.update(json.loads(body))
+        elif body:
+            params.update({name: decode_param(value)
+                           for name, value in urllib.parse.parse_qsl(body.decode('utf-8'), keep_blank_values=True)})
+        if method in VISIBLE_METHODS and self._over_rate_limit():
+            self.rejected[method] += 1
+            return 429, {'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 1',
+                         'parameters': {'retry_after': 1}}
+        self.calls[method] += 1
+        return 200, {'ok': True, 'result': await self.call(method, params)}
+
+    def _over_rate_limit(self) -> bool:
+        # Sliding one-second window over accepted visible calls
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._recent_visible and self._recent_visible[0] <= now - 1:
+            self._recent_visible.popleft()
+        if len(self._recent_visible) >= self.rate_limit:
+            return True
+        self._recent_visible.append(now)
+        return False
+
+    # --- Bot API methods ---
+
+    async def call(self, method: str, params: dict):
+        if method == 'getMe':
+            return BOT_USER
+        if method == 'getUpdates':
+            return await self.get_updates(params)
+        if method == 'setWebhook':
+            self.webhook = WebhookClient(params['url'], params.get('secret_token'))
+            self.ready.set()
+            return True
+        if method == 'deleteWebhook':
+            self.webhook = None
+            return True
+        if method == 'getWebhookInfo':
+            return {'url': '', 'has_custom_certificate': False, 'pending_update_count': len(self._pending)}
+        if method in VISIBLE_METHODS:
+            chat_id = int(params['chat_id'])
+            message_id = int(params['message_id']) if 'message_id' in params else None
+            message = self._bot_message(chat_id, params.get('text', ''), params.get('reply_markup'), message_id)
+            self._visible_reply(chat_id)
+            return message
+        # answerCallbackQuery, setMyCommands, ...
+        return True
+
+    async def get_updates(self, params: dict) -> list:
+        self.ready.set()
+        # Updates below the offset were confirmed by the bot
+        offset = params.get('offset') or 0
+        while self._pending and self._pending[0]['update_id'] < offset:
+            self._pending.popleft()
+        if not self._pending:
+            self._update_available.clear()
+            try:
+                await asyncio.wait_for(self._update_available.wait(), timeout=params.get('timeout') or 0)
+            except asyncio.TimeoutError:
+                return []
+        return list(self._pending)[:params.get('limit') or 100]
+
+    def _bot_message(self, chat_id: int, text: str, reply_markup, message_id: int | None = None) -> dict:
+        if message_id is None:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+        message = {'message_id': message_id, 'date': int(time.time()), 'from': BOT_USER,
+                   'chat': {'id': chat_id, 'type': 'private'}, 'text': text}
+        if isinstance(reply_markup, str):
+            reply_markup = json.loads(reply_markup)
+        # Messages only carry inline keyboards; reply keyboards and removals are not echoed back
+        if reply_markup and 'inline_keyboard' in reply_markup:
+            message['reply_markup'] = reply_markup
+        self._last_message[chat_id] = message
+        return message
+
+    def _visible_reply(self, chat_id: int) -> None:
+        waiter = self._waiters.get(chat_id)
+        if waiter is None:
+            return
+        waiter[0] -= 1
+        if waiter[0] == 0 and not waiter[1].done():
+            waiter[1].set_result(time.perf_counter())
+
+    # --- Synthetic users ---
+
+    def make_update(self, user_id: int, kind: str, payload: str) -> dict:
+        user = {'id': user_id, 'is_bot': False, 'first_name': f"User{user_id}"}
+        update = {'update_id': self._next_update_id}
+        self._next_update_id += 1
+        if kind == 'callback':
+            message = self._last_message.get(user_id) or self._bot_message(user_id, '', None)
+            update['callback_query'] = {'id': str(update['update_id']), 'from': user, 'chat_instance': str(user_id),
+                                        'message': message, 'data': payload}
+            return update
+        message = {'message_id': self._next_message_id, 'date': int(time.time()), 'from': user,
+                   'chat': {'id': user_id, 'type': 'private', 'first_name': user['first_name']}, 'text': payload}
+        self._next_message_id += 1
+        if kind == 'command':
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(payload.split()[0])}]
+        update['message'] = message
+        return update
+
+    async def deliver(self, update: dict) -> None:
+        if self.webhook is not None:
+            status = await self.webhook.post(update)
+            if status != 200:
+                raise RuntimeError(f"webhook answered HTTP {status}")
+        else:
+            self._pending.append(update)
+            self._update_available.set()
+
+    async def play_step(self, user_id: int, kind: str, payload: str, replies: int) -> float:
+        """Sends one update and waits for the bot's replies; returns the step latency in seconds."""
+        done = asyncio.get_running_loop().create_future()
+        self._waiters[user_id] = [replies, done]
+        try:
+            started = time.perf_counter()
+            await self.deliver(self.make_update(user_id, kind, payload))
+            return await asyncio.wait_for(done, STEP_TIMEOUT) - started
+        finally:
+            del self._waiters[user_id]
+
+
+async def wait_for_port(host: str, port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def replay(scenario_name: str, mode: str, num_users: int, concurrency: int,
+                 api_port: int = API_PORT, webhook_port: int = WEBHOOK_PORT, bot_log: str | None = None,
+                 edit_mode: str = 'combined', api_rate_limit: float = 0, bot_rate_limit: float = 0,
+                 bot_chat_rate_limit: float = 0) -> dict:
+    """Runs the bot against the fake API and plays the scenario for num_users users; returns the report."""
+    scenario = SCENARIOS[scenario_name]
+    steps = [(kind, payload, replies[edit_mode] if isinstance(replies, dict) else replies)
+             for kind, payload, replies in scenario['steps']]
+    api = FakeBotAPI(rate_limit=api_rate_limit)
+    server = await asyncio.start_server(api.handle_connection, HOST, api_port)
+    results_dir = tempfile.mkdtemp(prefix='fake_bot_api_')
+    env = dict(
+        os.environ,
+        TELEGRAM_BOT_TOKEN=TOKEN,
+        TELEGRAM_API_URL=f"http://{HOST}:{api_port}",
+        BOT_MODE=mode,
+        WEBHOOK_LISTEN=HOST,
+        WEBHOOK_PORT=str(webhook_port),
+        WEBHOOK_URL=f"http://{HOST}:{webhook_port}",
+        WEBHOOK_SECRET=WEBHOOK_SECRET,
+        GITHUB_PAGES_URL=os.environ.get('GITHUB_PAGES_URL', 'https://example.com'),
+        RESULTS_DIR=results_dir,
+        CONVERSATION_STORE=f"sqlite:{os.path.join(results_dir, 'conversations.db')}",
+        CATALOG_RELOAD_INTERVAL='0',
+        EXECUTION_STATS_INTERVAL='0',
+        ONBOARDING_EDIT_MODE=edit_mode,
+        BOT_RATE_LIMIT=str(bot_rate_limit),
+        BOT_CHAT_RATE_LIMIT=str(bot_chat_rate_limit),
+    )
+    log_file = open(bot_log, 'ab') if bot_log else open(os.devnull, 'wb')
+    bot = await asyncio.create_subprocess_exec(*scenario['command'], cwd=PROJECT_ROOT, env=env,
+                                               stdout=log_file, stderr=log_file)
+    try:
+        ready = asyncio.ensure_future(api.ready.wait())
+        exited = asyncio.ensure_future(bot.wait())
+        await asyncio.wait([ready, exited], timeout=STARTUP_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+        exited.cancel()
+        if not ready.done():
+            ready.cancel()
+            raise RuntimeError(f"the bot did not start (exit code {bot.returncode}); see --bot-log")
+        if mode == 'webhook':
+            await wait_for_port(HOST, webhook_port, STARTUP_TIMEOUT)
+        baseline_calls = Counter(api.calls)
+
+        latencies, failures = [], Counter()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def play_user(user_id: int) -> None:
+            async with slots:
+                for kind, payload, replies in steps:
+                    try:
+                        latencies.append(await api.play_step(user_id, kind, payload, replies))
+                    except asyncio.TimeoutError:
+                        failures['timeout'] += 1
+                        return
+                    except (OSError, RuntimeError) as e:
+                        failures[type(e).__name__] += 1
+                        return
+
+        started = time.perf_counter()
+        await asyncio.gather(*(play_user(FIRST_USER_ID + i) for i in range(num_users)))
+        elapsed = time.perf_counter() - started
+    finally:
+        if bot.returncode is None:
+            bot.terminate()
+            await bot.wait()
+        log_file.close()
+        if api.webhook is not None:
+            api.webhook.close()
+        server.close()
+
+    calls = api.calls - baseline_calls
+    completed = num_users - sum(failures.values())
+    conversation_calls = sum(count for method, count in calls.items() if method in CONVERSATION_METHODS)
+    latencies.sort()
+    return {
+        'scenario': scenario_name,
+        'mode': mode,
+        'edit_mode': edit_mode,
+        'api_rate_limit': api_rate_limit,
+        'bot_rate_limit': bot_rate_limit,
+        'bot_chat_rate_limit': bot_chat_rate_limit,
+        'users': num_users,
+        'concurrency': concurrency,
+        'completed': completed,
+        'failures': dict(failures),
+        'steps': len(latencies),
+        'seconds': elapsed,
+        'steps_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': {name: percentile(latencies, q) * 1000
+                       for name, q in [('p50', 0.50), ('p95', 0.95), ('p99', 0.99), ('max', 1.0)]},
+        'api_calls': dict(calls.most_common()),
+        'api_calls_per_completed': sum(calls.values()) / completed if completed else float('nan'),
+        'conversation_calls_per_completed': conversation_calls / completed if completed else float('nan'),
+        'expected_conversation_calls': expected_calls_per_flow(steps),
+        'rate_limited': dict(api.rejected),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n--- Replay Report ({report['scenario']}, {report['mode']}, {report['edit_mode']} edits) ---")
+    print(f"Users: {report['completed']}/{report['users']} completed, concurrency {report['concurrency']}")
+    if report['failures']:
+        print(f"⚠️ Failures: {report['failures']}")
+    print(f"Steps: {report['steps']} in {report['seconds']:.2f}s ({report['steps_per_second']:.0f} steps/s)")
+    latency = report['latency_ms']
+    print(f"Step latency: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, "
+          f"p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms")
+    completed = report['completed'] or float('nan')
+    print(f"\n{'Bot API method':<26}{'calls':>10}{'per flow':>10}")
+    for method, count in report['api_calls'].items():
+        print(f"{method:<26}{count:>10}{count / completed:>10.2f}")
+    print(f"{'total':<26}{sum(report['api_calls'].values()):>10}{report['api_calls_per_completed']:>10.2f}")
+    print(f"Conversation calls per flow: {report['conversation_calls_per_completed']:.2f} "
+          f"(expected {report['expected_conversation_calls']})")
+    if report['rate_limited']:
+        print(f"\n⚠️ Answered 429 (retried by the bot): {report['rate_limited']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic users against the bot through a fake Bot API.")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='onboarding')
+    parser.add_argument('--mode', choices=['polling', 'webhook'], default='polling')
+    parser.add_argument('--users', type=int, default=200, help="synthetic users, each playing the whole scenario")
+    parser.add_argument('--concurrency', type=int, default=50, help="users active at the same time")
+    parser.add_argument('--api-port', type=int, default=API_PORT)
+    parser.add_argument('--webhook-port', type=int, default=WEBHOOK_PORT)
+    parser.add_argument('--edit-mode', choices=['combined', 'separate'], default='combined',
+                        help="ONBOARDING_EDIT_MODE for the bot")
+    parser.add_argument('--api-rate-limit', type=float, default=0,
+                        help="visible calls per second the fake API accepts before answering 429 (0: unlimited)")
+    parser.add_argument('--bot-rate-limit', type=float, default=0,
+                        help="BOT_RATE_LIMIT for the bot (0: no overall limit, so load tests are not throttled)")
+    parser.add_argument('--bot-chat-rate-limit', type=float, default=0,
+                        help="BOT_CHAT_RATE_LIMIT for the bot (0: synthetic users may tap faster than 1/s)")
+    parser.add_argument('--compare-edit-modes', action='store_true',
+                        help="play 'separate' and then 'combined' edits and require fewer calls per flow with 'combined'")
+    parser.add_argument('--bot-log', help="append the bot's output to this file")
+    parser.add_argument('--output', help="also write the report as JSON")
+    args = parser.parse_args()
+
+    edit_modes = ['separate', 'combined'] if args.compare_edit_modes else [args.edit_mode]
+    if args.compare_edit_modes and not any(isinstance(replies, dict) for _, _, replies in SCENARIOS[args.scenario]['steps']):
+        print(f"❌ ERROR: the '{args.scenario}' scenario does not depend on the edit mode")
+        sys.exit(1)
+
+    reports = {}
+    for edit_mode in edit_modes:
+        print(f"--- Replaying '{args.scenario}' for {args.users} users in {args.mode} mode ({edit_mode} edits) ---")
+        try:
+            reports[edit_mode] = asyncio.run(replay(args.scenario, args.mode, args.users, args.concurrency,
+                                                    args.api_port, args.webhook_port, args.bot_log, edit_mode,
+                                                    args.api_rate_limit, args.bot_rate_limit, args.bot_chat_rate_limit))
+        except (OSError, RuntimeError) as e:
+            print(f"❌ ERROR: {e}")
+            sys.exit(1)
+        print_report(reports[edit_mode])
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports if args.compare_edit_modes else reports[args.edit_mode], f, indent=2, ensure_ascii=False)
+        print(f"\n✅ Report saved to: {args.output}")
+
+    failed = False
+    for edit_mode, report in reports.items():
+        if not report['completed']:
+            print(f"❌ No user completed the scenario with {edit_mode} edits")
+            failed = True
+        elif report['conversation_calls_per_completed'] > report['expected_conversation_calls']:
+            print(f"❌ {edit_mode} edits: {report['conversation_calls_per_completed']:.2f} conversation calls per flow, "
+                  f"expected at most {report['expected_conversation_calls']}")
+            failed = True
+    if args.compare_edit_modes and not failed:
+        before = reports['separate']['conversation_calls_per_completed']
+        after = reports['combined']['conversation_calls_per_completed']
+        print(f"\n📉 Conversation calls per flow: {before:.2f} separate -> {after:.2f} combined "
+              f"({(after - before) / before:+.0%})")
+        if after >= before:
+            print("❌ Combined edits did not reduce the calls per flow")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# scripts/generate_synthetic_catalog.py
+"""
+Generates a synthetic university catalog with the same schema as data/data.json, for load testing.
+
+    python scripts/generate_synthetic_catalog.py --universities 100000 --output data/synthetic_catalog.json
+    python scripts/generate_synthetic_catalog.py --universities 5000 --category-skew 1.2 --size-skew 1.0 --seed 7
+
+Major and faculty names are drawn from the real catalog, so every category_km the bot knows appears.
+Records are written one at a time, so memory use does not grow with the catalog size.
+The same seed and options always produce the same file.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import tempfile
+from collections import Counter
+
+# --- Configuration ---
+TEMPLATE_PATH = 'data/data.json'
+OUTPUT_PATH = 'data/synthetic_catalog.json'
+# Locations beyond the real catalog's three, used when --locations asks for more
+PROVINCES = [
+    "Phnom Penh", "Siem Reap", "Battambang", "Kampong Cham", "Kampot", "Takeo", "Kandal",
+    "Prey Veng", "Svay Rieng", "Kampong Speu", "Kampong Thom", "Kampong Chhnang", "Pursat",
+    "Banteay Meanchey", "Preah Sihanouk", "Kratie", "Koh Kong", "Stung Treng", "Ratanakiri",
+    "Mondulkiri", "Preah Vihear", "Oddar Meanchey", "Pailin", "Kep", "Tbong Khmum",
+]
+# budget_category -> (range_min bounds, range_max bounds), matching the real catalog's brackets
+BUDGET_BRACKETS = {
+    'low': ((200, 250), (300, 400)),
+    'medium': ((250, 450), (500, 800)),
+    'high': ((350, 1000), (900, 1200)),
+    'premium': ((500, 6000), (2000, 9000)),
+}
+
+
+class CatalogTemplate:
+    """Name pools and default weights taken from the real catalog."""
+
+    def __init__(self, universities: list):
+        self.majors_by_category = {}
+        self.faculty_names = []
+        categories = Counter()
+        locations = Counter()
+        budgets = Counter()
+        for uni in universities:
+            locations[uni['location']] += 1
+            budgets[uni.get('budget_category', 'medium')] += 1
+            for faculty in uni.get('faculties', []):
+                self.faculty_names.append(faculty['name_km'])
+                for major in faculty.get('majors', []):
+                    categories[major['category_km']] += 1
+                    self.majors_by_category.setdefault(major['category_km'], []).append(major['name_km'])
+        # Most common first, so Zipf ranks follow real popularity
+        self.categories = [category for category, _ in categories.most_common()]
+        self.category_weights = [count for _, count in categories.most_common()]
+        self.locations = [location for location, _ in locations.most_common()]
+        self.location_weights = [count for _, count in locations.most_common()]
+        self.budget_categories = [category for category in BUDGET_BRACKETS if budgets[category]]
+        self.budget_weights = [budgets[category] for category in self.budget_categories]
+        self.admission_requirements = universities[0].get('admission_requirements_km', [])
+        self.career_opportunities = universities[0].get('career_opportunities_km', '')
+
+
+def zipf_weights(count: int, exponent: float) -> list:
+    """Weight of rank r is 1 / r**exponent; exponent 0 is uniform."""
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class CatalogGenerator:
+    """Produces university records one by one from a seeded RNG."""
+
+    def __init__(self, template: CatalogTemplate, seed: int = 42, majors_mean: float = 11.0,
+                 size_skew: float = 0.0, category_skew: float | None = None,
+                 locations: int | None = None, location_skew: float | None = None):
+        self.template = template
+        self.rng = random.Random(seed)
+        self.majors_mean = majors_mean
+        # Lognormal majors-per-university with the requested mean; sigma 0 gives every university the mean
+        self.size_sigma = size_skew
+        self.size_mu = math.log(majors_mean) - size_skew ** 2 / 2
+
+        self.categories = template.categories
+        if category_skew is None:
+            self.category_weights = template.category_weights
+        else:
+            self.category_weights = zipf_weights(len(self.categories), category_skew)
+
+        if locations is None and location_skew is None:
+            self.locations, self.location_weights = template.locations, template.location_weights
+        else:
+            names = template.locations + [p for p in PROVINCES if p not in template.locations]
+            self.locations = names[:locations or len(template.locations)]
+            self.location_weights = zipf_weights(len(self.locations), location_skew if location_skew is not None else 1.0)
+
+    def _major_count(self) -> int:
+        if self.size_sigma <= 0:
+            return max(1, round(self.majors_mean))
+        return max(1, round(self.rng.lognormvariate(self.size_mu, self.size_sigma)))
+
+    def _tuition(self) -> tuple:
+        budget_category = self.rng.choices(self.template.budget_categories, self.template.budget_weights)[0]
+        (min_lo, min_hi), (max_lo, max_hi) = BUDGET_BRACKETS[budget_category]
+        range_min = self.rng.randrange(min_lo, min_hi + 1, 50)
+        range_max = max(range_min, self.rng.randrange(max_lo, max_hi + 1, 50))
+        return budget_category, range_min, range_max
+
+    def university(self, uni_id: int) -> dict:
+        rng = self.rng
+        majors = []
+        for category in rng.choices(self.categories, self.category_weights, k=self._major_count()):
+            majors.append({'name_km': rng.choice(self.template.majors_by_category[category]), 'category_km': category})
+        faculty_count = min(len(majors), rng.randint(1, 3))
+        faculties = [{'name_km': rng.choice(self.template.faculty_names), 'majors': majors[i::faculty_count]}
+                     for i in range(faculty_count)]
+        budget_category, range_min, range_max = self._tuition()
+        short_name = f"SU{uni_id}"
+        return {
+            'id': uni_id,
+            'name_km': f"សាកលវិទ្យាល័យសំយោគ {uni_id}",
+            'name_en': f"Synthetic University {uni_id}",
+            'name_short': short_name,
+            'location': rng.choices(self.locations, self.location_weights)[0],
+            'type': rng.choice(['Public', 'Private']),
+            'established_year': rng.randint(1960, 2020),
+            'tuition_fees': {
+                'currency': 'USD',
+                'range_min': range_min,
+                'range_max': range_max,
+                'note_km': f"ប្រហែល ${range_min}–${range_max}/ឆ្នាំ (សូមទំនាក់ទំនងផ្ទាល់)",
+            },
+            'faculties': faculties,
+            'contact': {
+                'phones': [f"0{rng.randint(10, 99)} {rng.randint(100, 999)} {rng.randint(100, 999)}"],
+                'email': f"info@{short_name.lower()}.edu.kh",
+                'website': f"https://www.{short_name.lower()}.edu.kh",
+                'facebook': short_name,
+            },
+            'admission_requirements_km': self.template.admission_requirements,
+            'career_opportunities_km': self.template.career_opportunities,
+            'major_categories_km': list(dict.fromkeys(major['category_km'] for major in majors)),
+            'total_majors': len(majors),
+            'budget_category': budget_category,
+            'has_entrance_exam': rng.random() < 0.3,
+            'special_programs': [],
+            'ranking_score': None,
+        }
+
+
+def write_catalog(generator: CatalogGenerator, count: int, output_path: str) -> int:
+    """Streams `count` universities as a JSON array (temp file + rename); returns the number of majors written."""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalog_', suffix='.tmp')
+    programs = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for uni_id in range(1, count + 1):
+                uni = generator.university(uni_id)
+                programs += uni['total_majors']
+                f.write('\n' if uni_id == 1 else ',\n')
+                f.write(json.dumps(uni, ensure_ascii=False))
+            f.write('\n]\n')
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return programs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic university catalog with the data.json schema.")
+    parser.add_argument('--universities', type=int, default=1000, help="number of universities to generate")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="where to write the catalog JSON")
+    parser.add_argument('--template', default=TEMPLATE_PATH, help="real catalog to take names and frequencies from")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--majors-mean', type=float, default=11.0, help="average majors per university")
+    parser.add_argument('--size-skew', type=float, default=0.0,
+                        help="lognormal sigma of majors per university (0 = every university has the mean)")
+    parser.add_argument('--category-skew', type=float, default=None,
+                        help="Zipf exponent over major categories (default: the real catalog's frequencies)")
+    parser.add_argument('--locations', type=int, default=None,
+                        help=f"number of distinct locations, up to {len(PROVINCES)} (default: the real catalog's)")
+    parser.add_argument('--location-skew', type=float, default=None, help="Zipf exponent over locations")
+    args = parser.parse_args()
+
+    print("--- Starting Synthetic Catalog Generation ---")
+    try:
+        with open(args.template, 'r', encoding='utf-8') as f:
+            template = CatalogTemplate(json.load(f))
+    except Exception as e:
+        print(f"❌ ERROR: Could not read template catalog at '{args.template}'. Error: {e}")
+        return
+    generator = CatalogGenerator(template, seed=args.seed, majors_mean=args.majors_mean, size_skew=args.size_skew,
+                                 category_skew=args.category_skew, locations=args.locations,
+                                 location_skew=args.location_skew)
+    programs = write_catalog(generator, args.universities, args.output)
+    print(f"✅ Wrote {args.universities} universities ({programs} majors) to: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,18 @@
 # scripts/generate_synthetic_data.py
+import argparse
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-import os
 
 # --- Configuration ---
 NUM_STUDENTS = 10000
 OUTPUT_CSV_PATH = 'data/synthetic_admissions_data.csv'
+CHUNK_SIZE = 1_000_000
+SEED = 42
 MAJOR_CATEGORIES = [
     "ធុរកិច្ច", "វិស្វកម្ម", "បច្ចេកវិទ្យា", "ភាសា", "ច្បាប់", "ទេសចរណ៍",
     "កសិកម្ម", "ស្ថាបត្យកម្ម", "សេដ្ឋកិច្ច", "អប់រំ", "រដ្ឋបាល", "វេជ្ជសាស្ត្រ",
@@ -13,53 +20,161 @@ MAJOR_CATEGORIES = [
     "បរិស្ថាន", "ទំនាក់ទំនងអន្តរជាតិ", "សារព័ត៌មាន"
 ]
 UNIVERSITY_IDS = list(range(1, 49))
+COLUMNS = ['gpa', 'english_proficiency', 'extracurriculars', 'applied_university_id',
+           'applied_major_category', 'admission_decision']
 
-def label_admission_decision(row):
-    # Rule 1: Top-Tier Tech (ITC, CADT)
-    if row['applied_university_id'] in [10, 27] and row['applied_major_category'] in ['បច្ចេកវិទ្យា', 'វិស្វកម្ម']:
-        return 1 if row['gpa'] >= 3.5 and row['english_proficiency'] >= 7 else 0
-    # Rule 2: Top-Tier Medical (UP, IU)
-    if row['applied_university_id'] in [14, 15] and row['applied_major_category'] in ['វេជ្ជសាស្ត្រ', 'សុខភាព']:
-        return 1 if row['gpa'] >= 3.6 else 0
-    # Rule 3: Top-Tier Business/Law (NUM, RULE)
-    if row['applied_university_id'] in [16, 12] and row['applied_major_category'] in ['ធុរកិច្ច', 'ច្បាប់']:
-        return 1 if row['gpa'] >= 3.2 else 0
-    # Rule 4: Premium International (AUPP, Paragon)
-    if row['applied_university_id'] in [28, 36]:
-        return 1 if row['english_proficiency'] >= 8 and row['gpa'] >= 3.0 else 0
+def label_admission_decisions(df, rng):
+    """
+    Applies the admission rules to every row at once; the first matching rule decides.
+    """
+    uni = df['applied_university_id'].to_numpy()
+    major = df['applied_major_category']
+    gpa = df['gpa'].to_numpy()
+    english = df['english_proficiency'].to_numpy()
+    conditions = [
+        # Rule 1: Top-Tier Tech (ITC, CADT)
+        np.isin(uni, [10, 27]) & major.isin(['បច្ចេកវិទ្យា', 'វិស្វកម្ម']).to_numpy(),
+        # Rule 2: Top-Tier Medical (UP, IU)
+        np.isin(uni, [14, 15]) & major.isin(['វេជ្ជសាស្ត្រ', 'សុខភាព']).to_numpy(),
+        # Rule 3: Top-Tier Business/Law (NUM, RULE)
+        np.isin(uni, [16, 12]) & major.isin(['ធុរកិច្ច', 'ច្បាប់']).to_numpy(),
+        # Rule 4: Premium International (AUPP, Paragon)
+        np.isin(uni, [28, 36]),
+    ]
+    decisions = [
+        (gpa >= 3.5) & (english >= 7),
+        gpa >= 3.6,
+        gpa >= 3.2,
+        (english >= 8) & (gpa >= 3.0),
+    ]
     # Default Rule
-    admission_chance = row['gpa'] / 4.0 + row['extracurriculars'] * 0.05
-    return 1 if np.random.rand() < admission_chance else 0
-
-def generate_data():
-    """Generates the main synthetic dataset."""
-    print("--- Starting Synthetic Data Generation ---")
-    
-    # Ensure the 'data' directory exists
-    if not os.path.exists('data'):
-        os.makedirs('data')
+    admission_chance = gpa / 4.0 + df['extracurriculars'].to_numpy() * 0.05
+    default = rng.random(len(df)) < admission_chance
+    return np.select(conditions, decisions, default).astype(np.int8)
 
-    gpas = np.random.normal(loc=3.2, scale=0.4, size=NUM_STUDENTS).round(2)
+def generate_chunk(num_rows, seed_sequence):
+    """Generates one chunk of students from its own independent random stream."""
+    rng = np.random.default_rng(seed_sequence)
+    gpas = rng.normal(loc=3.2, scale=0.4, size=num_rows).round(2)
     gpas = np.clip(gpas, 2.0, 4.0)
 
     data = {
         'gpa': gpas,
-        'english_proficiency': np.random.randint(1, 11, size=NUM_STUDENTS),
-        'extracurriculars': np.random.randint(0, 6, size=NUM_STUDENTS),
-        'applied_university_id': np.random.choice(UNIVERSITY_IDS, size=NUM_STUDENTS),
-        'applied_major_category': np.random.choice(MAJOR_CATEGORIES, size=NUM_STUDENTS),
+        'english_proficiency': rng.integers(1, 11, size=num_rows, dtype=np.int8),
+        'extracurriculars': rng.integers(0, 6, size=num_rows, dtype=np.int8),
+        'applied_university_id': rng.choice(np.array(UNIVERSITY_IDS, dtype=np.int16), size=num_rows),
+        'applied_major_category': pd.Categorical.from_codes(
+            rng.integers(0, len(MAJOR_CATEGORIES), size=num_rows), categories=MAJOR_CATEGORIES),
     }
     df = pd.DataFrame(data)
-    df['admission_decision'] = df.apply(label_admission_decision, axis=1)
-    
-    df.to_csv(OUTPUT_CSV_PATH, index=False)
-    print(f"✅ Successfully generated and saved {len(df)} records to {OUTPUT_CSV_PATH}")
-    
+    df['admission_decision'] = label_admission_decisions(df, rng)
+    return df
+
+def encode_csv_rows(df):
+    """
+    Same bytes as df.to_csv(index=False, header=False), about 4x faster.
+    Every column takes few distinct values, so each one is formatted once and looked up per row.
+    """
+    gpa_text = np.array([str(hundredths / 100) for hundredths in range(401)], dtype=object)
+    small_int_text = np.array([str(value) for value in range(max(UNIVERSITY_IDS) + 1)], dtype=object)
+    columns = [
+        gpa_text[np.rint(df['gpa'].to_numpy() * 100).astype(np.int64)],
+        small_int_text[df['english_proficiency'].to_numpy()],
+        small_int_text[df['extracurriculars'].to_numpy()],
+        small_int_text[df['applied_university_id'].to_numpy()],
+        np.array(MAJOR_CATEGORIES, dtype=object)[df['applied_major_category'].cat.codes.to_numpy()],
+        small_int_text[df['admission_decision'].to_numpy()],
+    ]
+    lines = '\n'.join(map(','.join, zip(*[column.tolist() for column in columns])))
+    return (lines + '\n').encode('utf-8') if lines else b''
+
+def csv_chunk(num_rows, seed_sequence):
+    """Worker task for CSV output: the chunk, already encoded, plus its admitted count."""
+    df = generate_chunk(num_rows, seed_sequence)
+    return encode_csv_rows(df), int(df['admission_decision'].sum())
+
+def parquet_chunk(num_rows, seed_sequence):
+    """Worker task for Parquet output."""
+    df = generate_chunk(num_rows, seed_sequence)
+    return df, int(df['admission_decision'].sum())
+
+def chunk_results(task, chunk_sizes, seed_sequences, workers):
+    """Yields task results in chunk order, keeping at most 2 chunks per worker in flight."""
+    if workers <= 1:
+        for num_rows, seed_sequence in zip(chunk_sizes, seed_sequences):
+            yield task(num_rows, seed_sequence)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for num_rows, seed_sequence in zip(chunk_sizes, seed_sequences):
+            in_flight.append(executor.submit(task, num_rows, seed_sequence))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def generate_data(num_students=NUM_STUDENTS, output_path=OUTPUT_CSV_PATH, seed=SEED,
+                  chunk_size=CHUNK_SIZE, workers=1, output_format=None):
+    """Generates the main synthetic dataset, chunk by chunk, to CSV or Parquet."""
+    print("--- Starting Synthetic Data Generation ---")
+    output_format = output_format or ('parquet' if output_path.endswith('.parquet') else 'csv')
+
+    # Ensure the output directory exists
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    # One child seed per chunk, so the data depends on the seed and chunk size but not on the worker count
+    chunk_sizes = [min(chunk_size, num_students - start) for start in range(0, num_students, chunk_size)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    if output_format == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("❌ ERROR: Parquet output needs pyarrow (pip install pyarrow).")
+            return
+
+    admitted = 0
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.synthetic_', suffix='.tmp')
+    try:
+        if output_format == 'parquet':
+            os.close(fd)
+            writer = None
+            for df, chunk_admitted in chunk_results(parquet_chunk, chunk_sizes, seed_sequences, workers):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                writer = writer or pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+                admitted += chunk_admitted
+            if writer is not None:
+                writer.close()
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write((','.join(COLUMNS) + '\n').encode('utf-8'))
+                for payload, chunk_admitted in chunk_results(csv_chunk, chunk_sizes, seed_sequences, workers):
+                    f.write(payload)
+                    admitted += chunk_admitted
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    print(f"✅ Successfully generated and saved {num_students} records to {output_path}")
+
     print("\n--- Verification ---")
-    decision_counts = df['admission_decision'].value_counts(normalize=True) * 100
+    admitted_pct = 100 * admitted / num_students if num_students else 0
     print("Admission Decision Distribution:")
-    print(f"Admitted (1): {decision_counts.get(1, 0):.1f}%")
-    print(f"Rejected (0): {decision_counts.get(0, 0):.1f}%")
-    
+    print(f"Admitted (1): {admitted_pct:.1f}%")
+    print(f"Rejected (0): {100 - admitted_pct:.1f}%")
+
 if __name__ == '__main__':
-    generate_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate synthetic admissions data.")
+    parser.add_argument('--rows', type=int, default=NUM_STUDENTS, help="number of students to generate")
+    parser.add_argument('--output', default=OUTPUT_CSV_PATH, help="output path (.csv, or .parquet with pyarrow)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], help="output format (default: from the extension)")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="rows generated and written per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="processes generating chunks in parallel")
+    args = parser.parse_args()
+    generate_data(args.rows, args.output, args.seed, args.chunk_size, args.workers, args.format)
@@ -2,15 +2,42 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import classification_report, accuracy_score
+from sklearn.preprocessing import StandardScaler
+from concurrent.futures import ProcessPoolExecutor
 import joblib
+import argparse
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.compiled_model import CompiledLogisticModel
+from generate_synthetic_data import MAJOR_CATEGORIES
 
 # --- Configuration ---
 DATA_PATH = 'data/synthetic_admissions_data.csv'
 MODEL_DIR = 'src/core/ml_models/'
 MODEL_PATH = os.path.join(MODEL_DIR, 'admission_model.pkl')
+# NumPy-only copy of the same model, loaded by the bot without sklearn or unpickling
+COMPILED_MODEL_PATH = os.path.join(MODEL_DIR, 'admission_model.npz')
+
+# --- Streaming mode ---
+CHUNK_SIZE = 500_000
+TEST_SIZE = 0.2
+SEED = 42
+NUMERIC_FEATURES = ['gpa', 'english_proficiency', 'extracurriculars', 'applied_university_id']
+# Fixed vocabulary, in the order pd.get_dummies would produce, so every chunk encodes to the same columns
+MAJOR_VOCABULARY = sorted(MAJOR_CATEGORIES)
+STREAMING_COLUMNS = NUMERIC_FEATURES + [f'major_{category}' for category in MAJOR_VOCABULARY]
+
+def export_compiled_model(model_artifact):
+    """
+    Writes the weights, intercept, column order and version hash of a trained artifact to an .npz.
+    """
+    compiled = CompiledLogisticModel.from_estimator(model_artifact['model'], model_artifact['columns'])
+    compiled.save(COMPILED_MODEL_PATH)
+    print(f"✅ Compiled model (version {compiled.version}) saved to: {COMPILED_MODEL_PATH}")
 
 def train_model():
     """
@@ -62,6 +89,148 @@ def train_model():
     os.makedirs(MODEL_DIR, exist_ok=True)
     joblib.dump(model_artifact, MODEL_PATH)
     print(f"✅ Model artifact successfully saved to: {MODEL_PATH}")
+    export_compiled_model(model_artifact)
+
+def stream_chunks(data_path, chunk_size, test_size, seed, split):
+    """
+    Yields (X, y) for the 'train' or 'test' rows of each CSV chunk, one-hot encoded against MAJOR_VOCABULARY.
+    Rows are assigned to a split by a per-chunk seeded draw, so every pass sees the same split.
+    """
+    reader = pd.read_csv(data_path, chunksize=chunk_size,
+                         dtype={'applied_major_category': pd.CategoricalDtype(MAJOR_VOCABULARY)})
+    for chunk_number, chunk in enumerate(reader):
+        held_out = np.random.default_rng([seed, chunk_number]).random(len(chunk)) < test_size
+        rows = held_out if split == 'test' else ~held_out
+        chunk = chunk[rows]
+        if chunk.empty:
+            continue
+        X = np.zeros((len(chunk), len(STREAMING_COLUMNS)), dtype=np.float64)
+        X[:, :len(NUMERIC_FEATURES)] = chunk[NUMERIC_FEATURES].to_numpy(dtype=np.float64)
+        # Categories outside the vocabulary (code -1) get all-zero dummies, like get_dummies + reindex
+        codes = chunk['applied_major_category'].cat.codes.to_numpy()
+        known = codes >= 0
+        X[np.flatnonzero(known), len(NUMERIC_FEATURES) + codes[known]] = 1.0
+        yield X, chunk['admission_decision'].to_numpy()
+
+def fit_streaming_scaler(data_path, chunk_size, test_size, seed):
+    """First pass: feature means and variances of the training stream."""
+    scaler = StandardScaler()
+    for X, _ in stream_chunks(data_path, chunk_size, test_size, seed, 'train'):
+        scaler.partial_fit(X)
+    return scaler
+
+def train_streaming_model(data_path, scaler, alpha, epochs, chunk_size, test_size, seed):
+    """
+    Trains a logistic-loss SGDClassifier chunk by chunk on standardized features, then folds the
+    scaling into coef_/intercept_ so the returned model takes raw features like the batch model.
+    """
+    model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=seed)
+    for _ in range(epochs):
+        for X, y in stream_chunks(data_path, chunk_size, test_size, seed, 'train'):
+            model.partial_fit(scaler.transform(X), y, classes=[0, 1])
+    model.coef_ = model.coef_ / scaler.scale_
+    model.intercept_ = model.intercept_ - model.coef_ @ scaler.mean_
+    return model
+
+def evaluate_streaming_model(model, data_path, chunk_size, test_size, seed):
+    """Accuracy, log loss and per-class precision/recall on the held-out stream, from running counts."""
+    confusion = np.zeros((2, 2), dtype=np.int64)
+    log_loss_sum = 0.0
+    for X, y in stream_chunks(data_path, chunk_size, test_size, seed, 'test'):
+        probability = np.clip(model.predict_proba(X)[:, 1], 1e-15, 1 - 1e-15)
+        log_loss_sum -= np.sum(np.where(y == 1, np.log(probability), np.log(1 - probability)))
+        np.add.at(confusion, (y, (probability >= 0.5).astype(np.int64)), 1)
+    total = confusion.sum()
+    if not total:
+        return {'rows': 0, 'accuracy': float('nan'), 'log_loss': float('nan'), 'confusion': confusion}
+    return {'rows': int(total), 'accuracy': np.trace(confusion) / total, 'log_loss': log_loss_sum / total,
+            'confusion': confusion}
+
+def print_streaming_report(metrics):
+    confusion = metrics['confusion']
+    print(f"Held-out rows: {metrics['rows']}")
+    print(f"Model Accuracy: {metrics['accuracy']:.4f}")
+    print(f"Log Loss: {metrics['log_loss']:.4f}")
+    print(f"\n{'':>14}{'precision':>10}{'recall':>10}{'support':>10}")
+    for label, name in enumerate(['Rejected (0)', 'Admitted (1)']):
+        predicted = confusion[:, label].sum()
+        support = confusion[label].sum()
+        precision = confusion[label, label] / predicted if predicted else 0.0
+        recall = confusion[label, label] / support if support else 0.0
+        print(f"{name:>14}{precision:>10.2f}{recall:>10.2f}{support:>10}")
+
+def sweep_candidate(data_path, scaler, alpha, epochs, chunk_size, test_size, seed):
+    """Process-pool task: train and evaluate one alpha."""
+    model = train_streaming_model(data_path, scaler, alpha, epochs, chunk_size, test_size, seed)
+    return alpha, model, evaluate_streaming_model(model, data_path, chunk_size, test_size, seed)
+
+def train_model_streaming(data_path=DATA_PATH, alphas=(1e-4,), epochs=1, chunk_size=CHUNK_SIZE,
+                          test_size=TEST_SIZE, seed=SEED, workers=1):
+    """
+    Out-of-core training: reads the CSV in chunks and never holds more than one chunk in memory.
+    With several alphas, each is trained in its own process and the best held-out log loss wins.
+    """
+    print("--- Starting Streaming Model Training ---")
+    if not os.path.exists(data_path):
+        print(f"❌ ERROR: Data file not found at '{data_path}'. Please run the data generation script first.")
+        return
+
+    print("Pass 1: fitting feature scaling on the training stream...")
+    scaler = fit_streaming_scaler(data_path, chunk_size, test_size, seed)
+    print(f"Training on {int(scaler.n_samples_seen_)} records ({len(STREAMING_COLUMNS)} features).")
+
+    print(f"Training SGD logistic regression for alpha in {list(alphas)} ({epochs} epoch(s) each)...")
+    args = [(data_path, scaler, alpha, epochs, chunk_size, test_size, seed) for alpha in alphas]
+    if workers > 1 and len(alphas) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(alphas))) as executor:
+            candidates = list(executor.map(sweep_candidate, *zip(*args)))
+    else:
+        candidates = [sweep_candidate(*candidate_args) for candidate_args in args]
+    for alpha, _, metrics in candidates:
+        print(f"  alpha={alpha:g}: accuracy {metrics['accuracy']:.4f}, log loss {metrics['log_loss']:.4f}")
+    alpha, model, metrics = min(candidates, key=lambda candidate: candidate[2]['log_loss'])
+    print("Model training complete.")
+
+    print(f"\n--- Evaluating Model (alpha={alpha:g}) on the Held-Out Stream ---")
+    print_streaming_report(metrics)
+
+    print("\n--- Saving Trained Model and Column Blueprint ---")
+    model_artifact = {
+        'model': model,
+        'columns': list(STREAMING_COLUMNS)
+    }
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    joblib.dump(model_artifact, MODEL_PATH)
+    print(f"✅ Model artifact successfully saved to: {MODEL_PATH}")
+    export_compiled_model(model_artifact)
+
+def export_only():
+    """
+    Converts the existing pickled artifact to the compiled format without retraining.
+    """
+    try:
+        model_artifact = joblib.load(MODEL_PATH)
+    except FileNotFoundError:
+        print(f"❌ ERROR: Model artifact not found at '{MODEL_PATH}'. Train the model first.")
+        return
+    export_compiled_model(model_artifact)
 
 if __name__ == '__main__':
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the admission model.")
+    parser.add_argument('--export-only', action='store_true',
+                        help="only convert the existing .pkl artifact to the compiled .npz format")
+    parser.add_argument('--streaming', action='store_true',
+                        help="train out-of-core with SGD, reading the CSV in chunks")
+    parser.add_argument('--data', default=DATA_PATH, help="training CSV (streaming mode)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="rows per chunk (streaming mode)")
+    parser.add_argument('--epochs', type=int, default=1, help="passes over the training stream (streaming mode)")
+    parser.add_argument('--alphas', type=float, nargs='+', default=[1e-4],
+                        help="regularization strengths to sweep; the best held-out log loss is kept (streaming mode)")
+    parser.add_argument('--workers', type=int, default=1, help="processes for the alpha sweep (streaming mode)")
+    args = parser.parse_args()
+    if args.export_only:
+        export_only()
+    elif args.streaming:
+        train_model_streaming(args.data, args.alphas, args.epochs, args.chunk_size, workers=args.workers)
+    else:
+        train_model()
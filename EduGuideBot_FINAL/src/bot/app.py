@@ -1,21 +1,24 @@
+import asyncio
 import logging
 import os
 import json
-import joblib
-import pandas as pd
 from dotenv import load_dotenv
-from telegram import (
-    Update, WebAppInfo, InlineKeyboardButton, InlineKeyboardMarkup, 
-    ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
-)
+from telegram import Update, ReplyKeyboardRemove
 from telegram.ext import (
     Application, CommandHandler, ContextTypes, MessageHandler, 
     filters, CallbackQueryHandler, ConversationHandler
 )
-from telegram.constants import ParseMode
 from src.core.data_loader import UniversityDataManager
 from src.core.recommender import UniversityRecommender
-from src.core.career_data import CAREER_PATHS
+from src.core.catalog_watcher import CatalogWatcher
+from src.core.admission_predictor import AdmissionPredictor
+from src.core.compiled_model import load_compiled_model
+from src.bot.startup import StartupProfiler
+from src.bot.execution import attach_executor, configure_execution, create_executor
+from src.bot.serving import application_builder, run_application
+from src.bot.render_cache import RenderCache
+from src.bot.monitoring import attach_metrics, callback_route
+from src.core import metrics
 
 # --- Basic Setup ---
 logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
@@ -25,104 +28,47 @@ load_dotenv()
 # --- FINAL URL FIX (Corrected and Simplified) ---
 BASE_URL = os.getenv("GITHUB_PAGES_URL")
 
-# --- HELPER FUNCTIONS ---
-
-def build_main_menu_keyboard():
-    """Creates the main menu with corrected Khmer text."""
-    keyboard = [
-        [InlineKeyboardButton("🧬 វិភាគ DNA និស្សិត", callback_data='launch_quiz')],
-        [InlineKeyboardButton("📚 កាតាឡុកសាកលវិទ្យាល័យ", callback_data='launch_browser')],
-        [InlineKeyboardButton("🚀 ស្វែងយល់ពីអាជីព", callback_data='career_start')],
-        [InlineKeyboardButton("💰 អ្នកគណនាថ្លៃសិក្សា", callback_data='launch_calculator')],
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-def format_university_details(uni: dict) -> str:
-    """Helper function to format a university object into a nice string."""
-    details = []
-    details.append(f"*{uni['name_km']}* ({uni['name_en']})")
-    details.append(f"📍 *ទីតាំង:* {uni['location']}")
-    details.append(f"🏛️ *ប្រភេទ:* {uni['type']}")
-    details.append(f"💰 *តម្លៃសិក្សា:* ${uni['tuition_fees']['range_min']} - ${uni['tuition_fees']['range_max']} /ឆ្នាំ")
-    details.append(f"📞 *ទំនាក់ទំនង:* {', '.join(uni['contact']['phones'])}")
-    details.append(f"🌐 *គេហទំព័រ:* {uni['contact']['website']}")
-    return "\n".join(details)
-
+DATA_PATH = 'data/data.json'
+MODEL_PATH = 'src/core/ml_models/admission_model.pkl'
+COMPILED_MODEL_PATH = 'src/core/ml_models/admission_model.npz'
+# Seconds between checks of the catalog file for changes; 0 disables hot reload
+CATALOG_RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", "30"))
 
 # --- HANDLER FUNCTIONS ---
+# Texts and keyboards come ready-made from the render cache (src/bot/render_cache.py)
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Displays the main menu hub."""
-    await update.message.reply_text("សូមស្វាគមន៍!", reply_markup=ReplyKeyboardRemove())
-    await update.message.reply_text(
-        text="នេះគឺជាផ្ទាំងគ្រប់គ្រងរបស់អ្នក។\n\n**សូមជ្រើសរើសឧបករណ៍៖**",
-        reply_markup=build_main_menu_keyboard(),
-        parse_mode=ParseMode.MARKDOWN
-    )
+    screens = context.bot_data['render_cache']
+    await update.message.reply_text(**screens.welcome._asdict())
+    await update.message.reply_text(**screens.main_menu._asdict())
 
 async def all_button_press_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """A single, robust router for ALL button presses."""
     query = update.callback_query
-    await query.answer()
-    
     choice = query.data
+    with metrics.timer('callback_route_seconds', route=callback_route(choice)):
+        await query.answer()
+        screens = context.bot_data['render_cache']
 
-    # --- Web App Launcher Logic ---
-    if choice.startswith('launch_'):
-        app_name = choice.split('_')[1]
-        url = f"{BASE_URL}/static/{app_name}/index.html"
-        button_text_map = {
-            'quiz': '🔬 បើកការវិភាគ',
-            'browser': '📚 បើកកាតាឡុក',
-            'calculator': '💰 បើកការគណនា'
-        }
-        button_text = button_text_map.get(app_name, "បើក Web App")
-        
-        await query.message.reply_text(
-            "ចុចប៊ូតុងខាងក្រោមដើម្បីបើក៖",
-            reply_markup=ReplyKeyboardMarkup.from_button(
-                KeyboardButton(text=button_text, web_app=WebAppInfo(url=url)),
-                resize_keyboard=True
-            )
-        )
-        return
+        # --- Web App Launcher Logic ---
+        if choice.startswith('launch_'):
+            app_name = choice.split('_')[1]
+            await query.message.reply_text(**screens.launcher(app_name)._asdict())
+            return
 
-    # --- Career Planner Logic ---
-    if choice == 'career_start':
-        major_keys = list(CAREER_PATHS.keys())
-        keyboard = [[InlineKeyboardButton(major, callback_data=f"career_show:{major}")] for major in major_keys]
-        keyboard.append([InlineKeyboardButton("⬅️ ត្រឡប់ទៅเมนูหลัก", callback_data='back_to_main')])
-        await query.edit_message_text("សូមជ្រើសរើសវិស័យដែលអ្នកចាប់អារម្មណ៍៖", reply_markup=InlineKeyboardMarkup(keyboard))
-        return
+        # --- Career Planner Logic ---
+        if choice == 'career_start':
+            await query.edit_message_text(**screens.career_menu._asdict())
+            return
 
-    if choice.startswith('career_show:'):
-        selected_major = choice.split(':')[1]
-        career_info = CAREER_PATHS.get(selected_major)
-        response_text = "មិនមានព័ត៌មានទេ។"
-        if career_info:
-            response_text = (
-                f"*{career_info['title']}*\n\n"
-                f"**{career_info['entry_level']['title']}**\n"
-                f"  - *ตำแหน่ง:* {career_info['entry_level']['roles']}\n"
-                f"  - *เงินเดือนโดยประมาณ:* {career_info['entry_level']['salary']}\n\n"
-                f"**{career_info['mid_level']['title']}**\n"
-                f"  - *ตำแหน่ง:* {career_info['mid_level']['roles']}\n"
-                f"  - *เงินเดือนโดยประมาณ:* {career_info['mid_level']['salary']}\n\n"
-                f"**{career_info['senior_level']['title']}**\n"
-                f"  - *ตำแหน่ง:* {career_info['senior_level']['roles']}\n"
-                f"  - *เงินเดือนโดยประมาณ:* {career_info['senior_level']['salary']}\n\n"
-                f"**แนวโน้มในอนาคต:** {career_info['future_trend']}"
-            )
-        reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ ត្រឡប់ទៅវិញ", callback_data="career_start")]])
-        await query.edit_message_text(response_text, parse_mode=ParseMode.MARKDOWN, reply_markup=reply_markup)
-        return
+        if choice.startswith('career_show:'):
+            selected_major = choice.split(':')[1]
+            await query.edit_message_text(**screens.career_page(selected_major)._asdict())
+            return
 
-    if choice == 'back_to_main':
-        await query.edit_message_text(
-            text="នេះគឺជាផ្ទាំងគ្រប់គ្រងរបស់អ្នក។\n\n**សូមជ្រើសរើសឧបករណ៍៖**",
-            reply_markup=build_main_menu_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
-        )
+        if choice == 'back_to_main':
+            await query.edit_message_text(**screens.main_menu._asdict())
 
 async def web_app_data_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """The router for data coming from ANY Web App."""
@@ -135,10 +81,9 @@ async def web_app_data_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         if source == 'catalog':
             # Handle catalog selection
             uni_id = data.get('university_id')
-            data_manager = context.bot_data['data_manager']
-            university = data_manager.get_university_by_id(uni_id)
-            if university:
-                await update.message.reply_text(format_university_details(university), parse_mode=ParseMode.MARKDOWN, reply_markup=ReplyKeyboardRemove())
+            card = context.bot_data['render_cache'].university_card(uni_id)
+            if card:
+                await update.message.reply_text(**card._asdict())
         else:
             # Handle quiz results
             # The full quiz processing logic goes here...
@@ -147,36 +92,136 @@ async def web_app_data_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         logger.error(f"Error processing Web App data: {e}")
         await update.message.reply_text("មានបញ្ហាក្នុងការដំណើរការข้อមูល។")
 
+def load_admission_model(path: str = MODEL_PATH) -> dict:
+    """Loads the admission model artifact, preferring the NumPy-only compiled copy.
+
+    joblib (and sklearn) are only imported when the compiled .npz is missing or unreadable.
+    """
+    if os.path.exists(COMPILED_MODEL_PATH):
+        try:
+            model = load_compiled_model(COMPILED_MODEL_PATH)
+            logger.info(f"Loaded compiled admission model (version {model.version}).")
+            return {'model': model, 'columns': model.columns}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Compiled admission model unusable, falling back to {path}: {e}")
+    import joblib
+    return joblib.load(path)
+
+async def warm_up_admission_model(application: Application) -> None:
+    """Background task: loads the model and builds the predictor without delaying polling."""
+    try:
+        model_artifact = await asyncio.to_thread(load_admission_model)
+        # If the catalog is hot-reloaded while we build, build again for the new one
+        while True:
+            data_manager = application.bot_data['data_manager']
+            predictor = await asyncio.to_thread(
+                AdmissionPredictor, model_artifact['model'], model_artifact['columns'], data_manager
+            )
+            if data_manager is application.bot_data['data_manager']:
+                break
+    except Exception as e:
+        logger.error(f"Failed to load the admission model: {e}")
+        return
+    application.bot_data.update(
+        ml_model=model_artifact['model'], model_columns=model_artifact['columns'], admission_predictor=predictor
+    )
+    logger.info("Admission model ready.")
 
-def main() -> None:
-    """Builds and runs the bot application."""
+async def start_background_warmup(application: Application) -> None:
+    # The event loop only keeps a weak reference to tasks, so hold on to it until it finishes
+    application.bot_data['ml_warmup'] = asyncio.create_task(warm_up_admission_model(application))
+
+async def reload_catalog_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Rebuilds the catalog off the event loop when data.json changes, then swaps it in."""
+    watcher = context.bot_data['catalog_watcher']
+    if not watcher.has_changed():
+        return
+    try:
+        reload = await asyncio.to_thread(watcher.rebuild)
+        # University cards are rendered from the catalog, so they are rebuilt before the swap too
+        updates = {'data_manager': reload.data_manager, 'recommender': reload.recommender,
+                   'render_cache': await asyncio.to_thread(RenderCache, reload.data_manager, BASE_URL)}
+        # The predictor's design matrix is laid out from the catalog, so it is rebuilt alongside
+        # (unless the model is still warming up; the warm-up task picks up the new catalog itself)
+        if 'ml_model' in context.bot_data:
+            updates['admission_predictor'] = await asyncio.to_thread(
+                AdmissionPredictor, context.bot_data['ml_model'], context.bot_data['model_columns'], reload.data_manager
+            )
+    except Exception as e:
+        logger.error(f"Catalog reload failed, still serving version {context.bot_data['data_manager'].version}: {e}")
+        return
+    # No await between these assignments, so handlers never see a half-swapped catalog
+    context.bot_data.update(updates)
+    watcher.commit(reload)
+    logger.info(
+        f"Catalog reloaded in {reload.duration:.2f}s (version {reload.data_manager.version}): "
+        f"{reload.added} added, {reload.removed} removed, {reload.changed} changed"
+    )
+
+
+def register_handlers(application: Application) -> None:
+    """Handlers, worker pool and jobs; the same in polling and webhook mode."""
+    application.add_handler(CommandHandler("start", start_command))
+    application.add_handler(MessageHandler(filters.StatusUpdate.WEB_APP_DATA, web_app_data_handler))
+    application.add_handler(CallbackQueryHandler(all_button_press_router))
+
+    attach_executor(application, create_executor())
+    # Last, so every handler above is timed
+    attach_metrics(application)
+
+    if CATALOG_RELOAD_INTERVAL > 0:
+        application.job_queue.run_repeating(reload_catalog_job, interval=CATALOG_RELOAD_INTERVAL, first=CATALOG_RELOAD_INTERVAL)
+
+
+def main(profiler: StartupProfiler | None = None) -> None:
+    """Builds and runs the bot application.
+
+    With an enabled profiler, every init phase (including the model load that normally
+    happens in the background) is timed, the report is printed, and the bot is not started.
+    """
+    profiler = profiler or StartupProfiler()
     TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not TOKEN or not BASE_URL:
+    if profiler.enabled:
+        # Building the Application never contacts Telegram, so profiling works without credentials
+        TOKEN = TOKEN or "0:startup-profile"
+    elif not TOKEN or not BASE_URL:
         logger.critical("FATAL: Environment variables not set.")
         return
 
-    application = Application.builder().token(TOKEN).build()
+    with profiler.phase("build application"):
+        # Updates from different users are handled concurrently, each user's in order
+        application = configure_execution(application_builder(TOKEN).post_init(start_background_warmup)).build()
     
     # --- Initialize Services ---
+    # Only the catalog is loaded up front; the ML model is loaded by a background task
     try:
-        data_manager = UniversityDataManager(data_path='data/data.json')
+        with profiler.phase("load catalog"):
+            data_manager = UniversityDataManager(data_path=DATA_PATH)
         application.bot_data['data_manager'] = data_manager
-        application.bot_data['recommender'] = UniversityRecommender(data_manager=data_manager)
-        model_artifact = joblib.load('src/core/ml_models/admission_model.pkl')
-        application.bot_data['ml_model'] = model_artifact['model']
-        application.bot_data['model_columns'] = model_artifact['columns']
-        logger.info("All services initialized successfully.")
+        application.bot_data['catalog_watcher'] = CatalogWatcher(DATA_PATH, current=data_manager)
+        with profiler.phase("build recommender"):
+            application.bot_data['recommender'] = UniversityRecommender(data_manager=data_manager)
+        with profiler.phase("build render cache"):
+            application.bot_data['render_cache'] = RenderCache(data_manager, BASE_URL)
+        logger.info("Catalog services initialized; admission model will load in the background.")
     except Exception as e:
         logger.critical(f"FATAL: Failed to initialize a service. Error: {e}")
         return
     
     # --- Final, Simplified Handler Registration ---
-    application.add_handler(CommandHandler("start", start_command))
-    application.add_handler(MessageHandler(filters.StatusUpdate.WEB_APP_DATA, web_app_data_handler))
-    application.add_handler(CallbackQueryHandler(all_button_press_router))
+    with profiler.phase("register handlers"):
+        register_handlers(application)
+
+    if profiler.enabled:
+        with profiler.phase("load admission model (background)"):
+            model_artifact = load_admission_model()
+        with profiler.phase("build admission predictor (background)"):
+            AdmissionPredictor(model_artifact['model'], model_artifact['columns'], data_manager)
+        print(profiler.report())
+        return
     
     logger.info("--- Starting Bot (Definitive Final Build) ---")
-    application.run_polling()
+    run_application(application)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
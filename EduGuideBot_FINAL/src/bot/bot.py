@@ -1,17 +1,17 @@
+import asyncio
 import os
 import logging
-from telegram.ext import (
-    Application, CommandHandler, CallbackQueryHandler, 
-    ConversationHandler, MessageHandler, filters
-)
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes, MessageHandler, filters
 from dotenv import load_dotenv
 
-from src.bot.handlers import (
-    start, location_choice, budget_input,
-    major_field_choice, career_goal_choice, english_proficiency_choice,
-    confirm_info, cancel, LOCATION, BUDGET, MAJOR_FIELD,
-    CAREER_GOAL, ENGLISH_PROFICIENCY, CONFIRM_INFO
-)
+from src.bot.conversation_state import create_conversation_store
+from src.bot.execution import attach_executor, configure_execution, create_executor, shutdown_executor
+from src.bot.monitoring import attach_metrics
+from src.bot.serving import application_builder, run_application
+from src.core.catalog_watcher import CatalogWatcher
+from src.web.result_generator import ResultGenerator
+from src.web.result_store import FileResultStore
+from src.bot.handlers import start, cancel, route_conversation
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +22,54 @@ logging.basicConfig(
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+DATA_PATH = 'data/data.json'
+RESULTS_DIR = os.getenv("RESULTS_DIR", "static/data")
+# 'file:<dir>' (one result_<id>.json per result, fetched statically by results.html) or
+# 'sqlite:<path>' (one database, for deployments that serve results from the store)
+RESULT_STORE = os.getenv("RESULT_STORE", f"file:{RESULTS_DIR}")
+# Seconds between checks of data.json for catalog changes; 0 disables reloading
+CATALOG_RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", "30"))
+# Seconds between sweeps of expired results from the file store (the SQLite store sweeps itself)
+RESULT_SWEEP_INTERVAL = float(os.getenv("RESULT_SWEEP_INTERVAL", "3600"))
+
+async def shutdown_services(application: Application) -> None:
+    """Stops the worker pool and writes out queued conversation records and results."""
+    await shutdown_executor(application)
+    await asyncio.to_thread(application.bot_data['result_generator'].close)
+    await asyncio.to_thread(application.bot_data['conversations'].close)
+
+async def reload_catalog_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Rebuilds the catalog off the event loop when data.json changes and hands it to the result generator.
+
+    The generator drops its cached recommendations on the next request, and process-mode workers
+    reload when they see the new catalog version.
+    """
+    watcher = context.bot_data['catalog_watcher']
+    if not watcher.has_changed():
+        return
+    try:
+        reload = await asyncio.to_thread(watcher.rebuild)
+    except Exception as e:
+        logger.error(f"Catalog reload failed, still serving version {watcher.current.version}: {e}")
+        return
+    context.bot_data['result_generator'].use_catalog(reload.data_manager, reload.recommender)
+    watcher.commit(reload)
+    logger.info(
+        f"Catalog reloaded in {reload.duration:.2f}s (version {reload.data_manager.version}): "
+        f"{reload.added} added, {reload.removed} removed, {reload.changed} changed"
+    )
+
+async def sweep_results_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Deletes results past RESULT_TTL or over RESULT_MAX_COUNT, off the event loop."""
+    store = context.bot_data['result_generator'].store
+    try:
+        removed = await asyncio.to_thread(store.sweep)
+    except OSError as e:
+        logger.error(f"Result sweep failed: {e}")
+        return
+    if removed:
+        logger.info(f"Swept {removed} expired results")
+
 def setup_bot():
     """Setup and return the Telegram bot application"""
     # Load environment variables
@@ -33,24 +81,30 @@ def setup_bot():
     if not token:
         raise ValueError("No token provided. Set the TELEGRAM_BOT_TOKEN environment variable.")
     
-    # Create application
-    application = Application.builder().token(token).build()
+    # Create application; updates from different users are handled concurrently
+    application = configure_execution(application_builder(token)).post_shutdown(shutdown_services).build()
     
-    # Add conversation handler
-    conv_handler = ConversationHandler(
-        entry_points=[CommandHandler("start", start)],
-        states={
-            LOCATION: [CallbackQueryHandler(location_choice)],
-            BUDGET: [MessageHandler(filters.TEXT & ~filters.COMMAND, budget_input)],
-            MAJOR_FIELD: [CallbackQueryHandler(major_field_choice)],
-            CAREER_GOAL: [CallbackQueryHandler(career_goal_choice)],
-            ENGLISH_PROFICIENCY: [CallbackQueryHandler(english_proficiency_choice)],
-            CONFIRM_INFO: [CallbackQueryHandler(confirm_info)]
-        },
-        fallbacks=[CommandHandler("cancel", cancel)],
-    )
+    # Recommendations are scored and written on a worker pool shared by all handlers
+    result_generator = ResultGenerator(DATA_PATH, results_dir=RESULTS_DIR, store=RESULT_STORE)
+    application.bot_data['result_generator'] = result_generator
+    attach_executor(application, create_executor(result_generator))
+    application.bot_data['catalog_watcher'] = CatalogWatcher(DATA_PATH, current=result_generator.data_manager)
+    if CATALOG_RELOAD_INTERVAL > 0 and application.job_queue is not None:
+        application.job_queue.run_repeating(reload_catalog_job, interval=CATALOG_RELOAD_INTERVAL,
+                                            first=CATALOG_RELOAD_INTERVAL)
+    if isinstance(result_generator.store, FileResultStore) and RESULT_SWEEP_INTERVAL > 0 \
+            and application.job_queue is not None:
+        application.job_queue.run_repeating(sweep_results_job, interval=RESULT_SWEEP_INTERVAL, first=60)
+    
+    # Onboarding steps are routed by the conversation store, which bounds memory and survives restarts
+    application.bot_data['conversations'] = create_conversation_store()
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("cancel", cancel))
+    application.add_handler(CallbackQueryHandler(route_conversation))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, route_conversation))
     
-    application.add_handler(conv_handler)
+    # Handler latency histograms, /stats and the Prometheus endpoint, when METRICS_ENABLED=1
+    attach_metrics(application)
     
     return application
 
@@ -61,7 +115,7 @@ def run_bot():
     logger.info("EduGuideBot is starting up...")
     
     # Run the bot until the user presses Ctrl-C
-    application.run_polling(allowed_updates=["message", "callback_query"])
+    run_application(application, allowed_updates=["message", "callback_query"])
     
     logger.info("EduGuideBot has been stopped.")
 
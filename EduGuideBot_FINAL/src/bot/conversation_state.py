@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from src.core.lru_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# 'memory', or 'sqlite:<path>' to keep in-progress onboarding across restarts and processes
+CONVERSATION_STORE = os.getenv("CONVERSATION_STORE", "sqlite:data/conversations.db")
+# Most conversations kept in memory, and seconds of inactivity after which a flow counts as abandoned
+CONVERSATION_CACHE_SIZE = int(os.getenv("CONVERSATION_CACHE_SIZE", "100000"))
+CONVERSATION_TTL = float(os.getenv("CONVERSATION_TTL", str(7 * 24 * 3600)))
+
+
+class ConversationRecord:
+    """One user's onboarding in progress: the state it waits in and the answers so far."""
+
+    __slots__ = ('state', 'location', 'max_budget', 'core_field', 'career_goal', 'english_proficiency', 'updated_at')
+
+    PROFILE_FIELDS = ('location', 'max_budget', 'core_field', 'career_goal', 'english_proficiency')
+
+    def __init__(self, state: int, location: Optional[str] = None, max_budget: Optional[int] = None,
+                 core_field: Optional[str] = None, career_goal: Optional[str] = None,
+                 english_proficiency: Optional[int] = None, updated_at: float = 0.0):
+        self.state = state
+        self.location = location
+        self.max_budget = max_budget
+        self.core_field = core_field
+        self.career_goal = career_goal
+        self.english_proficiency = english_proficiency
+        self.updated_at = updated_at
+
+    def profile(self) -> dict:
+        """The answers as the user profile dict the recommender takes."""
+        return {field: getattr(self, field) for field in self.PROFILE_FIELDS}
+
+    def row(self) -> tuple:
+        return (self.state, self.location, self.max_budget, self.core_field, self.career_goal,
+                self.english_proficiency, self.updated_at)
+
+
+class SQLiteConversationBackend:
+    """Durable conversation records in one SQLite file (WAL mode), shared by every bot process.
+
+    Like SQLiteResultStore, writes are only queued; a background thread commits them in batches
+    every `flush_interval` seconds (or once `batch_size` are waiting), and queued writes are visible
+    to `load` before they are committed. `save` never touches the database: it returns True once
+    the writer is `max_pending` records behind, and the caller then runs `flush` (off the event loop)
+    so the queue stays bounded during bursts. The same thread deletes records idle for longer than `ttl`.
+    """
+
+    def __init__(self, db_path: str, ttl: Optional[float] = None, batch_size: int = 256,
+                 flush_interval: float = 0.5, sweep_interval: float = 300.0, max_pending: int = 4096):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            " user_id INTEGER PRIMARY KEY,"
+            " state INTEGER NOT NULL,"
+            " location TEXT,"
+            " max_budget INTEGER,"
+            " core_field TEXT,"
+            " career_goal TEXT,"
+            " english_proficiency INTEGER,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS conversations_updated_at ON conversations (updated_at)")
+        self._conn.commit()
+
+        self._db_lock = threading.Lock()
+        # user_id -> row to write, or None to delete
+        self._pending: Dict[int, Optional[tuple]] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._last_sweep = time.monotonic()
+        self._writer = threading.Thread(target=self._write_behind, name="conversation-writer", daemon=True)
+        self._writer.start()
+
+    def save(self, user_id: int, row: Optional[tuple]) -> bool:
+        """Queues a row (None deletes); returns True when the backlog is full and should be flushed."""
+        with self._pending_lock:
+            self._pending[user_id] = row
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return pending >= self.max_pending
+
+    def load(self, user_id: int) -> Optional[tuple]:
+        with self._pending_lock:
+            if user_id in self._pending:
+                return self._pending[user_id]
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT state, location, max_budget, core_field, career_goal, english_proficiency, updated_at"
+                " FROM conversations WHERE user_id = ?", (user_id,)).fetchone()
+
+    def flush(self) -> None:
+        # The writer thread and backlog flushes from the event loop can overlap: taking the batch
+        # and committing it under one lock keeps an older batch from landing after a newer one
+        with self._db_lock:
+            with self._pending_lock:
+                batch = dict(self._pending)
+            if not batch:
+                return
+            rows = [(user_id, *row) for user_id, row in batch.items() if row is not None]
+            deleted = [(user_id,) for user_id, row in batch.items() if row is None]
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._conn.executemany("DELETE FROM conversations WHERE user_id = ?", deleted)
+            with self._pending_lock:
+                for user_id, row in batch.items():
+                    if self._pending.get(user_id, row) is row:
+                        self._pending.pop(user_id, None)
+
+    def sweep(self) -> int:
+        if self.ttl is None:
+            return 0
+        with self._db_lock, self._conn:
+            removed = self._conn.execute("DELETE FROM conversations WHERE updated_at < ?",
+                                         (time.time() - self.ttl,)).rowcount
+        if removed:
+            logger.info(f"Swept {removed} abandoned conversations from {self.db_path}")
+        return removed
+
+    def _write_behind(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() - self._last_sweep >= self.sweep_interval:
+                    self._last_sweep = time.monotonic()
+                    self.sweep()
+            except sqlite3.Error as e:
+                logger.error(f"Conversation store write failed: {e}")
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+class ConversationStore:
+    """Onboarding records per user: a bounded LRU/TTL cache in front of an optional durable backend.
+
+    Without a backend, a record is lost when it falls out of the cache or the process restarts.
+    With one, the cache only saves lookups and users resume where they left off after a restart.
+    Called from handlers: on the event loop only the cache is touched, and backend reads and
+    backlog flushes run in a thread.
+    """
+
+    def __init__(self, backend: Optional[SQLiteConversationBackend] = None,
+                 maxsize: int = CONVERSATION_CACHE_SIZE, ttl: float = CONVERSATION_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, user_id: int) -> Optional[ConversationRecord]:
+        record = self._cache.get(user_id)
+        if record is None and self.backend is not None:
+            row = await asyncio.to_thread(self.backend.load, user_id)
+            if row is not None:
+                record = ConversationRecord(*row)
+                if record.updated_at < time.time() - self.ttl:
+                    return None
+                self._cache.put(user_id, record)
+        return record
+
+    async def start(self, user_id: int, state: int) -> ConversationRecord:
+        """A fresh record for a new onboarding, replacing any earlier one."""
+        record = ConversationRecord(state)
+        await self.save(user_id, record)
+        return record
+
+    async def save(self, user_id: int, record: ConversationRecord) -> None:
+        record.updated_at = time.time()
+        self._cache.put(user_id, record)
+        if self.backend is not None:
+            await self._queue(user_id, record.row())
+
+    async def discard(self, user_id: int) -> None:
+        self._cache.pop(user_id)
+        if self.backend is not None:
+            await self._queue(user_id, None)
+
+    async def _queue(self, user_id: int, row: Optional[tuple]) -> None:
+        if self.backend.save(user_id, row):
+            # The writer is falling behind: hold this update back until the backlog is committed
+            await asyncio.to_thread(self.backend.flush)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
+
+
+def create_conversation_store(spec: str = CONVERSATION_STORE, **options) -> ConversationStore:
+    """Build a store from a spec such as 'memory' or 'sqlite:data/conversations.db'"""
+    backend, _, location = spec.partition(":")
+    if backend == "memory":
+        return ConversationStore(**options)
+    if backend == "sqlite":
+        return ConversationStore(SQLiteConversationBackend(location, ttl=options.get('ttl', CONVERSATION_TTL)), **options)
+    raise ValueError(f"Unknown conversation store backend: {backend!r}")
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import multiprocessing.util
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import Application, ApplicationBuilder, BaseUpdateProcessor, ContextTypes
+
+from src.core import metrics
+from src.web.result_generator import ResultGenerator
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Updates handled at the same time across all users (1 restores PTB's one-at-a-time default)
+CONCURRENT_UPDATES = int(os.getenv("BOT_CONCURRENT_UPDATES", "64"))
+# Pool for scoring, inference and result writes: 'thread' or 'process'
+EXECUTOR_KIND = os.getenv("BOT_EXECUTOR", "thread")
+EXECUTOR_WORKERS = int(os.getenv("BOT_EXECUTOR_WORKERS", str(min(8, os.cpu_count() or 1))))
+# Seconds between execution stats log lines; 0 disables them
+EXECUTION_STATS_INTERVAL = float(os.getenv("EXECUTION_STATS_INTERVAL", "60"))
+
+
+def ordering_key(update: object) -> Optional[Hashable]:
+    """Updates with the same key are handled one at a time, in arrival order (None: no ordering)."""
+    if isinstance(update, Update):
+        if update.effective_user:
+            return ('user', update.effective_user.id)
+        if update.effective_chat:
+            return ('chat', update.effective_chat.id)
+    return None
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Handles updates from different users concurrently and updates from the same user in order.
+
+    ConversationHandler keeps one state per user, so two taps from the same user must not race.
+    An update arriving while its user's previous one is still running is queued behind it and
+    run by the same task, so a user with a backlog occupies a single concurrency slot.
+    """
+
+    __slots__ = ("_backlogs", "queued", "peak_queued", "processed")
+
+    def __init__(self, max_concurrent_updates: int = CONCURRENT_UPDATES):
+        super().__init__(max_concurrent_updates)
+        self._backlogs: Dict[Hashable, deque] = {}
+        self.queued = 0
+        self.peak_queued = 0
+        self.processed = 0
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = ordering_key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+        backlog = self._backlogs.get(key)
+        if backlog is not None:
+            # The task already running this user's updates will pick it up
+            backlog.append(coroutine)
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            return
+        backlog = self._backlogs[key] = deque()
+        try:
+            await self._run(coroutine)
+            while backlog:
+                self.queued -= 1
+                await self._run(backlog.popleft())
+        finally:
+            del self._backlogs[key]
+            # Only left over when cancelled at shutdown
+            self.queued -= len(backlog)
+            for pending in backlog:
+                pending.close()
+
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        try:
+            await coroutine
+        except Exception as e:
+            # Application.process_update reports handler errors itself; this keeps one failure from stalling the backlog
+            logger.error(f"Unhandled error while processing an update: {e}")
+        finally:
+            self.processed += 1
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'updates_in_progress': self.current_concurrent_updates,
+            'max_concurrent_updates': self.max_concurrent_updates,
+            'users_active': len(self._backlogs),
+            'updates_queued': self.queued,
+            'updates_queued_peak': self.peak_queued,
+            'updates_processed': self.processed,
+        }
+
+
+class InstrumentedExecutor(Executor):
+    """A thread or process pool that tracks how many tasks are queued and running."""
+
+    def __init__(self, kind: str = EXECUTOR_KIND, max_workers: int = EXECUTOR_WORKERS, initializer=None, initargs=()):
+        if kind == 'thread':
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bot-work",
+                                            initializer=initializer, initargs=initargs)
+        elif kind == 'process':
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs)
+        else:
+            raise ValueError(f"Unknown executor kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.submitted = 0
+        self.failed = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.submitted += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    async def run(self, fn, *args):
+        """Awaits fn(*args) on the pool; in process mode fn and args must be picklable."""
+        return await asyncio.get_running_loop().run_in_executor(self, fn, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self.in_flight
+            return {
+                'executor_kind': self.kind,
+                'executor_workers': self.max_workers,
+                'executor_running': min(in_flight, self.max_workers),
+                'executor_queue_depth': max(0, in_flight - self.max_workers),
+                'executor_saturation': min(in_flight, self.max_workers) / self.max_workers,
+                'executor_in_flight_peak': self.peak_in_flight,
+                'executor_submitted': self.submitted,
+                'executor_failed': self.failed,
+            }
+
+
+# --- Process-mode workers ---
+# Each worker process scores and writes with its own ResultGenerator (catalog, cache, file store)
+
+def _init_result_worker(data_path: str, results_dir: str, store_spec: Optional[str]) -> None:
+    global _worker_generator
+    _worker_generator = ResultGenerator(data_path, results_dir=results_dir, store=store_spec)
+    # Runs when the worker exits at pool shutdown, so write-behind stores commit what they queued
+    multiprocessing.util.Finalize(None, _worker_generator.close, exitpriority=10)
+
+
+def _generate_results_in_worker(user_profile: dict, user_id: Optional[int], catalog_version: str) -> Optional[str]:
+    # Follow the parent's catalog: reload when it has moved to a version this worker has not loaded
+    if _worker_generator.recommender.data_manager.version != catalog_version:
+        _worker_generator.reload_catalog()
+    return _worker_generator.generate_results(user_profile, user_id)
+
+
+def create_executor(result_generator: Optional[ResultGenerator] = None, kind: str = EXECUTOR_KIND,
+                    max_workers: int = EXECUTOR_WORKERS) -> InstrumentedExecutor:
+    """The shared pool; in process mode each worker loads the result generator's catalog once at start."""
+    if kind == 'process' and result_generator is not None:
+        return InstrumentedExecutor(kind, max_workers, _init_result_worker,
+                                    (result_generator.data_path, result_generator.results_dir,
+                                     result_generator.store_spec))
+    return InstrumentedExecutor(kind, max_workers)
+
+
+async def generate_results(bot_data: dict, user_profile: dict, user_id: Optional[int] = None) -> Optional[str]:
+    """Scores a profile and saves its result on the shared pool; returns the result ID, or None on failure."""
+    executor: InstrumentedExecutor = bot_data['executor']
+    result_generator: ResultGenerator = bot_data['result_generator']
+    try:
+        with metrics.timer('result_generation_seconds'):
+            if executor.kind == 'process':
+                return await executor.run(_generate_results_in_worker, dict(user_profile), user_id,
+                                          result_generator.recommender.data_manager.version)
+            return await executor.run(result_generator.generate_results, dict(user_profile), user_id)
+    except Exception as e:
+        # A scoring error, a broken worker pool or a pool already shut down: the handler replies with an error
+        logger.error(f"Generating results for user {user_id} failed: {e}")
+        return None
+
+
+# --- Application wiring ---
+
+def configure_execution(builder: ApplicationBuilder,
+                        max_concurrent_updates: int = CONCURRENT_UPDATES) -> ApplicationBuilder:
+    """Enables concurrent, per-user ordered update processing and shuts the pool down with the app."""
+    return builder.concurrent_updates(PerUserUpdateProcessor(max_concurrent_updates)).post_shutdown(shutdown_executor)
+
+
+def attach_executor(application: Application, executor: InstrumentedExecutor) -> None:
+    """Makes the pool available to handlers as bot_data['executor'] and schedules the stats log."""
+    application.bot_data['executor'] = executor
+    if EXECUTION_STATS_INTERVAL > 0 and application.job_queue is not None:
+        application.job_queue.run_repeating(log_execution_stats, interval=EXECUTION_STATS_INTERVAL,
+                                            first=EXECUTION_STATS_INTERVAL)
+
+
+def execution_stats(application: Application) -> Dict[str, Any]:
+    """Update-queue depth, per-user backlog and pool saturation, as one flat dict."""
+    stats = {'update_queue_depth': application.update_queue.qsize()}
+    processor = application.update_processor
+    if isinstance(processor, PerUserUpdateProcessor):
+        stats.update(processor.stats())
+    executor = application.bot_data.get('executor')
+    if executor is not None:
+        stats.update(executor.stats())
+    return stats
+
+
+async def log_execution_stats(context: ContextTypes.DEFAULT_TYPE) -> None:
+    stats = execution_stats(context.application)
+    logger.info("Execution stats: " + ", ".join(
+        f"{name}={value:.2f}" if isinstance(value, float) else f"{name}={value}" for name, value in stats.items()
+    ))
+
+
+async def shutdown_executor(application: Application) -> None:
+    executor = application.bot_data.get('executor')
+    if executor is not None:
+        await asyncio.to_thread(executor.shutdown)
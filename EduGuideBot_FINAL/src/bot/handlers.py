@@ -1,17 +1,24 @@
+import asyncio
 import logging
 import os
 import json
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
 
+from src.bot.conversation_state import ConversationRecord
+from src.bot.execution import generate_results
+from src.core import metrics
+
 logger = logging.getLogger(__name__)
 
 # Conversation states
 (START, LOCATION, BUDGET, MAJOR_FIELD, CAREER_GOAL, ENGLISH_PROFICIENCY, 
  CONFIRM_INFO, RESULTS, UNIVERSITY_DETAIL) = range(9)
 
-# Cached user data
-user_profiles = {}
+
+# How each step shows the next question: 'combined' (one edit of the tapped message) or 'separate'
+# (edit the answer in, send the question as a new message; the original layout)
+ONBOARDING_EDIT_MODE = os.getenv("ONBOARDING_EDIT_MODE", "combined")
 
 # Common location options in Cambodia
 LOCATIONS = ["Phnom Penh", "Siem Reap", "Battambang", "Any"]
@@ -28,131 +35,131 @@ CAREER_GOALS = [
     "វិស្វករ", "អ្នកគ្រប់គ្រង", "វេជ្ជបណ្ឌិត", "គ្រូបង្រៀន", "អ្នកកฎหមាយ"
 ]
 
+# Keyboards are built once at import; they only depend on the option lists above
+LOCATION_KEYBOARD = InlineKeyboardMarkup([[InlineKeyboardButton(loc, callback_data=loc)] for loc in LOCATIONS])
+# 3 buttons per row
+MAJOR_FIELD_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton(field, callback_data=field) for field in MAJOR_FIELDS[i:i + 3]]
+    for i in range(0, len(MAJOR_FIELDS), 3)
+])
+CAREER_GOAL_KEYBOARD = InlineKeyboardMarkup([[InlineKeyboardButton(goal, callback_data=goal)] for goal in CAREER_GOALS])
+# Scale from 1-10, 5 buttons per row
+ENGLISH_PROFICIENCY_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton(str(i), callback_data=str(i)) for i in range(row_start, row_start + 5)]
+    for row_start in (1, 6)
+])
+CONFIRM_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("ត្រឹមត្រូវ", callback_data="confirm_yes")],
+    [InlineKeyboardButton("ចាប់ផ្តើមម្តងទៀត", callback_data="confirm_no")]
+])
+
+WELCOME_TEXT = (
+    "សួស្តី! ខ្ញុំជា EduGuideBot ជំនួយក្នុងការស្វែងរក និងផ្តល់អនុសាសន៍សាកលវិទ្យាល័យនៅកម្ពុជា។ "
+    "សូមឆ្លើយនូវសំណួរមួយចំនួនដើម្បីទទួលបានការណែនាំល្អបំផុត។\n\n"
+    "តើអ្នកចង់រៀននៅខេត្ត/ក្រុងមួយណា?"
+)
+LOCATION_PROMPT = "សូមជ្រើសរើសទីតាំង:"
+
+async def advance(query, chosen_text: str, prompt: str, reply_markup=None) -> None:
+    """Acknowledges a button tap and shows the next question.
+
+    'combined' edits the tapped message into the answer plus the next question (2 API calls);
+    'separate' edits the answer in and sends the question as a new message (3 calls, sent concurrently).
+    """
+    if ONBOARDING_EDIT_MODE == "combined":
+        await asyncio.gather(
+            query.answer(),
+            query.message.edit_text(f"{chosen_text}\n\n{prompt}", reply_markup=reply_markup),
+        )
+    else:
+        await asyncio.gather(
+            query.answer(),
+            query.message.edit_text(chosen_text),
+            query.message.reply_text(prompt, reply_markup=reply_markup),
+        )
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start the conversation and ask for location."""
     user_id = update.effective_user.id
-    user_profiles[user_id] = {}
-    
-    await update.message.reply_text(
-        "សួស្តី! ខ្ញុំជា EduGuideBot ជំនួយក្នុងការស្វែងរក និងផ្តល់អនុសាសន៍សាកលវិទ្យាល័យនៅកម្ពុជា។ "
-        "សូមឆ្លើយនូវសំណួរមួយចំនួនដើម្បីទទួលបានការណែនាំល្អបំផុត។\n\n"
-        "តើអ្នកចង់រៀននៅខេត្ត/ក្រុងមួយណា?"
-    )
-    
-    keyboard = [[InlineKeyboardButton(loc, callback_data=loc)] for loc in LOCATIONS]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await update.message.reply_text("សូមជ្រើសរើសទីតាំង:", reply_markup=reply_markup)
+    await context.bot_data['conversations'].start(user_id, LOCATION)
+    
+    if ONBOARDING_EDIT_MODE == "combined":
+        await update.message.reply_text(f"{WELCOME_TEXT}\n\n{LOCATION_PROMPT}", reply_markup=LOCATION_KEYBOARD)
+    else:
+        # Two new messages: they must arrive in order, so these stay sequential
+        await update.message.reply_text(WELCOME_TEXT)
+        await update.message.reply_text(LOCATION_PROMPT, reply_markup=LOCATION_KEYBOARD)
     return LOCATION
 
-async def location_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def location_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, record: ConversationRecord) -> int:
     """Store the location and ask for budget."""
     query = update.callback_query
-    await query.answer()
-    
-    user_id = query.from_user.id
     location = query.data
-    user_profiles[user_id]['location'] = location
+    record.location = location
     
-    await query.message.edit_text(f"អ្នកបានជ្រើសរើសទីតាំង: {location}")
-    await query.message.reply_text(
+    await advance(
+        query,
+        f"អ្នកបានជ្រើសរើសទីតាំង: {location}",
         "សូមបញ្ចូលថវិកាអតិបរមារបស់អ្នកសម្រាប់ការសិក្សាក្នុងមួយឆ្នាំ (គិតជា USD):"
     )
     
     return BUDGET
 
-async def budget_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def budget_input(update: Update, context: ContextTypes.DEFAULT_TYPE, record: ConversationRecord) -> int:
     """Store the budget and ask for major field."""
-    user_id = update.effective_user.id
-    
     try:
         budget = int(update.message.text)
         if budget <= 0:
             raise ValueError
-        user_profiles[user_id]['max_budget'] = budget
+        record.max_budget = budget
     except ValueError:
         await update.message.reply_text("សូមបញ្ចូលលេខវិជ្ជមាន (ឧទា. 1000):")
         return BUDGET
     
-    # Create a keyboard with major field options
-    keyboard = []
-    row = []
-    for i, field in enumerate(MAJOR_FIELDS):
-        row.append(InlineKeyboardButton(field, callback_data=field))
-        if (i + 1) % 3 == 0:  # 3 buttons per row
-            keyboard.append(row)
-            row = []
-    if row:  # Add any remaining buttons
-        keyboard.append(row)
-        
-    reply_markup = InlineKeyboardMarkup(keyboard)
     await update.message.reply_text(
         "សូមជ្រើសរើសវិស័យសិក្សាដែលអ្នកចាប់អារម្មណ៍:",
-        reply_markup=reply_markup
+        reply_markup=MAJOR_FIELD_KEYBOARD
     )
     
     return MAJOR_FIELD
 
-async def major_field_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def major_field_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, record: ConversationRecord) -> int:
     """Store the major field and ask for career goal."""
     query = update.callback_query
-    await query.answer()
-    
-    user_id = query.from_user.id
     field = query.data
-    user_profiles[user_id]['core_field'] = field
-    
-    await query.message.edit_text(f"អ្នកបានជ្រើសរើសវិស័យសិក្សា: {field}")
+    record.core_field = field
     
-    # Create a keyboard for career goals
-    keyboard = [[InlineKeyboardButton(goal, callback_data=goal)] for goal in CAREER_GOALS]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.message.reply_text(
+    await advance(
+        query,
+        f"អ្នកបានជ្រើសរើសវិស័យសិក្សា: {field}",
         "តើអ្នកមានគោលដៅអាជីពអ្វីក្នុងរយៈពេលវែង?",
-        reply_markup=reply_markup
+        CAREER_GOAL_KEYBOARD
     )
     
     return CAREER_GOAL
 
-async def career_goal_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def career_goal_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, record: ConversationRecord) -> int:
     """Store the career goal and ask for English proficiency."""
     query = update.callback_query
-    await query.answer()
-    
-    user_id = query.from_user.id
     goal = query.data
-    user_profiles[user_id]['career_goal'] = goal
-    
-    await query.message.edit_text(f"អ្នកបានជ្រើសរើសគោលដៅអាជីព: {goal}")
-    
-    # Create a keyboard for English proficiency
-    keyboard = []
-    row = []
-    for i in range(1, 11):  # Scale from 1-10
-        row.append(InlineKeyboardButton(str(i), callback_data=str(i)))
-        if i % 5 == 0:  # 5 buttons per row
-            keyboard.append(row)
-            row = []
+    record.career_goal = goal
     
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.message.reply_text(
+    await advance(
+        query,
+        f"អ្នកបានជ្រើសរើសគោលដៅអាជីព: {goal}",
         "វាយតម្លៃជំនាញភាសាអង់គ្លេសរបស់អ្នកពី 1 ដល់ 10 (1 = ទាបបំផុត, 10 = ល្អបំផុត):",
-        reply_markup=reply_markup
+        ENGLISH_PROFICIENCY_KEYBOARD
     )
     
     return ENGLISH_PROFICIENCY
 
-async def english_proficiency_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def english_proficiency_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, record: ConversationRecord) -> int:
     """Store the English proficiency and show summary."""
     query = update.callback_query
-    await query.answer()
-    
-    user_id = query.from_user.id
     proficiency = int(query.data)
-    user_profiles[user_id]['english_proficiency'] = proficiency
+    record.english_proficiency = proficiency
     
-    user_data = user_profiles[user_id]
+    user_data = record.profile()
     
     # Show summary of collected information
     summary = (
@@ -165,59 +172,91 @@ async def english_proficiency_choice(update: Update, context: ContextTypes.DEFAU
         "តើព័ត៌មានខាងលើត្រឹមត្រូវឬទេ?"
     )
     
-    keyboard = [
-        [InlineKeyboardButton("ត្រឹមត្រូវ", callback_data="confirm_yes")],
-        [InlineKeyboardButton("ចាប់ផ្តើមម្តងទៀត", callback_data="confirm_no")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.message.edit_text(f"អ្នកបានជ្រើសរើសកម្រិតភាសាអង់គ្លេស: {proficiency}/10")
-    await query.message.reply_text(summary, reply_markup=reply_markup)
+    await advance(query, f"អ្នកបានជ្រើសរើសកម្រិតភាសាអង់គ្លេស: {proficiency}/10", summary, CONFIRM_KEYBOARD)
     
     return CONFIRM_INFO
 
-async def confirm_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+async def confirm_info(update: Update, context: ContextTypes.DEFAULT_TYPE, record: ConversationRecord) -> int:
     """Process confirmation and show recommendations or restart."""
     query = update.callback_query
-    await query.answer()
     
     if query.data == "confirm_no":
-        await query.message.edit_text("សូមចាប់ផ្តើមម្តងទៀត...")
-        await query.message.reply_text(
-            "សួស្តី! ខ្ញុំជា EduGuideBot ជំនួយក្នុងការស្វែងរក និងផ្តល់អនុសាសន៍សាកលវិទ្យាល័យនៅកម្ពុជា។ "
-            "សូមឆ្លើយនូវសំណួរមួយចំនួនដើម្បីទទួលបានការណែនាំល្អបំផុត។\n\n"
-            "តើអ្នកចង់រៀននៅខេត្ត/ក្រុងមួយណា?"
-        )
-        
-        keyboard = [[InlineKeyboardButton(loc, callback_data=loc)] for loc in LOCATIONS]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.message.reply_text("សូមជ្រើសរើសទីតាំង:", reply_markup=reply_markup)
-        
+        await advance(query, "សូមចាប់ផ្តើមម្តងទៀត...", f"{WELCOME_TEXT}\n\n{LOCATION_PROMPT}", LOCATION_KEYBOARD)
         return LOCATION
     
-    # Confirm and fetch recommendations
-    await query.message.edit_text("កំពុងស្វែងរកសាកលវិទ្យាល័យដែលសមស្របសម្រាប់អ្នក...")
-    
-    # This is where we would call the recommendation engine
-    # For now, let's return to the main conversation handler
     user_id = query.from_user.id
     
-    # Get recommendations using the recommender
-    # This would be properly initialized in the main app
-    github_pages_url = os.environ.get('GITHUB_PAGES_URL', 'https://example.com')
-    
-    await query.message.reply_text(
-        "ឥឡូវនេះអ្នកអាចមើលអនុសាសន៍របស់អ្នកតាមរយៈគេហទំព័រខាងក្រោម:\n\n"
-        f"{github_pages_url}/results.html?id={user_id}"
-    )
+    # Scoring and the result write run on the shared worker pool, so other users are not kept waiting
+    if ONBOARDING_EDIT_MODE == "combined":
+        # Scoring takes milliseconds, so the link replaces the summary in one edit without a progress message
+        _, result_id = await asyncio.gather(
+            query.answer(), generate_results(context.bot_data, record.profile(), user_id)
+        )
+    else:
+        await asyncio.gather(
+            query.answer(), query.message.edit_text("កំពុងស្វែងរកសាកលវិទ្យាល័យដែលសមស្របសម្រាប់អ្នក...")
+        )
+        result_id = await generate_results(context.bot_data, record.profile(), user_id)
+    
+    if result_id is None:
+        text = "មានបញ្ហាក្នុងការរៀបចំអនុសាសន៍។ សូមព្យាយាមម្តងទៀតដោយចុច /start"
+    else:
+        github_pages_url = os.environ.get('GITHUB_PAGES_URL', 'https://example.com')
+        text = (
+            "ឥឡូវនេះអ្នកអាចមើលអនុសាសន៍របស់អ្នកតាមរយៈគេហទំព័រខាងក្រោម:\n\n"
+            f"{github_pages_url}/results.html?id={result_id}"
+        )
     
-    # In a real implementation, we'd save the user profile and generate results
+    if ONBOARDING_EDIT_MODE == "combined":
+        await query.message.edit_text(text)
+    else:
+        await query.message.reply_text(text)
     
     return ConversationHandler.END
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Cancel and end the conversation."""
+    await context.bot_data['conversations'].discard(update.effective_user.id)
     await update.message.reply_text(
         "អរគុណ! បើអ្នកចង់ស្វែងរកសាកលវិទ្យាល័យម្តងទៀត សូមចុច /start"
     )
-    return ConversationHandler.END 
\ No newline at end of file
+    return ConversationHandler.END
+
+async def route_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Sends a tap or text answer to the step the user's onboarding is waiting in.
+
+    The step is kept in the conversation store rather than in ConversationHandler, so memory stays
+    bounded and a flow interrupted by a restart continues with the user's next tap.
+    """
+    store = context.bot_data['conversations']
+    user_id = update.effective_user.id
+    record = await store.get(user_id)
+    step = STATE_HANDLERS.get(record.state) if record is not None else None
+    if step is None:
+        # Never started, finished, or abandoned long enough ago to have expired
+        if update.callback_query:
+            await update.callback_query.answer("សូមចុច /start ដើម្បីចាប់ផ្តើមម្តងទៀត")
+        return
+    handler, expects_callback = step
+    if expects_callback != (update.callback_query is not None):
+        # e.g. a tap on an old keyboard while the bot waits for the typed budget
+        if update.callback_query:
+            await update.callback_query.answer()
+        return
+    with metrics.timer('onboarding_step_seconds', step=handler.__name__):
+        next_state = await handler(update, context, record)
+    if next_state == ConversationHandler.END:
+        await store.discard(user_id)
+    else:
+        record.state = next_state
+        await store.save(user_id, record)
+
+# State -> (handler, whether it answers a button tap rather than a text message)
+STATE_HANDLERS = {
+    LOCATION: (location_choice, True),
+    BUDGET: (budget_input, False),
+    MAJOR_FIELD: (major_field_choice, True),
+    CAREER_GOAL: (career_goal_choice, True),
+    ENGLISH_PROFICIENCY: (english_proficiency_choice, True),
+    CONFIRM_INFO: (confirm_info, True),
+}
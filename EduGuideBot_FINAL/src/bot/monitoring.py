@@ -0,0 +1,103 @@
+import logging
+import math
+import os
+from typing import Dict
+
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes
+
+from src.bot.execution import execution_stats
+from src.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Telegram user IDs allowed to run /stats, comma-separated; nobody else gets an answer
+METRICS_ADMIN_IDS = {int(user_id) for user_id in os.getenv("METRICS_ADMIN_IDS", "").split(",") if user_id.strip()}
+
+# Callback data routes of the main menu; anything else is counted as 'other' so labels stay bounded
+CALLBACK_ROUTES = {'launch_quiz', 'launch_browser', 'launch_calculator', 'career_start', 'career_show', 'back_to_main'}
+
+# Telegram rejects longer messages
+MAX_MESSAGE_LENGTH = 4096
+
+
+def callback_route(data: str | None) -> str:
+    """The route label of a button press: its callback data up to the first ':'."""
+    route = (data or '').split(':', 1)[0]
+    return route if route in CALLBACK_ROUTES else 'other'
+
+
+def instrument_handlers(application: Application) -> None:
+    """Times every registered handler callback into handler_seconds{handler=<callback name>}."""
+    if not metrics.METRICS_ENABLED:
+        return
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            handler.callback = metrics.timed('handler_seconds', handler=handler.callback.__name__)(handler.callback)
+
+
+def collect_bot_stats(application: Application) -> Dict[str, float]:
+    """Gauges from the counters the bot already keeps: execution, caches, recommender and render cache."""
+    bot_data = application.bot_data
+    stats = dict(execution_stats(application))
+    result_generator = bot_data.get('result_generator')
+    if result_generator is not None:
+        stats.update({f"result_cache_{name}": value for name, value in result_generator.cache_stats().items()})
+    conversations = bot_data.get('conversations')
+    if conversations is not None:
+        stats.update({f"conversation_cache_{name}": value for name, value in conversations.stats().items()})
+    recommender = bot_data.get('recommender') or (result_generator.recommender if result_generator else None)
+    if recommender is not None:
+        stats.update({f"recommender_{name}": value for name, value in recommender.get_topk_stats().items()})
+    render_cache = bot_data.get('render_cache')
+    if render_cache is not None:
+        stats['render_cache_build_seconds'] = render_cache.build_time
+        stats['render_cache_university_cards'] = len(render_cache.university_cards)
+    return stats
+
+
+def format_stats(application: Application) -> str:
+    lines = ["📊 Latency (p50 / p95 / p99 ms, count)"]
+    for series, entry in metrics.REGISTRY.summary().items():
+        if not entry['count']:
+            continue
+        quantiles = " / ".join(
+            "-" if math.isnan(entry[name]) else f"{entry[name] * 1000:.1f}" for name in ('p50', 'p95', 'p99')
+        )
+        lines.append(f"{series}: {quantiles} ({entry['count']})")
+    if len(lines) == 1:
+        lines.append("no samples yet")
+    lines.append("")
+    lines.append("⚙️ Counters")
+    for name, value in collect_bot_stats(application).items():
+        if isinstance(value, float):
+            lines.append(f"{name}: {value:.2f}")
+        elif isinstance(value, (int, str)):
+            lines.append(f"{name}: {value}")
+    text = "\n".join(lines)
+    return text if len(text) <= MAX_MESSAGE_LENGTH else text[:MAX_MESSAGE_LENGTH - 1] + "…"
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Admin-only summary of handler and hot-path latencies plus the bot's counters."""
+    if update.effective_user is None or update.effective_user.id not in METRICS_ADMIN_IDS:
+        return
+    await update.message.reply_text(format_stats(context.application))
+
+
+def attach_metrics(application: Application) -> None:
+    """Instruments the registered handlers, adds /stats and starts the Prometheus endpoint.
+
+    Call after every other handler is registered. Does nothing unless METRICS_ENABLED=1.
+    With BOT_EXECUTOR=process, scoring and result writes are timed inside the worker processes
+    and do not show up here; result_generation_seconds still covers them end to end.
+    """
+    if not metrics.METRICS_ENABLED:
+        return
+    instrument_handlers(application)
+    application.add_handler(CommandHandler("stats", stats_command))
+    metrics.register_collector('bot', lambda: collect_bot_stats(application))
+    application.bot_data['metrics_server'] = metrics.start_metrics_server()
+    if not METRICS_ADMIN_IDS:
+        logger.warning("Metrics enabled but METRICS_ADMIN_IDS is empty: /stats will not answer anyone.")
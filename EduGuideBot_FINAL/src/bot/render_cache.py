@@ -0,0 +1,130 @@
+import logging
+import time
+from typing import Dict, NamedTuple, Optional
+
+from telegram import (
+    InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove, WebAppInfo
+)
+from telegram.constants import ParseMode
+
+from src.core.career_data import CAREER_PATHS
+from src.core.data_loader import UniversityDataManager
+
+logger = logging.getLogger(__name__)
+
+WEB_APP_BUTTON_TEXT = {
+    'quiz': '🔬 បើកការវិភាគ',
+    'browser': '📚 បើកកាតាឡុក',
+    'calculator': '💰 បើកការគណនា'
+}
+
+
+class Rendered(NamedTuple):
+    """A ready-to-send message: pass the fields straight to reply_text / edit_message_text."""
+    text: str
+    reply_markup: Optional[object] = None
+    parse_mode: Optional[str] = None
+
+
+def build_main_menu_keyboard():
+    """Creates the main menu with corrected Khmer text."""
+    keyboard = [
+        [InlineKeyboardButton("🧬 វិភាគ DNA និស្សិត", callback_data='launch_quiz')],
+        [InlineKeyboardButton("📚 កាតាឡុកសាកលវិទ្យាល័យ", callback_data='launch_browser')],
+        [InlineKeyboardButton("🚀 ស្វែងយល់ពីអាជីព", callback_data='career_start')],
+        [InlineKeyboardButton("💰 អ្នកគណនាថ្លៃសិក្សា", callback_data='launch_calculator')],
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def format_university_details(uni: dict) -> str:
+    """Helper function to format a university object into a nice string."""
+    details = []
+    details.append(f"*{uni['name_km']}* ({uni['name_en']})")
+    details.append(f"📍 *ទីតាំង:* {uni['location']}")
+    details.append(f"🏛️ *ប្រភេទ:* {uni['type']}")
+    details.append(f"💰 *តម្លៃសិក្សា:* ${uni['tuition_fees']['range_min']} - ${uni['tuition_fees']['range_max']} /ឆ្នាំ")
+    details.append(f"📞 *ទំនាក់ទំនង:* {', '.join(uni['contact']['phones'])}")
+    details.append(f"🌐 *គេហទំព័រ:* {uni['contact']['website']}")
+    return "\n".join(details)
+
+def format_career_page(career_info: dict | None) -> str:
+    if not career_info:
+        return "មិនមានព័ត៌មានទេ។"
+    return (
+        f"*{career_info['title']}*\n\n"
+        f"**{career_info['entry_level']['title']}**\n"
+        f"  - *ตำแหน่ง:* {career_info['entry_level']['roles']}\n"
+        f"  - *เงินเดือนโดยประมาณ:* {career_info['entry_level']['salary']}\n\n"
+        f"**{career_info['mid_level']['title']}**\n"
+        f"  - *ตำแหน่ง:* {career_info['mid_level']['roles']}\n"
+        f"  - *เงินเดือนโดยประมาณ:* {career_info['mid_level']['salary']}\n\n"
+        f"**{career_info['senior_level']['title']}**\n"
+        f"  - *ตำแหน่ง:* {career_info['senior_level']['roles']}\n"
+        f"  - *เงินเดือนโดยประมาณ:* {career_info['senior_level']['salary']}\n\n"
+        f"**แนวโน้มในอนาคต:** {career_info['future_trend']}"
+    )
+
+
+class RenderCache:
+    """Every menu, career page and university card, rendered once from static data and the catalog.
+
+    Handlers only look a Rendered message up. Built off the event loop at startup and again
+    whenever the catalog is reloaded; the old instance keeps serving until the new one is swapped in.
+    """
+
+    def __init__(self, data_manager: UniversityDataManager, base_url: Optional[str]):
+        started = time.perf_counter()
+        self.catalog_version = data_manager.version
+
+        self.main_menu = Rendered("នេះគឺជាផ្ទាំងគ្រប់គ្រងរបស់អ្នក។\n\n**សូមជ្រើសរើសឧបករណ៍៖**",
+                                  build_main_menu_keyboard(), ParseMode.MARKDOWN)
+        self.welcome = Rendered("សូមស្វាគមន៍!", ReplyKeyboardRemove())
+
+        # Web App launchers, keyed by the app name in 'launch_<name>' callback data
+        self.launchers: Dict[str, Rendered] = {}
+        for app_name in ('quiz', 'browser', 'calculator'):
+            self.launchers[app_name] = self._launcher(app_name, base_url)
+        self._base_url = base_url
+
+        keyboard = [[InlineKeyboardButton(major, callback_data=f"career_show:{major}")] for major in CAREER_PATHS]
+        keyboard.append([InlineKeyboardButton("⬅️ ត្រឡប់ទៅเมนูหลัก", callback_data='back_to_main')])
+        self.career_menu = Rendered("សូមជ្រើសរើសវិស័យដែលអ្នកចាប់អារម្មណ៍៖", InlineKeyboardMarkup(keyboard))
+        back_to_careers = InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ ត្រឡប់ទៅវិញ", callback_data="career_start")]])
+        self.career_pages: Dict[str, Rendered] = {
+            major: Rendered(format_career_page(info), back_to_careers, ParseMode.MARKDOWN)
+            for major, info in CAREER_PATHS.items()
+        }
+        self.career_not_found = Rendered(format_career_page(None), back_to_careers, ParseMode.MARKDOWN)
+
+        self.university_cards: Dict[object, Rendered] = {}
+        remove_keyboard = ReplyKeyboardRemove()
+        for uni in data_manager.get_all_universities():
+            try:
+                self.university_cards[uni['id']] = Rendered(format_university_details(uni), remove_keyboard,
+                                                            ParseMode.MARKDOWN)
+            except (KeyError, TypeError) as e:
+                logger.warning(f"University {uni.get('id')} has no card, a field is missing: {e}")
+        self.build_time = time.perf_counter() - started
+        logger.info(f"Render cache built in {self.build_time * 1000:.1f} ms "
+                    f"({len(self.university_cards)} university cards, catalog {self.catalog_version})")
+
+    @staticmethod
+    def _launcher(app_name: str, base_url: Optional[str]) -> Rendered:
+        url = f"{base_url}/static/{app_name}/index.html"
+        button_text = WEB_APP_BUTTON_TEXT.get(app_name, "បើក Web App")
+        return Rendered(
+            "ចុចប៊ូតុងខាងក្រោមដើម្បីបើក៖",
+            ReplyKeyboardMarkup.from_button(KeyboardButton(text=button_text, web_app=WebAppInfo(url=url)),
+                                            resize_keyboard=True)
+        )
+
+    def launcher(self, app_name: str) -> Rendered:
+        rendered = self.launchers.get(app_name)
+        # Unknown names are rare (hand-crafted callback data) and not worth caching
+        return rendered if rendered is not None else self._launcher(app_name, self._base_url)
+
+    def career_page(self, major: str) -> Rendered:
+        return self.career_pages.get(major, self.career_not_found)
+
+    def university_card(self, uni_id) -> Optional[Rendered]:
+        return self.university_cards.get(uni_id)
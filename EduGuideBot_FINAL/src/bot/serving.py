@@ -0,0 +1,121 @@
+import contextlib
+import logging
+import os
+import re
+from typing import Any, Dict, Optional, Sequence
+
+from aiolimiter import AsyncLimiter
+from telegram.ext import AIORateLimiter, Application, ApplicationBuilder
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# 'polling' (getUpdates loop) or 'webhook' (Telegram POSTs updates to an embedded HTTP server)
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+# Public base URL that reaches WEBHOOK_LISTEN:WEBHOOK_PORT (e.g. behind a TLS-terminating proxy)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+# Sent back by Telegram in X-Telegram-Bot-Api-Secret-Token; requests without it are rejected
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+# Bot API root, for a self-hosted Bot API server or scripts/fake_bot_api.py; defaults to api.telegram.org
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+# Outbound Bot API calls: messages per second across all chats (0 disables the overall limit),
+# messages per minute into each group chat, and retries of a call Telegram answers with 429
+BOT_RATE_LIMIT = float(os.getenv("BOT_RATE_LIMIT", "30"))
+BOT_GROUP_RATE_LIMIT = float(os.getenv("BOT_GROUP_RATE_LIMIT", "20"))
+# Messages per second into one private chat (0 disables), and how many may go out back to back
+# before that rate applies; Telegram tolerates short bursts but throttles a chat at about 1/s
+BOT_CHAT_RATE_LIMIT = float(os.getenv("BOT_CHAT_RATE_LIMIT", "1"))
+BOT_CHAT_BURST = int(os.getenv("BOT_CHAT_BURST", "3"))
+BOT_MAX_RETRIES = int(os.getenv("BOT_MAX_RETRIES", "3"))
+
+# Telegram only accepts these characters in a secret token
+SECRET_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,256}")
+
+
+class ChatRateLimiter(AIORateLimiter):
+    """AIORateLimiter plus a limit per private chat.
+
+    PTB's limiter only bounds overall traffic and each group; messages to a single user are only
+    held back by the overall limit. Here every private chat also gets its own leaky bucket of
+    `chat_burst` messages refilled at `chat_max_rate` per second. Calls without a chat (such as
+    answerCallbackQuery) are not counted against any chat.
+    """
+
+    # Idle chat limiters are dropped once there are more than this many
+    MAX_IDLE_CHAT_LIMITERS = 1024
+
+    def __init__(self, chat_max_rate: float = 1, chat_burst: int = 3, **kwargs):
+        super().__init__(**kwargs)
+        self._chat_max_rate = chat_max_rate
+        self._chat_burst = max(1, chat_burst)
+        self._chat_limiters: Dict[int, AsyncLimiter] = {}
+
+    def _get_chat_limiter(self, chat_id: int) -> AsyncLimiter:
+        limiter = self._chat_limiters.get(chat_id)
+        if limiter is None:
+            if len(self._chat_limiters) > self.MAX_IDLE_CHAT_LIMITERS:
+                # A limiter back at full capacity has no history worth keeping
+                for key, idle in list(self._chat_limiters.items()):
+                    if idle.has_capacity(idle.max_rate):
+                        del self._chat_limiters[key]
+            limiter = self._chat_limiters[chat_id] = AsyncLimiter(
+                max_rate=self._chat_burst, time_period=self._chat_burst / self._chat_max_rate)
+        return limiter
+
+    async def process_request(self, callback, args: Any, kwargs: Dict[str, Any], endpoint: str,
+                              data: Dict[str, Any], rate_limit_args: Optional[int]):
+        chat_id = data.get("chat_id")
+        with contextlib.suppress(ValueError, TypeError):
+            chat_id = int(chat_id)
+        # Positive IDs are users' private chats; groups and channels are limited by the base class
+        if self._chat_max_rate and isinstance(chat_id, int) and chat_id > 0:
+            await self._get_chat_limiter(chat_id).acquire()
+        return await super().process_request(callback, args, kwargs, endpoint, data, rate_limit_args)
+
+
+def application_builder(token: str) -> ApplicationBuilder:
+    """Application.builder() with the token, the outbound rate limiter and, if set, the TELEGRAM_API_URL endpoint.
+
+    Every handler's calls go through one limiter: calls over the overall, group or per-chat limit
+    wait their turn instead of being refused, and a 429 pauses all calls for its retry_after and
+    then retries the call.
+    """
+    builder = Application.builder().token(token).rate_limiter(ChatRateLimiter(
+        chat_max_rate=BOT_CHAT_RATE_LIMIT,
+        chat_burst=BOT_CHAT_BURST,
+        overall_max_rate=BOT_RATE_LIMIT,
+        overall_time_period=1,
+        group_max_rate=BOT_GROUP_RATE_LIMIT,
+        group_time_period=60,
+        max_retries=BOT_MAX_RETRIES,
+    ))
+    if TELEGRAM_API_URL:
+        builder = builder.base_url(f"{TELEGRAM_API_URL.rstrip('/')}/bot")
+    return builder
+
+
+def run_application(application: Application, allowed_updates: Optional[Sequence[str]] = None) -> None:
+    """Runs the application in BOT_MODE until stopped; both modes dispatch to the same handlers."""
+    if BOT_MODE == "polling":
+        application.run_polling(allowed_updates=allowed_updates)
+    elif BOT_MODE == "webhook":
+        if not WEBHOOK_URL or not WEBHOOK_SECRET:
+            logger.critical("FATAL: Webhook mode needs WEBHOOK_URL and WEBHOOK_SECRET.")
+            return
+        if not SECRET_TOKEN_PATTERN.fullmatch(WEBHOOK_SECRET):
+            logger.critical("FATAL: WEBHOOK_SECRET may only contain A-Z, a-z, 0-9, _ and - (at most 256 characters).")
+            return
+        logger.info(f"Serving webhook on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}")
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=allowed_updates,
+        )
+    else:
+        logger.critical(f"FATAL: Unknown BOT_MODE {BOT_MODE!r} (expected 'polling' or 'webhook').")
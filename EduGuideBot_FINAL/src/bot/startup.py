@@ -0,0 +1,28 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Records wall-clock time per named startup phase (imports, service init, model load)."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.phases = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def report(self) -> str:
+        total = time.perf_counter() - self._started
+        width = max([len(name) for name, _ in self.phases] + [len("total")])
+        lines = ["--- Startup profile ---"]
+        lines += [f"{name:<{width}}  {seconds * 1000:9.1f} ms" for name, seconds in self.phases]
+        lines.append(f"{'total':<{width}}  {total * 1000:9.1f} ms")
+        return "\n".join(lines)
+
@@ -0,0 +1,84 @@
+import threading
+import warnings
+
+import numpy as np
+
+from src.core import metrics
+from src.core.compiled_model import CompiledLogisticModel, expit
+from src.core.data_loader import UniversityDataManager
+
+# Per-student inputs, in the names the training script used
+STUDENT_FEATURES = ('gpa', 'english_proficiency', 'extracurriculars')
+UNIVERSITY_FEATURE = 'applied_university_id'
+MAJOR_PREFIX = 'major_'
+
+
+class AdmissionPredictor:
+    """Admission chances for one student at every (university, major category) the catalog offers.
+
+    The one-hot design matrix is laid out once from the model's column blueprint: the
+    university id and major dummies never change, so a request only writes the student's
+    three features into a preallocated array and calls `predict_proba` once, with no pandas.
+    With a `CompiledLogisticModel` the fixed columns' share of every logit is computed up
+    front, and a request is three multiply-adds per row plus the sigmoid.
+    """
+
+    def __init__(self, model, columns: list, data_manager: UniversityDataManager):
+        self.model = model
+        self.columns = list(columns)
+        column_index = {name: i for i, name in enumerate(self.columns)}
+        self._student_columns = [column_index[name] for name in STUDENT_FEATURES]
+
+        pairs = []
+        for category in data_manager.get_categories():
+            for uni_id in data_manager.get_category_counts(category):
+                pairs.append((data_manager.get_position(uni_id), uni_id, category))
+        pairs.sort(key=lambda pair: (pair[0], str(pair[2])))
+        self.university_ids = np.array([uni_id for _, uni_id, _ in pairs], dtype=np.int64)
+        self.categories = [category for _, _, category in pairs]
+
+        # Categories the model never saw get all-zero dummies, exactly like get_dummies + reindex
+        self._template = np.zeros((len(pairs), len(self.columns)), dtype=np.float64)
+        self._template[:, column_index[UNIVERSITY_FEATURE]] = self.university_ids
+        for row, category in enumerate(self.categories):
+            major_column = column_index.get(f"{MAJOR_PREFIX}{category}")
+            if major_column is not None:
+                self._template[row, major_column] = 1.0
+        self._buffers = threading.local()
+
+        self._base_logits = None
+        if isinstance(model, CompiledLogisticModel):
+            fixed = np.ones(len(self.columns), dtype=bool)
+            fixed[self._student_columns] = False
+            self._base_logits = self._template[:, fixed] @ model.coef[fixed] + model.intercept
+            self._student_coef = model.coef[self._student_columns]
+
+    def _design_matrix(self) -> np.ndarray:
+        # One working copy of the template per thread, reused across requests
+        design = getattr(self._buffers, 'design', None)
+        if design is None:
+            design = self._buffers.design = self._template.copy()
+        return design
+
+    @metrics.timed('model_inference_seconds')
+    def predict_all(self, gpa: float, english_proficiency: int, extracurriculars: int) -> np.ndarray:
+        """Admission probability for every (university, category) row, aligned with `university_ids`/`categories`."""
+        if not len(self._template):
+            return np.empty(0)
+        if self._base_logits is not None:
+            return expit(self._base_logits + float(np.dot((gpa, english_proficiency, extracurriculars),
+                                                          self._student_coef)))
+        design = self._design_matrix()
+        design[:, self._student_columns] = (gpa, english_proficiency, extracurriculars)
+        with warnings.catch_warnings():
+            # The model was fitted on a DataFrame; the column order here is the one it saw
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            return self.model.predict_proba(design)[:, 1]
+
+    def predict_by_university(self, gpa: float, english_proficiency: int, extracurriculars: int) -> dict:
+        """Maps uni_id -> {category: probability}."""
+        chances = {}
+        for uni_id, category, probability in zip(self.university_ids.tolist(), self.categories,
+                                                 self.predict_all(gpa, english_proficiency, extracurriculars).tolist()):
+            chances.setdefault(uni_id, {})[category] = probability
+        return chances
@@ -0,0 +1,341 @@
+"""
+Compact binary snapshot of the university catalog.
+
+`data.json` is compiled into a single versioned file that is memory-mapped on load:
+
+* a header with the format version and the source file's size, mtime and SHA-256,
+* an interned string table (names, categories, locations, dict keys, ...),
+* numeric columns used to build the indexes (ids, tuition, location, majors),
+* a "tape" of int64 (tag, payload) pairs that encodes every record exactly, so a
+  university dict is only decoded when somebody actually asks for it.
+
+Because the arrays are views on a read-only mapping, worker processes that open the
+same snapshot share its pages instead of each holding a parsed copy of the JSON.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EGBCAT'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<6sHQq32sI')
+SECTION = struct.Struct('<QQ')
+
+# Section order is part of the format: (name, dtype)
+SECTIONS = [
+    ('string_offsets', np.int64),
+    ('string_blob', np.uint8),
+    ('record_offsets', np.int64),
+    ('tape', np.int64),
+    ('ids', np.int64),
+    ('tuition_min', np.float64),
+    ('tuition_max', np.float64),
+    ('location', np.int32),
+    ('major_uni', np.int32),
+    ('major_category', np.int32),
+]
+
+# Tape tags; every node is a (tag, payload) pair
+NULL, FALSE, TRUE, INT, FLOAT, STR, LIST, DICT = range(8)
+
+_FLOAT_BITS = struct.Struct('<d')
+_INT_BITS = struct.Struct('<q')
+
+
+def snapshot_path_for(data_path: str) -> str:
+    return os.path.splitext(data_path)[0] + '.catalog.bin'
+
+
+class _StringInterner:
+    def __init__(self):
+        self.codes = {}
+        self.strings = []
+
+    def __call__(self, value) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+
+def catalog_columns(universities: list, intern=None) -> dict:
+    """Columnar view of the fields the indexes need; strings are replaced by interned codes (-1 for missing)."""
+    intern = intern or _StringInterner()
+    major_uni, major_category = [], []
+    for position, uni in enumerate(universities):
+        for faculty in uni.get('faculties', []):
+            for major in faculty.get('majors', []):
+                major_uni.append(position)
+                major_category.append(intern(major.get('category_km')))
+    return {
+        'ids': np.array([uni['id'] for uni in universities], dtype=np.int64),
+        'tuition_min': np.array([uni['tuition_fees']['range_min'] for uni in universities], dtype=np.float64),
+        'tuition_max': np.array([uni['tuition_fees']['range_max'] for uni in universities], dtype=np.float64),
+        'location': np.array([intern(uni.get('location')) for uni in universities], dtype=np.int32),
+        'major_uni': np.array(major_uni, dtype=np.int32),
+        'major_category': np.array(major_category, dtype=np.int32),
+        'string': lambda code: intern.strings[code] if code >= 0 else None,
+    }
+
+
+def _encode(value, tape: list, intern: _StringInterner) -> None:
+    if value is None:
+        tape += (NULL, 0)
+    elif value is True:
+        tape += (TRUE, 0)
+    elif value is False:
+        tape += (FALSE, 0)
+    elif isinstance(value, int):
+        tape += (INT, value)
+    elif isinstance(value, float):
+        tape += (FLOAT, _INT_BITS.unpack(_FLOAT_BITS.pack(value))[0])
+    elif isinstance(value, str):
+        tape += (STR, intern(value))
+    elif isinstance(value, list):
+        tape += (LIST, len(value))
+        for item in value:
+            _encode(item, tape, intern)
+    elif isinstance(value, dict):
+        tape += (DICT, len(value))
+        for key, item in value.items():
+            tape.append(intern(key))
+            _encode(item, tape, intern)
+    else:
+        raise TypeError(f"Cannot store {type(value).__name__} in a catalog snapshot")
+
+
+def compile_snapshot(data_path: str, snapshot_path: str | None = None, raw: bytes | None = None) -> str:
+    """Compiles `data_path` into a snapshot file (written atomically) and returns its path."""
+    snapshot_path = snapshot_path or snapshot_path_for(data_path)
+    stat = os.stat(data_path)
+    if raw is None:
+        with open(data_path, 'rb') as f:
+            raw = f.read()
+    universities = json.loads(raw.decode('utf-8'))
+
+    intern = _StringInterner()
+    columns = catalog_columns(universities, intern)
+    tape, record_offsets = [], [0]
+    for uni in universities:
+        _encode(uni, tape, intern)
+        record_offsets.append(len(tape))
+
+    encoded = [s.encode('utf-8') for s in intern.strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+    arrays = {
+        'string_offsets': string_offsets,
+        'string_blob': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+        'record_offsets': np.array(record_offsets, dtype=np.int64),
+        'tape': np.array(tape, dtype=np.int64),
+        **{name: columns[name] for name in ('ids', 'tuition_min', 'tuition_max', 'location', 'major_uni', 'major_category')},
+    }
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, stat.st_size, stat.st_mtime_ns,
+                         hashlib.sha256(raw).digest(), len(SECTIONS))
+    offset = _align(HEADER.size + SECTION.size * len(SECTIONS))
+    table, payloads = [], []
+    for name, dtype in SECTIONS:
+        data = np.ascontiguousarray(arrays[name], dtype=dtype).tobytes()
+        table.append(SECTION.pack(offset, len(data)))
+        payloads.append((offset, data))
+        offset = _align(offset + len(data))
+
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(b''.join(table))
+            for section_offset, data in payloads:
+                f.seek(section_offset)
+                f.write(data)
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    logger.info(f"Compiled catalog snapshot {snapshot_path} ({len(universities)} universities, {offset} bytes)")
+    return snapshot_path
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped catalog snapshot."""
+
+    def __init__(self, snapshot_path: str):
+        self.path = snapshot_path
+        with open(snapshot_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.arrays = {}
+        try:
+            self._map_sections()
+        except BaseException:
+            self.close()
+            raise
+        self.version = self.source_sha256.hex()[:16]
+        self._strings = {}
+        self.universities = SnapshotUniversities(self)
+
+    def _map_sections(self) -> None:
+        magic, fmt, self.source_size, self.source_mtime_ns, self.source_sha256, n_sections = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION or n_sections != len(SECTIONS):
+            raise ValueError(f"{self.path} is not a format {FORMAT_VERSION} catalog snapshot")
+        for i, (name, dtype) in enumerate(SECTIONS):
+            offset, nbytes = SECTION.unpack_from(self._mmap, HEADER.size + SECTION.size * i)
+            if nbytes == 0:
+                self.arrays[name] = np.empty(0, dtype=dtype)
+                continue
+            if offset + nbytes > len(self._mmap):
+                raise ValueError(f"{self.path} is truncated")
+            self.arrays[name] = np.frombuffer(self._mmap, dtype=dtype, count=nbytes // np.dtype(dtype).itemsize, offset=offset)
+
+    def close(self) -> None:
+        """Unmaps a snapshot nobody has taken columns from; records decoded before this stay usable.
+
+        Raises BufferError while views handed out by `columns()` are alive. A snapshot that is in use is
+        not closed explicitly: the mapping is released when its last view is garbage-collected.
+        """
+        if self._mmap is None:
+            return
+        self.arrays = {}
+        self._mmap.close()
+        self._mmap = None
+
+    def is_fresh_for(self, data_path: str, raw: bytes | None = None) -> bool:
+        """True if the snapshot was compiled from the current contents of `data_path`.
+
+        Size and mtime are checked first; only when they differ is the source re-hashed.
+        """
+        stat = os.stat(data_path)
+        if stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns:
+            return True
+        if raw is None:
+            with open(data_path, 'rb') as f:
+                raw = f.read()
+        return hashlib.sha256(raw).digest() == self.source_sha256
+
+    def string(self, code: int) -> str | None:
+        if code < 0:
+            return None
+        value = self._strings.get(code)
+        if value is None:
+            offsets = self.arrays['string_offsets']
+            value = self._strings[code] = bytes(self.arrays['string_blob'][offsets[code]:offsets[code + 1]]).decode('utf-8')
+        return value
+
+    def columns(self) -> dict:
+        columns = {name: self.arrays[name] for name in ('ids', 'tuition_min', 'tuition_max', 'location', 'major_uni', 'major_category')}
+        columns['string'] = self.string
+        return columns
+
+    def record(self, position: int) -> dict:
+        if self._mmap is None:
+            raise ValueError(f"Catalog snapshot {self.path} is closed")
+        offsets = self.arrays['record_offsets']
+        tape = self.arrays['tape'][offsets[position]:offsets[position + 1]].tolist()
+        value, _ = self._decode(tape, 0)
+        return value
+
+    def _decode(self, tape: list, i: int) -> tuple:
+        tag, payload = tape[i], tape[i + 1]
+        i += 2
+        if tag == STR:
+            return self.string(payload), i
+        if tag == INT:
+            return payload, i
+        if tag == DICT:
+            value = {}
+            for _ in range(payload):
+                key = self.string(tape[i])
+                value[key], i = self._decode(tape, i + 1)
+            return value, i
+        if tag == LIST:
+            value = []
+            for _ in range(payload):
+                item, i = self._decode(tape, i)
+                value.append(item)
+            return value, i
+        if tag == FLOAT:
+            return _FLOAT_BITS.unpack(_INT_BITS.pack(payload))[0], i
+        return {NULL: None, TRUE: True, FALSE: False}[tag], i
+
+
+class SnapshotUniversities(Sequence):
+    """List-like view of the catalog that decodes university dicts on first access."""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+        self._size = len(snapshot.arrays['ids'])
+        self._decoded = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._size))]
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError(position)
+        uni = self._decoded.get(position)
+        if uni is None:
+            uni = self._decoded[position] = self._snapshot.record(position)
+        return uni
+
+
+def load_snapshot(data_path: str, snapshot_path: str | None = None) -> CatalogSnapshot | None:
+    """Opens the snapshot for `data_path`, compiling it first if it is missing, stale or unreadable.
+
+    Returns None when no usable snapshot can be produced; callers then fall back to JSON.
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(data_path)
+    if not os.path.exists(data_path):
+        if not os.path.exists(snapshot_path):
+            return None
+        try:
+            snapshot = CatalogSnapshot(snapshot_path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"{data_path} is missing and catalog snapshot {snapshot_path} is unreadable: {e}")
+            return None
+        logger.warning(f"{data_path} is missing, serving the catalog from {snapshot_path}")
+        return snapshot
+    snapshot = None
+    try:
+        snapshot = CatalogSnapshot(snapshot_path)
+        if snapshot.is_fresh_for(data_path):
+            return snapshot
+        logger.info(f"Catalog snapshot {snapshot_path} is stale, rebuilding")
+    except FileNotFoundError:
+        logger.info(f"No catalog snapshot at {snapshot_path}, compiling one")
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Ignoring unreadable catalog snapshot {snapshot_path}: {e}")
+    if snapshot is not None:
+        snapshot.close()
+    try:
+        return CatalogSnapshot(compile_snapshot(data_path, snapshot_path))
+    except (OSError, ValueError, TypeError, KeyError, OverflowError, struct.error) as e:
+        logger.warning(f"Could not compile catalog snapshot for {data_path}: {e}")
+        return None
+
+if __name__ == '__main__':
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    for path in sys.argv[1:] or ['data/data.json']:
+        compile_snapshot(path)
@@ -0,0 +1,99 @@
+import logging
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from src.core.data_loader import UniversityDataManager
+from src.core.recommender import UniversityRecommender
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogValidationError(Exception):
+    """Raised when a freshly loaded catalog is not safe to serve."""
+
+
+class CatalogReload(NamedTuple):
+    data_manager: UniversityDataManager
+    recommender: UniversityRecommender
+    added: int
+    removed: int
+    changed: int
+    duration: float
+    # File signature the catalog was read at; recorded by CatalogWatcher.commit
+    signature: tuple | None
+
+
+def validate_catalog(data_manager: UniversityDataManager) -> None:
+    """Cheap structural checks on the catalog columns; raises CatalogValidationError on the first problem."""
+    if not len(data_manager.get_all_universities()):
+        raise CatalogValidationError("catalog is empty or could not be parsed")
+    columns = data_manager.columns
+    if len(np.unique(columns['ids'])) != len(columns['ids']):
+        raise CatalogValidationError("duplicate university ids")
+    if np.isnan(columns['tuition_min']).any() or np.isnan(columns['tuition_max']).any():
+        raise CatalogValidationError("missing tuition fees")
+    if (columns['tuition_min'] > columns['tuition_max']).any():
+        raise CatalogValidationError("tuition range_min is greater than range_max")
+
+
+def diff_catalogs(old: UniversityDataManager | None, new: UniversityDataManager) -> tuple:
+    """Returns (added, removed, changed) university counts between two catalogs."""
+    old_ids = set(old.columns['ids'].tolist()) if old is not None and old.columns else set()
+    new_ids = set(new.columns['ids'].tolist())
+    changed = sum(1 for uni_id in old_ids & new_ids
+                  if old.get_university_by_id(uni_id) != new.get_university_by_id(uni_id))
+    return len(new_ids - old_ids), len(old_ids - new_ids), changed
+
+
+class CatalogWatcher:
+    """Polls the catalog file and builds a replacement data manager + recommender when it changes.
+
+    `rebuild()` does all the heavy work and is meant to run off the event loop; the caller
+    swaps the returned objects in and then calls `commit()`. Until then the watcher still reports
+    the change, so a swap that fails is retried on the next poll. A rebuild that fails validation
+    leaves the old catalog in place and is not retried until the file changes again.
+    """
+
+    def __init__(self, data_path: str, current: UniversityDataManager | None = None):
+        self.data_path = data_path
+        self.current = current
+        self._signature = self._stat_signature()
+
+    def _stat_signature(self) -> tuple | None:
+        try:
+            stat = os.stat(self.data_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def has_changed(self) -> bool:
+        signature = self._stat_signature()
+        return signature is not None and signature != self._signature
+
+    def rebuild(self) -> CatalogReload:
+        started = time.perf_counter()
+        # Take the signature first: if the file changes again while we load, the next poll picks it up
+        signature = self._stat_signature()
+        try:
+            data_manager = UniversityDataManager(self.data_path)
+            validate_catalog(data_manager)
+            recommender = UniversityRecommender(data_manager)
+        except Exception:
+            # A broken file stays broken until it is edited again
+            self._signature = signature
+            raise
+        added, removed, changed = diff_catalogs(self.current, data_manager)
+        return CatalogReload(data_manager, recommender, added, removed, changed, time.perf_counter() - started,
+                             signature)
+
+    def commit(self, reload: CatalogReload) -> None:
+        """Records a rebuilt catalog as the one being served, once the caller has swapped it in.
+
+        The replaced catalog is not closed here: handlers and pool threads already running may still
+        be reading it. Its snapshot is unmapped when the last of them drops its reference.
+        """
+        self.current = reload.data_manager
+        self._signature = reload.signature
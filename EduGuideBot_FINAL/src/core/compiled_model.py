@@ -0,0 +1,79 @@
+import hashlib
+
+import numpy as np
+
+# Bumped if the array layout inside the .npz changes
+FORMAT_VERSION = 1
+
+
+def model_version(coef: np.ndarray, intercept: float, columns: list) -> str:
+    """Content hash of the parameters and column order; changes whenever the model does."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(coef, dtype='<f8').tobytes())
+    digest.update(np.float64(intercept).astype('<f8').tobytes())
+    digest.update("\n".join(columns).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def expit(z: np.ndarray) -> np.ndarray:
+    """Logistic sigmoid that does not overflow for large negative inputs."""
+    out = np.empty_like(z, dtype=np.float64)
+    positive = z >= 0
+    out[positive] = 1.0 / (1.0 + np.exp(-z[positive]))
+    exp_z = np.exp(z[~positive])
+    out[~positive] = exp_z / (1.0 + exp_z)
+    return out
+
+
+class CompiledLogisticModel:
+    """A binary logistic regression reduced to its weights, scored with NumPy alone.
+
+    Drop-in for the fitted sklearn model wherever only `predict_proba` is used: no sklearn
+    import and no unpickling, just a few dozen floats read from an `.npz`.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, coef: np.ndarray, intercept: float, columns: list, version: str | None = None):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        self.columns = list(columns)
+        if len(self.coef) != len(self.columns):
+            raise ValueError(f"{len(self.coef)} coefficients for {len(self.columns)} columns")
+        self.version = version or model_version(self.coef, self.intercept, self.columns)
+
+    @classmethod
+    def from_estimator(cls, model, columns: list) -> 'CompiledLogisticModel':
+        """Compiles a fitted binary sklearn LogisticRegression."""
+        if model.coef_.shape[0] != 1:
+            raise ValueError("only binary logistic regression models can be compiled")
+        return cls(model.coef_[0], model.intercept_[0], columns)
+
+    def decision_function(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+    def predict_proba(self, X) -> np.ndarray:
+        positive = expit(self.decision_function(X))
+        return np.column_stack((1.0 - positive, positive))
+
+    def predict(self, X) -> np.ndarray:
+        return (self.decision_function(X) > 0).astype(np.int64)
+
+    def save(self, path: str) -> None:
+        # Uncompressed on purpose: the file is tiny and loads without inflating anything
+        with open(path, 'wb') as f:
+            np.savez(f, format_version=np.int64(FORMAT_VERSION), coef=self.coef,
+                     intercept=np.float64(self.intercept), columns=np.array(self.columns),
+                     version=np.array(self.version))
+
+
+def load_compiled_model(path: str) -> CompiledLogisticModel:
+    """Reads a model written by `CompiledLogisticModel.save`; raises ValueError on a format mismatch."""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['format_version']) != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported compiled model format {int(data['format_version'])}")
+        model = CompiledLogisticModel(data['coef'], float(data['intercept']),
+                                      data['columns'].tolist(), str(data['version']))
+    if model.version != model_version(model.coef, model.intercept, model.columns):
+        raise ValueError(f"{path}: version hash does not match the stored parameters")
+    return model
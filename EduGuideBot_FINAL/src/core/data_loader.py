@@ -1,30 +1,126 @@
+import hashlib
 import json
 import logging
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from src.core import metrics
+from src.core.catalog_snapshot import catalog_columns, load_snapshot
 
 logger = logging.getLogger(__name__)
 
 class UniversityDataManager:
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, use_snapshot: bool = True):
         self.universities = []
-        self._id_map = {}
-        self._load_data(data_path)
-        if self.universities:
-            self._build_id_map()
+        self.version = None
+        self.columns = {}
+        self._snapshot = None
+        self._position_map = {}
+        self._category_index = {}
+        self._location_index = {}
+        self._tuition_min_index = ([], [])
+        self._tuition_max_index = ([], [])
+        with metrics.timer('catalog_load_seconds'):
+            self._load_data(data_path, use_snapshot)
+            if self.universities:
+                self._build_id_map()
+                self._build_indexes()
 
-    def _load_data(self, data_path: str):
+    def _load_data(self, data_path: str, use_snapshot: bool = True):
+        if use_snapshot:
+            # Memory-mapped snapshot: records are decoded lazily, indexes come from its columns
+            snapshot = load_snapshot(data_path)
+            if snapshot is not None:
+                self._snapshot = snapshot
+                self.universities = snapshot.universities
+                self.version = snapshot.version
+                self.columns = snapshot.columns()
+                return
         try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                self.universities = json.load(f)
+            with open(data_path, 'rb') as f:
+                raw = f.read()
+            self.universities = json.loads(raw.decode('utf-8'))
+            # Content hash of the source file; changes whenever the catalog does
+            self.version = hashlib.sha256(raw).hexdigest()[:16]
+            self.columns = catalog_columns(self.universities)
         except FileNotFoundError:
             logger.error(f"Data file not found at {data_path}")
         except json.JSONDecodeError:
             logger.error(f"Error decoding JSON from {data_path}")
 
     def _build_id_map(self):
-        self._id_map = {uni['id']: uni for uni in self.universities}
+        self._position_map = dict(zip(self.columns['ids'].tolist(), range(len(self.universities))))
+
+    def _build_indexes(self):
+        """Builds the category, location and tuition lookups used by the recommender."""
+        ids = self.columns['ids'].tolist()
+        string = self.columns['string']
+
+        location_index = {}
+        for uni_id, code in zip(ids, self.columns['location'].tolist()):
+            location_index.setdefault(code, []).append(uni_id)
+        self._location_index = {string(code): uni_ids for code, uni_ids in location_index.items()}
+
+        # Count majors per (category, university) pair in one pass over the flat major columns
+        n = len(ids)
+        pair_keys = self.columns['major_category'].astype(np.int64) * n + self.columns['major_uni']
+        pairs, counts = np.unique(pair_keys, return_counts=True)
+        category_index = {}
+        for key, count in zip(pairs.tolist(), counts.tolist()):
+            code, position = divmod(key, n)
+            category_index.setdefault(string(code), {})[ids[position]] = count
+        self._category_index = category_index
+
+        self._tuition_min_index = self._sorted_tuition(self.columns['tuition_min'])
+        self._tuition_max_index = self._sorted_tuition(self.columns['tuition_max'])
+
+    def _sorted_tuition(self, fees: np.ndarray) -> tuple:
+        """Returns parallel (fees, ids) lists sorted by fee, ties in catalog order."""
+        order = np.argsort(fees, kind='stable')
+        return fees[order].tolist(), self.columns['ids'][order].tolist()
 
     def get_all_universities(self) -> list:
         return self.universities
 
     def get_university_by_id(self, uni_id: int) -> dict | None:
-        return self._id_map.get(uni_id) 
\ No newline at end of file
+        position = self._position_map.get(uni_id)
+        return self.universities[position] if position is not None else None
+
+    def get_position(self, uni_id: int) -> int | None:
+        """Position of a university in catalog order, used to keep rankings stable."""
+        return self._position_map.get(uni_id)
+
+    def get_categories(self) -> list:
+        return list(self._category_index)
+
+    def get_locations(self) -> list:
+        return list(self._location_index)
+
+    def get_category_counts(self, category: str) -> dict:
+        """Maps uni_id -> number of majors in the given category (only universities that offer it)."""
+        return self._category_index.get(category, {})
+
+    def get_ids_by_location(self, location: str) -> list:
+        """University IDs at the given location, in catalog order."""
+        return self._location_index.get(location, [])
+
+    def count_within_budget(self, max_budget: float) -> int:
+        """Number of universities whose minimum tuition is at most `max_budget`."""
+        return bisect_right(self._tuition_min_index[0], max_budget)
+
+    def budget_bracket(self, max_budget: float) -> tuple:
+        """Normalizes a budget to the tuition breakpoints that affect recommendations.
+
+        Two budgets with the same bracket pass the same `range_min` filter and earn the same
+        budget-fit points (`range_max` < budget, `range_max` + 500 < budget) everywhere.
+        """
+        max_fees = self._tuition_max_index[0]
+        return (bisect_right(self._tuition_min_index[0], max_budget),
+                bisect_left(max_fees, max_budget),
+                bisect_left(max_fees, max_budget - 500))
+
+    def get_ids_within_budget(self, max_budget: float, field: str = 'range_min') -> list:
+        """University IDs whose tuition `field` is at most `max_budget`, found by bisection."""
+        fees, ids = self._tuition_min_index if field == 'range_min' else self._tuition_max_index
+        return ids[:bisect_right(fees, max_budget)]
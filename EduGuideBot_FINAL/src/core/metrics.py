@@ -0,0 +1,269 @@
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Off by default: timers and decorators then cost a flag check (or nothing, for decorators)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+# Prometheus text endpoint; 0 disables the HTTP server (the /stats command still works)
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+METRICS_PREFIX = "eduguide_"
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond cache hits to multi-second API calls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# HELP lines for the metrics the bot records
+HELP = {
+    'handler_seconds': "Time spent in each registered update handler",
+    'callback_route_seconds': "Time to handle a button press, per callback_data route",
+    'onboarding_step_seconds': "Time spent in each onboarding step handler",
+    'recommend_seconds': "Time to rank universities for one profile",
+    'result_generation_seconds': "Time from handing a profile to the worker pool to getting its result ID",
+    'result_write_seconds': "Time to write one result to the result store",
+    'catalog_load_seconds': "Time to load the catalog and build its indexes",
+    'model_inference_seconds': "Time to predict admission chances for one student",
+    'result_cache_lookups': "Recommendation cache lookups, by result (hit or miss)",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout, with bucket-interpolated quantiles."""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One slot per bound plus the +Inf overflow
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimated q-quantile, interpolated within its bucket like PromQL's histogram_quantile."""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return float('nan')
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if seen + count >= rank and count:
+                if index == len(self.bounds):
+                    # Past the last bound: the best estimate is that bound
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                return lower + (self.bounds[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class MetricsRegistry:
+    """Histograms, counters and pull-time collectors, keyed by metric name and label set."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        # name -> function returning {metric name: value}, called on every scrape
+        self.collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def histogram(self, name: str, labels: LabelKey = ()) -> Histogram:
+        series = self.histograms.get(name)
+        histogram = series.get(labels) if series is not None else None
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, {}).setdefault(labels, Histogram())
+        return histogram
+
+    def increment(self, name: str, amount: float = 1, labels: LabelKey = ()) -> None:
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, float]]) -> None:
+        self.collectors[name] = collect
+
+    def _histogram_snapshot(self) -> Dict[str, Dict[LabelKey, Histogram]]:
+        # Handlers may add series while a scrape iterates
+        with self._lock:
+            return {name: dict(series) for name, series in self.histograms.items()}
+
+    def collect_gauges(self) -> Dict[str, float]:
+        gauges = {}
+        for name, collect in list(self.collectors.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+                continue
+            for metric, value in values.items():
+                if isinstance(value, (bool, int, float)):
+                    gauges[metric] = float(value)
+        return gauges
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for name, series in sorted(self._histogram_snapshot().items()):
+            full_name = METRICS_PREFIX + name
+            lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {full_name} histogram")
+            for labels, histogram in sorted(series.items()):
+                with histogram._lock:
+                    counts, total, value_sum = list(histogram.counts), histogram.count, histogram.sum
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, counts):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{_format_labels(labels, le=repr(bound))} {cumulative}")
+                lines.append(f"{full_name}_bucket{_format_labels(labels, le='+Inf')} {total}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {value_sum!r}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {total}")
+        with self._lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+        for name, series in sorted(counters.items()):
+            full_name = f"{METRICS_PREFIX}{name}_total"
+            lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {full_name} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{full_name}{_format_labels(labels)} {value!r}")
+        for name, value in sorted(self.collect_gauges().items()):
+            lines.append(f"# TYPE {METRICS_PREFIX}{name} gauge")
+            lines.append(f"{METRICS_PREFIX}{name} {value!r}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, quantiles=(0.5, 0.95, 0.99)) -> Dict[str, Dict[str, float]]:
+        """Count and latency quantiles (in seconds) per histogram series, keyed 'name{labels}'."""
+        summary = {}
+        for name, series in sorted(self._histogram_snapshot().items()):
+            for labels, histogram in sorted(series.items()):
+                entry = {'count': histogram.count}
+                entry.update({f"p{round(q * 100)}": histogram.quantile(q) for q in quantiles})
+                summary[f"{name}{_format_labels(labels)}"] = entry
+        return summary
+
+
+def _format_labels(labels: LabelKey, **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+REGISTRY = MetricsRegistry()
+_DISABLED = nullcontext()
+
+
+class _Timer:
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+def timer(name: str, **labels: str):
+    """Context manager timing its block into histogram `name`; a shared no-op when metrics are disabled."""
+    if not METRICS_ENABLED:
+        return _DISABLED
+    return _Timer(REGISTRY.histogram(name, tuple(sorted(labels.items()))))
+
+
+def timed(name: str, **labels: str):
+    """Decorator timing every call of a function or coroutine function into histogram `name`.
+
+    With metrics disabled the function is returned unwrapped, so it costs nothing per call.
+    """
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+        histogram = REGISTRY.histogram(name, tuple(sorted(labels.items())))
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed_coroutine(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+            return timed_coroutine
+
+        @functools.wraps(fn)
+        def timed_function(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return timed_function
+    return decorate
+
+
+def increment(name: str, amount: float = 1, **labels: str) -> None:
+    if METRICS_ENABLED:
+        REGISTRY.increment(name, amount, tuple(sorted(labels.items())))
+
+
+def register_collector(name: str, collect: Callable[[], Dict[str, float]]) -> None:
+    """Adds gauges read at scrape time, e.g. the cache counters a component already keeps."""
+    REGISTRY.register_collector(name, collect)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the log
+        pass
+
+
+def start_metrics_server(listen: str = METRICS_LISTEN, port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """Serves /metrics from a daemon thread; returns None when metrics or the server are disabled."""
+    if not METRICS_ENABLED or not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((listen, port), _MetricsRequestHandler)
+    except OSError as e:
+        logger.error(f"Could not start the metrics server on {listen}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Serving Prometheus metrics on http://{listen}:{server.server_port}/metrics")
+    return server
@@ -1,4 +1,11 @@
+import heapq
+import logging
+
+from src.core import metrics
 from src.core.data_loader import UniversityDataManager
+from src.core.scoring_engine import ScoringEngine
+
+logger = logging.getLogger(__name__)
 
 SPECIALIST_UNIVERSITIES = {
     'វិស្វកម្ម': [10, 27],
@@ -9,47 +16,178 @@ SPECIALIST_UNIVERSITIES = {
     'ធុរកិច្ច': [16, 35]
 }
 
+CAREER_FIELD_MAP = {'វិស្វករ': 'វិស្វកម្ម', 'អ្នកគ្រប់គ្រង': 'ធុរកិច្ច', 'វេជ្ជបណ្ឌិត': 'វេជ្ជសាស្ត្រ', 'គ្រូបង្រៀន': 'អប់រំ', 'អ្នកកฎหមាយ': 'ច្បាប់'}
+
+ENGLISH_STRONG_UNIVERSITIES = [4, 28, 36, 32]
+
+# Most a university can gain from the profile-dependent parts: career goal (25) + budget fit (20)
+MAX_DYNAMIC_SCORE = 45
+
+# Requests whose filters leave at most this many candidates use the heap path instead of the engine
+HEAP_MAX_CANDIDATES = 32
+
 class UniversityRecommender:
     def __init__(self, data_manager: UniversityDataManager):
         self.data_manager = data_manager
         self.all_universities = self.data_manager.get_all_universities()
+        self.engine = ScoringEngine(data_manager, SPECIALIST_UNIVERSITIES, ENGLISH_STRONG_UNIVERSITIES, CAREER_FIELD_MAP,
+                                    MAX_DYNAMIC_SCORE)
+        self.topk_stats = {'heap_requests': 0, 'engine_requests': 0, 'candidates': 0, 'scored': 0, 'pruned': 0}
 
+    @metrics.timed('recommend_seconds')
     def recommend(self, user_profile: dict, top_n: int = 3) -> list:
+        if top_n <= 0:
+            return []
+        if self._estimate_candidates(user_profile) <= HEAP_MAX_CANDIDATES:
+            return self._top_k(self._hard_filter(user_profile), user_profile, top_n)
+        self.topk_stats['engine_requests'] += 1
+        return [{'university': self.all_universities[position], 'total_score': score}
+                for position, score in self.engine.top_n(user_profile, top_n, self.topk_stats)]
+
+    def recommend_many(self, user_profiles: list, top_n: int = 3, workers: int | None = None) -> list:
+        """Batch version of `recommend`: one result list per profile, scored in a single pass."""
+        positions, scores = self.engine.top_n_many(user_profiles, top_n, workers=workers)
+        return [[{'university': self.all_universities[position], 'total_score': int(score)}
+                 for position, score in zip(row_positions.tolist(), row_scores.tolist()) if position >= 0]
+                for row_positions, row_scores in zip(positions, scores)]
+
+    def recommend_reference(self, user_profile: dict, top_n: int = 3) -> list:
+        """Pure-Python scoring path; the vectorized engine must rank exactly like this."""
         candidates = self._hard_filter(user_profile)
         scored_results = self._calculate_scores(candidates, user_profile)
         return sorted(scored_results, key=lambda x: x['total_score'], reverse=True)[:top_n]
 
+    def profile_key(self, user_profile: dict) -> tuple:
+        """Canonical, hashable form of a profile: profiles with equal keys get identical recommendations."""
+        location = user_profile.get('location')
+        max_budget = user_profile['max_budget']
+        return (
+            location if location and location != 'Any' else None,
+            bool(max_budget),
+            self.data_manager.budget_bracket(max_budget),
+            user_profile['core_field'],
+            CAREER_FIELD_MAP.get(user_profile['career_goal']),
+            user_profile['english_proficiency'] >= 8,
+        )
+
+    def score_breakdowns(self, user_profile: dict, universities: list) -> list:
+        """Per-component scores for each university; the components add up to its total_score."""
+        context = self._scoring_context(user_profile)
+        breakdowns = []
+        for uni in universities:
+            buffer = user_profile['max_budget'] - uni['tuition_fees']['range_max']
+            breakdowns.append({
+                'major': min(context['field_counts'].get(uni['id'], 0) * 5, 30),
+                'career': 25 if uni['id'] in context['career_counts'] else 0,
+                'budget': 20 if buffer > 500 else 10 if buffer > 0 else 0,
+                'english': 15 if context['english_strong'] and uni['id'] in ENGLISH_STRONG_UNIVERSITIES else 0,
+                'specialist': 20 if uni['id'] in context['specialists'] else 0,
+            })
+        return breakdowns
+
+    def _estimate_candidates(self, user_profile: dict) -> int:
+        """Upper bound on the hard-filter result size, from index sizes only."""
+        estimate = len(self.all_universities)
+        if user_profile.get('location') and user_profile['location'] != 'Any':
+            estimate = min(estimate, len(self.data_manager.get_ids_by_location(user_profile['location'])))
+        if user_profile.get('max_budget'):
+            estimate = min(estimate, self.data_manager.count_within_budget(user_profile['max_budget']))
+        return estimate
+
+    def _top_k(self, candidate_universities: list, user_profile: dict, top_n: int) -> list:
+        """Keeps the best `top_n` (at least 1) in a min-heap keyed on (score, -position), which ranks exactly
+        like the stable full sort. A candidate whose static score plus MAX_DYNAMIC_SCORE cannot beat the
+        current k-th best is skipped without computing its career and budget parts.
+
+        Used for small candidate sets (see HEAP_MAX_CANDIDATES); larger scans go to the vectorized
+        engine, which applies the same bound to the whole candidate set at once."""
+        context = self._scoring_context(user_profile)
+        heap = []
+        pruned = 0
+        for uni in candidate_universities:
+            static_score = self._static_score(uni, context)
+            # Candidates arrive in catalog order, so a tie with the k-th best always loses
+            if len(heap) == top_n and static_score + MAX_DYNAMIC_SCORE <= heap[0][0]:
+                pruned += 1
+                continue
+            score = static_score + self._dynamic_score(uni, context, user_profile)
+            entry = (score, -self.data_manager.get_position(uni['id']), uni)
+            if len(heap) < top_n:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        stats = self.topk_stats
+        stats['heap_requests'] += 1
+        stats['candidates'] += len(candidate_universities)
+        stats['scored'] += len(candidate_universities) - pruned
+        stats['pruned'] += pruned
+        logger.debug(f"top-{top_n}: {len(candidate_universities)} candidates, {pruned} pruned")
+        return [{'university': uni, 'total_score': score}
+                for score, _, uni in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def get_topk_stats(self) -> dict:
+        """Cumulative top-k counters for both paths, including the share of candidates skipped by the upper bound."""
+        stats = dict(self.topk_stats)
+        stats['prune_ratio'] = stats['pruned'] / stats['candidates'] if stats['candidates'] else 0.0
+        return stats
+
     def _hard_filter(self, user_profile: dict) -> list:
-        candidate_universities = self.all_universities
+        candidate_ids = None
         if user_profile.get('location') and user_profile['location'] != 'Any':
-            candidate_universities = [u for u in candidate_universities if u.get('location') == user_profile['location']]
+            candidate_ids = self.data_manager.get_ids_by_location(user_profile['location'])
         if user_profile.get('max_budget'):
-            candidate_universities = [u for u in candidate_universities if u['tuition_fees']['range_min'] <= user_profile['max_budget']]
-        return candidate_universities
+            affordable_ids = self.data_manager.get_ids_within_budget(user_profile['max_budget'])
+            if candidate_ids is None:
+                candidate_ids = affordable_ids
+            else:
+                affordable = set(affordable_ids)
+                candidate_ids = [uni_id for uni_id in candidate_ids if uni_id in affordable]
+        if candidate_ids is None:
+            return self.all_universities
+        # Keep catalog order so equal scores rank the same way as a full scan would
+        ordered_ids = sorted(candidate_ids, key=self.data_manager.get_position)
+        return [self.data_manager.get_university_by_id(uni_id) for uni_id in ordered_ids]
 
     def _calculate_scores(self, candidate_universities: list, user_profile: dict) -> list:
+        context = self._scoring_context(user_profile)
         scored_unis = []
         for uni in candidate_universities:
-            score = 0
-            # Score logic here...
-            # Major Field Score
-            major_count = sum(1 for f in uni.get('faculties', []) for m in f.get('majors', []) if m.get('category_km') == user_profile['core_field'])
-            score += min(major_count * 5, 30)
-            # Career Goal Score
-            career_map = {'វិស្វករ': 'វិស្វកម្ម', 'អ្នកគ្រប់គ្រង': 'ធុរកិច្ច', 'វេជ្ជបណ្ឌិត': 'វេជ្ជសាស្ត្រ', 'គ្រូបង្រៀន': 'អប់រំ', 'អ្នកកฎหមាយ': 'ច្បាប់'}
-            mapped_field = career_map.get(user_profile['career_goal'])
-            if mapped_field and any(m.get('category_km') == mapped_field for f in uni.get('faculties', []) for m in f.get('majors', [])):
-                score += 25
-            # Budget Fit Score
-            buffer = user_profile['max_budget'] - uni['tuition_fees']['range_max']
-            if buffer > 500: score += 20
-            elif buffer > 0: score += 10
-            # English Strength Score
-            if user_profile['english_proficiency'] >= 8 and uni['id'] in [4, 28, 36, 32]:
-                score += 15
-            # Specialization Score
-            if uni['id'] in SPECIALIST_UNIVERSITIES.get(user_profile['core_field'], []):
-                score += 20
-            
+            score = self._static_score(uni, context) + self._dynamic_score(uni, context, user_profile)
             scored_unis.append({'university': uni, 'total_score': score})
-        return scored_unis 
\ No newline at end of file
+        return scored_unis
+
+    def _scoring_context(self, user_profile: dict) -> dict:
+        """Per-request lookups shared by every candidate."""
+        mapped_field = CAREER_FIELD_MAP.get(user_profile['career_goal'])
+        return {
+            'field_counts': self.data_manager.get_category_counts(user_profile['core_field']),
+            'career_counts': self.data_manager.get_category_counts(mapped_field) if mapped_field else {},
+            'english_strong': user_profile['english_proficiency'] >= 8,
+            'specialists': SPECIALIST_UNIVERSITIES.get(user_profile['core_field'], []),
+        }
+
+    def _static_score(self, uni: dict, context: dict) -> int:
+        """Score parts that depend only on the profile's field and English level."""
+        score = 0
+        # Major Field Score
+        score += min(context['field_counts'].get(uni['id'], 0) * 5, 30)
+        # English Strength Score
+        if context['english_strong'] and uni['id'] in ENGLISH_STRONG_UNIVERSITIES:
+            score += 15
+        # Specialization Score
+        if uni['id'] in context['specialists']:
+            score += 20
+        return score
+
+    def _dynamic_score(self, uni: dict, context: dict, user_profile: dict) -> int:
+        """Career goal and budget fit; together worth at most MAX_DYNAMIC_SCORE."""
+        score = 0
+        # Career Goal Score
+        if uni['id'] in context['career_counts']:
+            score += 25
+        # Budget Fit Score
+        buffer = user_profile['max_budget'] - uni['tuition_fees']['range_max']
+        if buffer > 500: score += 20
+        elif buffer > 0: score += 10
+        return score
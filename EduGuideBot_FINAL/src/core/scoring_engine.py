@@ -0,0 +1,223 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.core.data_loader import UniversityDataManager
+
+# Upper bound on profiles x universities cells scored at once by `top_n_many`
+BATCH_CELLS = 4_000_000
+
+_worker_engine = None
+
+
+class ScoringEngine:
+    """Columnar copy of the catalog that scores a profile against every university with array operations.
+
+    Scores are combined with the catalog position into a single integer key
+    (higher score first, then earlier position), so `argpartition` picks exactly
+    the same top N as a stable sort over the Python scoring loop.
+    """
+
+    def __init__(self, data_manager: UniversityDataManager, specialists: dict, english_strong: list, career_fields: dict,
+                 max_dynamic_score: int = 45):
+        n = len(data_manager.get_all_universities())
+        self.size = n
+        columns = data_manager.columns
+        self.ids = np.asarray(columns.get('ids', []), dtype=np.int64)
+        self.tuition_min = np.asarray(columns.get('tuition_min', []), dtype=np.float64)
+        self.tuition_max = np.asarray(columns.get('tuition_max', []), dtype=np.float64)
+
+        self.location_codes = {}
+        self.locations = np.full(n, -1, dtype=np.int32)
+        for code, location in enumerate(data_manager.get_locations()):
+            self.location_codes[location] = code
+            for uni_id in data_manager.get_ids_by_location(location):
+                self.locations[data_manager.get_position(uni_id)] = code
+
+        # One row per category so that a profile's field is a contiguous slice
+        self.category_columns = {}
+        self.category_counts = np.zeros((len(data_manager.get_categories()), n), dtype=np.int32)
+        for row, category in enumerate(data_manager.get_categories()):
+            self.category_columns[category] = row
+            for uni_id, count in data_manager.get_category_counts(category).items():
+                self.category_counts[row, data_manager.get_position(uni_id)] = count
+        self.major_scores = np.minimum(self.category_counts * 5, 30)
+        self.offers_category = self.category_counts > 0
+        self.career_fields = career_fields
+        # Most the career and budget-fit parts can add; bounds a candidate from its static parts alone
+        self.max_dynamic_score = max_dynamic_score
+
+        self.english_mask = np.isin(self.ids, english_strong)
+        self.specialist_masks = {field: np.isin(self.ids, uni_ids) for field, uni_ids in specialists.items()}
+
+        # Batch scoring gathers per-profile bonus rows by index; the extra all-zero row
+        # stands in for unknown categories. Keys fit in int32 for any realistic catalog,
+        # which halves the memory traffic of the profiles x universities matrix.
+        self._stride = n + 1
+        self._key_dtype = np.int32 if 111 * self._stride < 2 ** 31 else np.int64
+        zero_row = np.zeros((1, n), dtype=self._key_dtype)
+        self._no_row = len(self.category_columns)
+        self._major_rows = np.vstack([self.major_scores.astype(self._key_dtype), zero_row])
+        self._career_rows = np.vstack([self.offers_category * 25, zero_row]).astype(self._key_dtype)
+        self._specialist_fields = {field: row for row, field in enumerate(self.specialist_masks)}
+        self._specialist_rows = np.vstack([mask * 20 for mask in self.specialist_masks.values()] + [zero_row]).astype(self._key_dtype)
+        self._english_bonus = (self.english_mask * 15).astype(self._key_dtype)
+        self._tuition_max_plus = self.tuition_max + 500
+        self._static_orders = {}
+
+        # Tie-break: earlier catalog positions get the larger remainder
+        self._tiebreak = np.arange(n - 1, -1, -1, dtype=self._key_dtype)
+
+    def candidate_mask(self, user_profile: dict) -> np.ndarray | None:
+        """Boolean mask of universities passing the location and budget filters, or None for all."""
+        mask = None
+        if user_profile.get('location') and user_profile['location'] != 'Any':
+            code = self.location_codes.get(user_profile['location'], -2)
+            mask = self.locations == code
+        if user_profile.get('max_budget'):
+            affordable = self.tuition_min <= user_profile['max_budget']
+            mask = affordable if mask is None else mask & affordable
+        return mask
+
+    def top_n(self, user_profile: dict, top_n: int, stats: dict | None = None) -> list:
+        """Returns [(position, score), ...] for the best `top_n` candidates, best first.
+
+        Candidates are visited in static-score order. The first k are scored in full; the lowest of
+        those totals is a lower bound on the k-th best, so only the prefix whose static score plus
+        `max_dynamic_score` can reach it gets its career and budget parts computed.
+        Counts go to `stats` ('candidates', 'scored', 'pruned') when given.
+        """
+        mask = self.candidate_mask(user_profile)
+        available = int(np.count_nonzero(mask)) if mask is not None else self.size
+        k = min(top_n, available)
+        if k <= 0:
+            return []
+        order, neg_static = self._static_order(user_profile)
+        career_row = self._career_row(user_profile['career_goal'])
+        budget = user_profile['max_budget']
+        end = self.size
+        if k < available:
+            # Grow the scanned head until it holds k candidates
+            limit = 4 * k
+            while True:
+                seeds = np.flatnonzero(mask[order[:limit]]) if mask is not None else np.arange(min(limit, self.size))
+                if len(seeds) >= k or limit >= self.size:
+                    break
+                limit *= 4
+            seeds = seeds[:k]
+            bound = self._add_dynamic(-neg_static[seeds], order[seeds], career_row, budget).min()
+            # A tie with the bound can still win on catalog position, so only strictly lower candidates go
+            end = int(np.searchsorted(neg_static, self.max_dynamic_score - bound, side='right'))
+        positions, static = order[:end], -neg_static[:end]
+        if mask is not None:
+            keep = mask[positions]
+            positions, static = positions[keep], static[keep]
+        if stats is not None:
+            stats['candidates'] += available
+            stats['scored'] += len(positions)
+            stats['pruned'] += available - len(positions)
+
+        scores = self._add_dynamic(static, positions, career_row, budget)
+        keys = scores * self._stride + self._tiebreak[positions]
+        if k < len(keys):
+            selected = np.argpartition(keys, len(keys) - k)[len(keys) - k:]
+        else:
+            selected = np.arange(len(keys))
+        selected = selected[np.argsort(keys[selected])[::-1]]
+        return [(int(positions[index]), int(scores[index])) for index in selected]
+
+    def top_n_many(self, profiles: list, top_n: int, workers: int | None = None) -> tuple:
+        """Scores a batch of profiles as a profiles x universities matrix.
+
+        Returns `(positions, scores)` arrays of shape (len(profiles), top_n),
+        best first; unused slots (fewer candidates than `top_n`) hold -1.
+        With `workers` > 1, chunks are spread over a process pool.
+        """
+        k = max(0, min(top_n, self.size))
+        chunk_size = max(1, BATCH_CELLS // max(self.size, 1))
+        chunks = [profiles[i:i + chunk_size] for i in range(0, len(profiles), chunk_size)]
+        if workers and workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks), os.cpu_count() or 1),
+                                     initializer=_init_worker, initargs=(self,)) as pool:
+                results = list(pool.map(_score_chunk, chunks, [k] * len(chunks)))
+        else:
+            results = [self._top_n_chunk(chunk, k) for chunk in chunks]
+        if not results:
+            return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.int64)
+        positions, scores = zip(*results)
+        return np.vstack(positions), np.vstack(scores)
+
+    def _top_n_chunk(self, profiles: list, k: int) -> tuple:
+        p = len(profiles)
+        field_rows = np.array([self.category_columns.get(profile['core_field'], self._no_row) for profile in profiles])
+        career_rows = np.array([self._career_row(profile['career_goal']) for profile in profiles])
+        budgets = np.array([float(profile['max_budget']) for profile in profiles])
+        english = np.array([profile['english_proficiency'] >= 8 for profile in profiles])
+        specialist_rows = np.array([self._specialist_fields.get(profile['core_field'], len(self._specialist_fields))
+                                    for profile in profiles])
+
+        scores = self._major_rows[field_rows]
+        scores += self._career_rows[career_rows]
+        scores += self._specialist_rows[specialist_rows]
+        scores[english] += self._english_bonus
+        fit = np.add(budgets[:, None] > self.tuition_max, budgets[:, None] > self._tuition_max_plus, dtype=np.int8)
+        fit *= 10
+        scores += fit
+
+        # Location code -1 means "no filter"; a location missing from the catalog matches nothing
+        location_codes = np.array([self.location_codes.get(profile['location'], -2)
+                                   if profile.get('location') and profile['location'] != 'Any' else -1
+                                   for profile in profiles])
+        mask = (location_codes[:, None] == -1) | (location_codes[:, None] == self.locations)
+        filter_budget = np.array([bool(profile.get('max_budget')) for profile in profiles])
+        mask &= ~filter_budget[:, None] | (self.tuition_min <= budgets[:, None])
+
+        scores *= self._stride
+        scores += self._tiebreak
+        keys = np.where(mask, scores, -1)
+        if k == 0:
+            return np.empty((p, 0), dtype=np.int64), np.empty((p, 0), dtype=np.int64)
+        if k < self.size:
+            keys = np.partition(keys, self.size - k, axis=1)[:, self.size - k:]
+        keys = -np.sort(-keys, axis=1)
+        valid = keys >= 0
+        positions = np.where(valid, self.size - 1 - keys % self._stride, -1)
+        return positions, np.where(valid, keys // self._stride, -1)
+
+    def _static_order(self, user_profile: dict) -> tuple:
+        """Positions sorted by static score (major, English, specialist), best first and in catalog order
+        within a score, with their negated scores (ascending, for searchsorted). Built once per
+        (field, English level) and kept, since a catalog has few of them."""
+        key = (self.category_columns.get(user_profile['core_field'], self._no_row),
+               self._specialist_fields.get(user_profile['core_field'], len(self._specialist_fields)),
+               user_profile['english_proficiency'] >= 8)
+        cached = self._static_orders.get(key)
+        if cached is None:
+            field_row, specialist_row, english = key
+            static = self._major_rows[field_row] + self._specialist_rows[specialist_row]
+            if english:
+                static += self._english_bonus
+            order = np.argsort(-static, kind='stable')
+            cached = self._static_orders[key] = (order, -static[order])
+        return cached
+
+    def _add_dynamic(self, static: np.ndarray, positions: np.ndarray, career_row: int, budget: float) -> np.ndarray:
+        """Static scores plus the career and budget-fit parts, for the universities at `positions`."""
+        scores = static + self._career_rows[career_row, positions]
+        buffer = budget - self.tuition_max[positions]
+        scores += np.where(buffer > 500, 20, np.where(buffer > 0, 10, 0))
+        return scores
+
+    def _career_row(self, career_goal) -> int:
+        mapped_field = self.career_fields.get(career_goal)
+        return self.category_columns.get(mapped_field, self._no_row) if mapped_field else self._no_row
+
+
+def _init_worker(engine: ScoringEngine) -> None:
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _score_chunk(profiles: list, k: int) -> tuple:
+    return _worker_engine._top_n_chunk(profiles, k)
@@ -1,24 +1,82 @@
-import os
 import json
 import logging
 from typing import Dict, List, Any, Optional
 import secrets
 
+from src.core import metrics
 from src.core.data_loader import UniversityDataManager
+from src.core.lru_cache import TTLCache
 from src.core.recommender import UniversityRecommender
+from src.web.result_store import FileResultStore, ResultStore, create_result_store
 
 logger = logging.getLogger(__name__)
 
+# Version tag of compact result records (ranked IDs + scores, rehydrated from the catalog on read).
+# results.js joins them against the 'results' catalog asset written by build_web_apps.py
+COMPACT_FORMAT = 2
+
 class ResultGenerator:
     """Generates recommendation results and saves them for web display"""
     
-    def __init__(self, data_path: str, results_dir: str = "static/data"):
+    def __init__(self, data_path: str, results_dir: str = "static/data", cache_size: int = 1024, cache_ttl: float = 600.0,
+                 compact_results: bool = True, store: ResultStore | str | None = None):
+        self.data_path = data_path
+        self.compact_results = compact_results
         self.data_manager = UniversityDataManager(data_path)
         self.recommender = UniversityRecommender(self.data_manager)
         self.results_dir = results_dir
-        
-        # Ensure the results directory exists
-        os.makedirs(self.results_dir, exist_ok=True)
+        # Where serialized results live: a store, a spec such as 'sqlite:data/results.db' (kept so worker
+        # processes can open the same store), or by default one JSON file per result in results_dir
+        self.store_spec = store if isinstance(store, str) else None
+        if self.store_spec is not None:
+            store = create_result_store(self.store_spec)
+        self.store = store or FileResultStore(results_dir)
+
+        # Recommendations keyed on the recommender's canonical profile, and the exact
+        # profile last written per result ID (so identical resubmissions skip the write)
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._written = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cached_version = self.data_manager.version
+
+
+    def reload_catalog(self) -> None:
+        """Re-read the catalog from disk; cached recommendations are dropped on the next lookup"""
+        data_manager = UniversityDataManager(self.data_path)
+        self.use_catalog(data_manager, UniversityRecommender(data_manager))
+
+    def use_catalog(self, data_manager: UniversityDataManager, recommender: UniversityRecommender) -> None:
+        """Switch to an already loaded catalog (e.g. one built by CatalogWatcher); the cache follows on the next lookup"""
+        self.data_manager = data_manager
+        self.recommender = recommender
+
+    def close(self) -> None:
+        """Writes out anything the result store still has queued"""
+        self.store.close()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for the recommendation cache"""
+        return self.cache.stats()
+
+    def _check_catalog_version(self) -> None:
+        version = self.recommender.data_manager.version
+        if version != self._cached_version:
+            logger.info(f"Catalog changed ({self._cached_version} -> {version}), clearing result cache")
+            self.cache.clear()
+            self._written.clear()
+            self._cached_version = version
+
+    def _recommend(self, user_profile: Dict[str, Any], top_n: int = 5) -> List[Dict[str, Any]]:
+        """Recommendations for a profile, served from the cache when an equivalent profile was seen recently"""
+        self._check_catalog_version()
+        key = (self.recommender.profile_key(user_profile), top_n)
+        recommendations = self.cache.get(key)
+        if recommendations is None:
+            metrics.increment('result_cache_lookups', result='miss')
+            recommendations = self.recommender.recommend(user_profile, top_n=top_n)
+            self.cache.put(key, recommendations)
+        else:
+            metrics.increment('result_cache_lookups', result='hit')
+        return recommendations
     
     def generate_results(self, user_profile: Dict[str, Any], user_id: Optional[int] = None) -> Optional[str]:
         """
@@ -28,9 +86,56 @@ class ResultGenerator:
         # Generate a unique ID for this result if not provided
         result_id = str(user_id) if user_id else secrets.token_urlsafe(8)
         
-        # Get recommendations from the recommender
-        recommendations = self.recommender.recommend(user_profile, top_n=5)
-        
+        # Get recommendations from the recommender (or the cache)
+        recommendations = self._recommend(user_profile, top_n=5)
+
+        # Same user resubmitting the same answers: the stored result is already up to date,
+        # unless a sweep has removed it since
+        signature = json.dumps(user_profile, sort_keys=True, ensure_ascii=False)
+        if user_id and self._written.get(result_id) == signature and self.store.exists(result_id):
+            return result_id
+
+        if self._save_result(result_id, user_profile, recommendations) is None:
+            return None
+        if user_id:
+            self._written.put(result_id, signature)
+        return result_id
+
+    def generate_results_bulk(self, user_profiles: List[Dict[str, Any]], user_ids: Optional[List[Optional[int]]] = None,
+                              workers: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Batch counterpart of generate_results: scores every profile in one pass and writes all result files
+        Returns one result ID (or None on a failed write) per profile, in input order
+        """
+        user_ids = user_ids or [None] * len(user_profiles)
+        all_recommendations = self.recommender.recommend_many(user_profiles, top_n=5, workers=workers)
+        items = []
+        for user_profile, user_id, recommendations in zip(user_profiles, user_ids, all_recommendations):
+            result_id = str(user_id) if user_id else secrets.token_urlsafe(8)
+            items.append((result_id, self._serialize(result_id, user_profile, recommendations)))
+        try:
+            self.store.put_many(items)
+        except Exception as e:
+            logger.error(f"Failed to save bulk results: {e}")
+            return [None] * len(items)
+        logger.info(f"Generated {len(items)} results in bulk")
+        return [result_id for result_id, _ in items]
+
+    def _serialize(self, result_id: str, user_profile: Dict[str, Any], recommendations: List[Dict[str, Any]]) -> str:
+        """Build the stored JSON for one result, compact or full depending on compact_results"""
+        if self.compact_results:
+            result_data = {
+                "format": COMPACT_FORMAT,
+                "user_profile": user_profile,
+                "recommendations": [{"university_id": rec["university"]["id"], "total_score": rec["total_score"],
+                                     "breakdown": breakdown}
+                                    for rec, breakdown in zip(recommendations, self.recommender.score_breakdowns(
+                                        user_profile, [rec["university"] for rec in recommendations]))],
+                "catalog_version": self.recommender.data_manager.version,
+                "result_id": result_id,
+                "timestamp": None
+            }
+            return json.dumps(result_data, ensure_ascii=False, separators=(',', ':'))
         # Create result data including the user profile and recommendations
         result_data = {
             "user_profile": user_profile,
@@ -38,28 +143,49 @@ class ResultGenerator:
             "result_id": result_id,
             "timestamp": None  # This would be set to the current time in a real implementation
         }
-        
-        # Save the result data to a JSON file
-        result_file = os.path.join(self.results_dir, f"result_{result_id}.json")
+        return json.dumps(result_data, ensure_ascii=False, indent=2)
+
+    def _save_result(self, result_id: str, user_profile: Dict[str, Any], recommendations: List[Dict[str, Any]]) -> Optional[str]:
+        """Write one result to the store; returns the result ID, or None if the write failed"""
         try:
-            with open(result_file, 'w', encoding='utf-8') as f:
-                json.dump(result_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Results saved to {result_file}")
+            payload = self._serialize(result_id, user_profile, recommendations)
+            with metrics.timer('result_write_seconds'):
+                self.store.put(result_id, payload)
+            logger.debug(f"Results saved for {result_id}")
         except Exception as e:
             logger.error(f"Failed to save results: {e}")
             return None
         
         return result_id
+
+    def _rehydrate(self, result_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Expand a compact record into the full format by looking its university IDs up in the catalog"""
+        data_manager = self.recommender.data_manager
+        if result_data.get("catalog_version") != data_manager.version:
+            logger.debug(f"Result {result_data.get('result_id')} was scored against catalog {result_data.get('catalog_version')}")
+        recommendations = []
+        for rec in result_data["recommendations"]:
+            university = data_manager.get_university_by_id(rec["university_id"])
+            if university is None:
+                logger.warning(f"University {rec['university_id']} from result {result_data.get('result_id')} is no longer in the catalog")
+                continue
+            recommendation = {"university": university, "total_score": rec["total_score"]}
+            if "breakdown" in rec:
+                recommendation["breakdown"] = rec["breakdown"]
+            recommendations.append(recommendation)
+        return {**result_data, "recommendations": recommendations}
     
     def get_result_by_id(self, result_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve recommendation results by ID, or None if not found"""
-        result_file = os.path.join(self.results_dir, f"result_{result_id}.json")
-        try:
-            with open(result_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.error(f"Result file not found: {result_file}")
+        payload = self.store.get(result_id)
+        if payload is None:
+            logger.error(f"Result not found: {result_id}")
             return None
+        try:
+            result_data = json.loads(payload)
         except json.JSONDecodeError:
-            logger.error(f"Error decoding JSON from {result_file}")
-            return None 
\ No newline at end of file
+            logger.error(f"Error decoding JSON for result {result_id}")
+            return None
+        if result_data.get("format") == COMPACT_FORMAT:
+            return self._rehydrate(result_data)
+        return result_data
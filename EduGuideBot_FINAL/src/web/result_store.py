@@ -0,0 +1,248 @@
+import os
+import time
+import logging
+from abc import ABC, abstractmethod
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Seconds a result link stays valid, and the most results kept (oldest go first); 0 disables either limit
+RESULT_TTL = float(os.getenv("RESULT_TTL", str(90 * 24 * 3600)))
+RESULT_MAX_COUNT = int(os.getenv("RESULT_MAX_COUNT", "500000"))
+
+
+class ResultStore(ABC):
+    """Storage backend for serialized recommendation results, keyed by result ID"""
+
+    @abstractmethod
+    def put(self, result_id: str, payload: str) -> None:
+        ...
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        for result_id, payload in items:
+            self.put(result_id, payload)
+
+    @abstractmethod
+    def get(self, result_id: str) -> Optional[str]:
+        ...
+
+    def exists(self, result_id: str) -> bool:
+        """Whether a result is still stored (a sweep may have removed it)"""
+        return self.get(result_id) is not None
+
+    def sweep(self) -> int:
+        """Delete expired results and enforce the size cap; returns how many were removed"""
+        return 0
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class FileResultStore(ResultStore):
+    """The original layout: one `result_{id}.json` per result in a flat directory, served as static files"""
+
+    def __init__(self, results_dir: str, ttl: Optional[float] = None, max_results: Optional[int] = None):
+        self.results_dir = results_dir
+        self.ttl = ttl
+        self.max_results = max_results
+        os.makedirs(self.results_dir, exist_ok=True)
+
+    def _path(self, result_id: str) -> str:
+        return os.path.join(self.results_dir, f"result_{result_id}.json")
+
+    def put(self, result_id: str, payload: str) -> None:
+        # Write a temp file, then rename over the target so readers never see a half-written result
+        fd, tmp_path = tempfile.mkstemp(dir=self.results_dir, prefix=".result_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            # mkstemp creates 0600 files; results are served to browsers
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self._path(result_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, result_id: str) -> Optional[str]:
+        try:
+            with open(self._path(result_id), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, result_id: str) -> bool:
+        return os.path.exists(self._path(result_id))
+
+    def sweep(self) -> int:
+        if self.ttl is None and self.max_results is None:
+            return 0
+        entries = []
+        with os.scandir(self.results_dir) as it:
+            for entry in it:
+                if entry.name.startswith("result_") and entry.name.endswith(".json"):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        entries.sort()
+        doomed = []
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl
+            doomed = [path for mtime, path in entries if mtime < cutoff]
+        remaining = len(entries) - len(doomed)
+        if self.max_results is not None and remaining > self.max_results:
+            doomed += [path for _, path in entries[len(doomed):len(doomed) + remaining - self.max_results]]
+        for path in doomed:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        return len(doomed)
+
+
+class SQLiteResultStore(ResultStore):
+    """All results in one SQLite file (WAL mode), looked up through the primary-key B-tree.
+
+    `put` only queues the row; a background thread commits queued rows in batches every
+    `flush_interval` seconds (or as soon as `batch_size` rows are waiting), so concurrent
+    users share one transaction instead of each creating a file. Queued rows are visible
+    to `get` before they are committed. The same thread runs the TTL / size-cap sweeper.
+    """
+
+    def __init__(self, db_path: str, ttl: Optional[float] = None, max_results: Optional[int] = None,
+                 batch_size: int = 256, flush_interval: float = 0.5, sweep_interval: float = 300.0):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_results = max_results
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " result_id TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)")
+        self._conn.commit()
+
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, Tuple[float, str]] = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._last_sweep = time.monotonic()
+        self._writer = threading.Thread(target=self._write_behind, name="result-store-writer", daemon=True)
+        self._writer.start()
+
+    def put(self, result_id: str, payload: str) -> None:
+        with self._pending_lock:
+            self._pending[result_id] = (time.time(), payload)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Queues the batch behind any pending rows and commits everything in one transaction before returning"""
+        now = time.time()
+        with self._pending_lock:
+            for result_id, payload in items:
+                # Replaces an older queued row for the same ID, so the writer cannot commit it over this one
+                self._pending[result_id] = (now, payload)
+        self.flush()
+
+    def get(self, result_id: str) -> Optional[str]:
+        with self._pending_lock:
+            pending = self._pending.get(result_id)
+        if pending is not None:
+            return pending[1]
+        with self._db_lock:
+            row = self._conn.execute("SELECT payload FROM results WHERE result_id = ?", (result_id,)).fetchone()
+        return row[0] if row else None
+
+    def exists(self, result_id: str) -> bool:
+        with self._pending_lock:
+            if result_id in self._pending:
+                return True
+        with self._db_lock:
+            return self._conn.execute("SELECT 1 FROM results WHERE result_id = ?", (result_id,)).fetchone() is not None
+
+    def flush(self) -> None:
+        # Rows stay in the pending map until committed, so `get` never misses them mid-flush.
+        # The writer thread and put_many can flush at once: taking the batch and committing it
+        # under one lock keeps an older row from landing after a newer one for the same ID
+        with self._db_lock:
+            with self._pending_lock:
+                batch = dict(self._pending)
+            if not batch:
+                return
+            rows: List[Tuple[str, float, str]] = [(result_id, created_at, payload)
+                                                  for result_id, (created_at, payload) in batch.items()]
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", rows)
+            with self._pending_lock:
+                for result_id, entry in batch.items():
+                    if self._pending.get(result_id) is entry:
+                        del self._pending[result_id]
+
+    def sweep(self) -> int:
+        removed = 0
+        with self._db_lock, self._conn:
+            if self.ttl is not None:
+                removed += self._conn.execute("DELETE FROM results WHERE created_at < ?",
+                                              (time.time() - self.ttl,)).rowcount
+            if self.max_results is not None:
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+                if count > self.max_results:
+                    removed += self._conn.execute(
+                        "DELETE FROM results WHERE result_id IN "
+                        "(SELECT result_id FROM results ORDER BY created_at LIMIT ?)",
+                        (count - self.max_results,)).rowcount
+        if removed:
+            logger.info(f"Swept {removed} results from {self.db_path}")
+        return removed
+
+    def _write_behind(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() - self._last_sweep >= self.sweep_interval:
+                    self._last_sweep = time.monotonic()
+                    self.sweep()
+            except sqlite3.Error as e:
+                logger.error(f"Result store write failed: {e}")
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+def create_result_store(spec: str, **options) -> ResultStore:
+    """Build a store from a spec such as 'file:static/data' or 'sqlite:data/results.db'
+
+    `ttl` and `max_results` default to RESULT_TTL and RESULT_MAX_COUNT.
+    """
+    options.setdefault('ttl', RESULT_TTL or None)
+    options.setdefault('max_results', RESULT_MAX_COUNT or None)
+    backend, _, location = spec.partition(":")
+    if backend == "file":
+        return FileResultStore(location, **options)
+    if backend == "sqlite":
+        return SQLiteResultStore(location, **options)
+    raise ValueError(f"Unknown result store backend: {backend!r}")
@@ -11,9 +11,9 @@ const universityDetails = document.getElementById('university-details');
 const closeDetailsButton = document.getElementById('close-details');
 const detailsContent = document.querySelector('.details-content');
 
-// University data should be available from the injected script
-let universities = window.universityData || [];
-let filteredUniversities = [...universities];
+// University data is loaded from the shared catalog asset (js/catalog.js)
+let universities = [];
+let filteredUniversities = [];
 
 // Initialize the university grid
 function initializeGrid() {
@@ -173,5 +173,14 @@ closeDetailsButton.addEventListener('click', () => {
     universityDetails.style.display = 'none';
 });
 
-// Initialize the grid on load
-document.addEventListener('DOMContentLoaded', initializeGrid); 
\ No newline at end of file
+// Initialize the grid once the catalog has loaded
+loadCatalog()
+    .then(data => {
+        universities = data;
+        filteredUniversities = [...universities];
+        initializeGrid();
+    })
+    .catch(error => {
+        console.error('Failed to load the university catalog:', error);
+        universityGrid.innerHTML = '<p class="no-results">មិនអាចផ្ទុកទិន្នន័យបានទេ</p>';
+    }); 
\ No newline at end of file
@@ -18,8 +18,8 @@ const yearlyTotal = document.getElementById('yearly-total');
 const totalCost = document.getElementById('total-cost');
 const shareResultsBtn = document.getElementById('share-results');
 
-// University data should be available from the injected script
-const universities = window.universityData || [];
+// University data is loaded from the shared catalog asset (js/catalog.js)
+let universities = [];
 
 // Used to store currently selected university data
 let selectedUniversity = null;
@@ -166,7 +166,10 @@ shareResultsBtn.addEventListener('click', () => {
 });
 
 // Initialize the calculator
-document.addEventListener('DOMContentLoaded', () => {
-    initializeUniversitySelect();
-    updateRangeDisplays();
-}); 
\ No newline at end of file
+updateRangeDisplays();
+loadCatalog()
+    .then(data => {
+        universities = data;
+        initializeUniversitySelect();
+    })
+    .catch(error => console.error('Failed to load the university catalog:', error)); 
\ No newline at end of file
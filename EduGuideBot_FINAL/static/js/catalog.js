@@ -0,0 +1,98 @@
+/**
+ * EduGuideBot - Shared catalog loader for the mini-apps
+ * The build writes each app's slice of the catalog as a content-hashed asset and sets window.CATALOG_URL;
+ * since the URL changes whenever the data does, the browser may serve it straight from cache.
+ */
+
+const COMPACT_CATALOG_FORMAT = 1;
+
+/**
+ * Expand one value of the compact catalog. Schema nodes: 'v' (plain value), 's' (index into the
+ * string table), {obj: [[key, node], ...]} (positional array -> object), {list: node} (array).
+ */
+function decodeValue(value, node, strings) {
+    if (value === null || value === undefined) {
+        return undefined;
+    }
+    if (node === 's') {
+        return strings[value];
+    }
+    if (node === 'v') {
+        return value;
+    }
+    if (node.list) {
+        return value.map(item => decodeValue(item, node.list, strings));
+    }
+    const object = {};
+    node.obj.forEach(([key, child], i) => {
+        const decoded = decodeValue(value[i], child, strings);
+        if (decoded !== undefined) {
+            object[key] = decoded;
+        }
+    });
+    return object;
+}
+
+function decodeCatalog(payload) {
+    // Plain arrays are full catalogs (older builds)
+    if (Array.isArray(payload)) {
+        return payload;
+    }
+    if (payload.format !== COMPACT_CATALOG_FORMAT) {
+        throw new Error(`Unsupported catalog format ${payload.format}`);
+    }
+    const universities = payload.rows.map(row => decodeValue(row, payload.schema, payload.strings));
+    // The data.json hash the bot stamps on compact results
+    universities.catalogVersion = payload.catalog_version;
+    return universities;
+}
+
+const catalogPromises = {};
+
+/**
+ * Load and decode a catalog asset. Defaults to the page's own asset (window.CATALOG_URL).
+ */
+function loadCatalog(url = window.CATALOG_URL) {
+    if (!url && Array.isArray(window.universityData)) {
+        // Pages built before the catalog was externalized
+        return Promise.resolve(window.universityData);
+    }
+    if (!url) {
+        return Promise.reject(new Error('CATALOG_URL is not set'));
+    }
+    if (!catalogPromises[url]) {
+        catalogPromises[url] = fetch(url, { cache: 'force-cache' }).then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.json();
+        }).then(decodeCatalog);
+    }
+    return catalogPromises[url];
+}
+
+/**
+ * Load a catalog asset by projection name (e.g. 'results') via assets/manifest.json.
+ * The manifest is revalidated on every load; the hashed asset it points to comes from cache when unchanged.
+ */
+function loadCatalogAsset(name, assetsBase = '../assets/') {
+    return fetch(`${assetsBase}manifest.json`, { cache: 'no-cache' })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(manifest => {
+            const fileName = manifest.assets && manifest.assets[name];
+            if (!fileName) {
+                throw new Error(`No '${name}' catalog in the manifest`);
+            }
+            return loadCatalog(`${assetsBase}${fileName}`);
+        });
+}
+
+// Start downloading as soon as the script runs, before the page's own code asks for it
+if (window.CATALOG_URL) {
+    loadCatalog().catch(() => {});
+}
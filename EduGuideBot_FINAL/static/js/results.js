@@ -30,6 +30,7 @@ function getResultIdFromUrl() {
  * Update Telegram bot link with actual username
  */
 function updateBotLink() {
+    const urlParams = new URLSearchParams(window.location.search);
     const botLink = document.querySelector('a[href^="https://t.me/"]');
     const botUsername = urlParams.get('bot') || 'your_bot_username';
     
@@ -38,6 +39,9 @@ function updateBotLink() {
     }
 }
 
+// Matches COMPACT_FORMAT in src/web/result_generator.py
+const COMPACT_RESULT_FORMAT = 2;
+
 /**
  * Load result data from server
  */
@@ -53,13 +57,32 @@ function loadResultData(resultId) {
         })
         .then(data => {
             displayUserProfile(data.user_profile);
-            displayRecommendations(data.recommendations);
+            return resolveRecommendations(data).then(displayRecommendations);
         })
         .catch(error => {
             showError(`Error loading recommendations: ${error.message}`);
         });
 }
 
+/**
+ * Compact results (format 2) carry only university IDs and scores; join them against the
+ * cached 'results' catalog asset. Older results embed full university objects and are used as is.
+ */
+function resolveRecommendations(data) {
+    if (data.format !== COMPACT_RESULT_FORMAT) {
+        return Promise.resolve(data.recommendations);
+    }
+    return loadCatalogAsset('results').then(universities => {
+        const byId = new Map(universities.map(university => [university.id, university]));
+        if (data.catalog_version && universities.catalogVersion && universities.catalogVersion !== data.catalog_version) {
+            console.info(`Result was scored against catalog ${data.catalog_version}, showing catalog ${universities.catalogVersion}`);
+        }
+        return data.recommendations
+            .filter(rec => byId.has(rec.university_id))
+            .map(rec => ({ university: byId.get(rec.university_id), total_score: rec.total_score, breakdown: rec.breakdown }));
+    });
+}
+
 /**
  * Display user profile information
  */
@@ -155,6 +178,7 @@ function displayRecommendations(recommendations) {
                     <p><span class="label">Tuition Range:</span> $${university.tuition_fees.range_min} - $${university.tuition_fees.range_max} / year</p>
                     <p><span class="label">Total Majors:</span> ${university.total_majors || 'N/A'}</p>
                 </div>
+                ${formatBreakdown(recommendation.breakdown)}
                 <div class="match-score">
                     <div class="match-bar">
                         <div class="match-bar-fill" style="width: ${percentage}%"></div>
@@ -171,6 +195,20 @@ function displayRecommendations(recommendations) {
     });
 }
 
+/**
+ * One line listing the non-zero score components, when the result has them
+ */
+function formatBreakdown(breakdown) {
+    if (!breakdown) {
+        return '';
+    }
+    const labels = { major: 'Major', career: 'Career', budget: 'Budget', english: 'English', specialist: 'Specialist' };
+    const parts = Object.entries(labels)
+        .filter(([key]) => breakdown[key])
+        .map(([key, label]) => `${label} +${breakdown[key]}`);
+    return parts.length ? `<p class="score-breakdown"><span class="label">Score:</span> ${parts.join(' • ')}</p>` : '';
+}
+
 /**
  * Show an error message
  */
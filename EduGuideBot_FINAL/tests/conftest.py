@@ -0,0 +1,43 @@
+import os
+import sys
+import threading
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "latency: timing checks on large generated catalogs "
+                                       "(skipped unless RUN_LATENCY_TESTS=1; too noisy for CI)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv('RUN_LATENCY_TESTS') == '1':
+        return
+    import pytest
+    skip = pytest.mark.skip(reason="set RUN_LATENCY_TESTS=1 to run latency checks")
+    for item in items:
+        if 'latency' in item.keywords:
+            item.add_marker(skip)
+
+
+class PausingLock:
+    """Lock that holds one thread up right after its first release, to force a thread interleaving."""
+
+    def __init__(self, thread_name: str):
+        self._lock = threading.Lock()
+        self.thread_name = thread_name
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+        if threading.current_thread().name == self.thread_name and not self.paused.is_set():
+            self.paused.set()
+            self.resume.wait(timeout=5)
+        return False
@@ -0,0 +1,45 @@
+import json
+import os
+
+import build_web_apps
+
+from conftest import PROJECT_ROOT
+
+
+def write_catalog(project_root, universities):
+    os.makedirs(os.path.join(project_root, 'data'), exist_ok=True)
+    with open(os.path.join(project_root, 'data', 'data.json'), 'w', encoding='utf-8') as f:
+        json.dump(universities, f, ensure_ascii=False)
+
+
+def read_manifest(project_root):
+    with open(os.path.join(project_root, 'static', 'assets', 'manifest.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_rebuild_keeps_previous_generation(tmp_path):
+    with open(os.path.join(PROJECT_ROOT, 'data', 'data.json'), encoding='utf-8') as f:
+        universities = json.load(f)
+    project_root = str(tmp_path)
+    assets_dir = os.path.join(project_root, 'static', 'assets')
+
+    write_catalog(project_root, universities)
+    build_web_apps.main(project_root)
+    first = read_manifest(project_root)['assets']
+
+    universities[0]['name_en'] += ' (renamed)'
+    write_catalog(project_root, universities)
+    build_web_apps.main(project_root)
+    second = read_manifest(project_root)
+    assert second['assets'] != first
+    assert sorted(second['previous']) == sorted(name for projection, name in first.items()
+                                                if second['assets'][projection] != name)
+
+    # Same data again: nothing rotates, and the prior generation stays on disk
+    build_web_apps.main(project_root)
+    third = read_manifest(project_root)
+    assert third['assets'] == second['assets']
+    assert third['previous'] == second['previous']
+    for file_name in third['previous'] + list(third['assets'].values()):
+        assert os.path.exists(os.path.join(assets_dir, file_name))
+        assert os.path.exists(os.path.join(assets_dir, file_name + '.gz'))
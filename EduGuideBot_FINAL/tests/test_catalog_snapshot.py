@@ -0,0 +1,83 @@
+import gc
+import os
+import shutil
+import weakref
+
+import pytest
+
+from benchmark import make_profiles
+from conftest import PROJECT_ROOT
+from src.core.catalog_snapshot import compile_snapshot, load_snapshot, snapshot_path_for
+from src.core.catalog_watcher import CatalogWatcher
+from src.core.data_loader import UniversityDataManager
+from src.core.recommender import UniversityRecommender
+
+REAL_CATALOG = os.path.join(PROJECT_ROOT, 'data', 'data.json')
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    data_path = str(tmp_path / 'data.json')
+    shutil.copyfile(REAL_CATALOG, data_path)
+    return data_path
+
+
+def truncate(path: str, size: int) -> None:
+    with open(path, 'r+b') as f:
+        f.truncate(size)
+
+
+@pytest.mark.parametrize('size', [0, 20, 4096])
+def test_truncated_snapshot_is_recompiled(catalog, size):
+    snapshot_path = compile_snapshot(catalog)
+    expected = os.path.getsize(snapshot_path)
+    truncate(snapshot_path, size)
+
+    snapshot = load_snapshot(catalog)
+    assert snapshot is not None
+    assert os.path.getsize(snapshot_path) == expected
+    assert snapshot.universities[0]['id'] == UniversityDataManager(catalog, use_snapshot=False).universities[0]['id']
+    snapshot.close()
+
+
+def test_unreadable_snapshot_without_source(catalog):
+    snapshot_path = compile_snapshot(catalog)
+    truncate(snapshot_path, 20)
+    os.unlink(catalog)
+    assert load_snapshot(catalog) is None
+
+
+def test_close_unmaps(catalog):
+    snapshot = load_snapshot(catalog)
+    mapping = snapshot._mmap
+    first = snapshot.universities[0]
+    snapshot.close()
+    assert mapping.closed
+    # Decoded records survive; undecoded ones can no longer be read
+    assert snapshot.universities[0] is first
+    with pytest.raises(ValueError):
+        snapshot.universities[1]
+    snapshot.close()
+
+
+def test_replaced_catalog_stays_readable_until_released(catalog):
+    current = UniversityDataManager(catalog)
+    recommender = UniversityRecommender(current)
+    mapping = weakref.ref(current._snapshot._mmap)
+    watcher = CatalogWatcher(catalog, current=current)
+    os.utime(catalog, ns=(0, 0))
+    os.unlink(snapshot_path_for(catalog))
+
+    reload = watcher.rebuild()
+    watcher.commit(reload)
+    assert watcher.current is reload.data_manager
+    # A request that started before the swap still decodes records from the old mapping
+    # (the diff in rebuild() decoded them all, so drop that cache first)
+    current.universities._decoded.clear()
+    last = len(current.universities) - 1
+    assert current.universities[last] == reload.data_manager.universities[last]
+    assert recommender.recommend(make_profiles(current, 1)[0])
+
+    del current, recommender
+    gc.collect()
+    assert mapping() is None
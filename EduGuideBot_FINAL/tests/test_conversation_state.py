@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+from conftest import PausingLock
+from src.bot.conversation_state import ConversationRecord, SQLiteConversationBackend, create_conversation_store
+
+USER_ID = 42
+
+
+def stored_row(db_path: str, user_id: int = USER_ID):
+    backend = SQLiteConversationBackend(db_path, flush_interval=60)
+    try:
+        with backend._db_lock:
+            return backend._conn.execute("SELECT state, location FROM conversations WHERE user_id = ?",
+                                         (user_id,)).fetchone()
+    finally:
+        backend.close()
+
+
+def test_record_survives_restart(tmp_path):
+    spec = f"sqlite:{tmp_path / 'conversations.db'}"
+
+    async def answer_two_questions():
+        store = create_conversation_store(spec)
+        record = await store.start(USER_ID, 1)
+        record.location = 'Phnom Penh'
+        record.max_budget = 1500
+        record.state = 2
+        await store.save(USER_ID, record)
+        store.close()
+
+    async def resume():
+        store = create_conversation_store(spec)
+        try:
+            return await store.get(USER_ID)
+        finally:
+            store.close()
+
+    asyncio.run(answer_two_questions())
+    record = asyncio.run(resume())
+    assert (record.state, record.location, record.max_budget) == (2, 'Phnom Penh', 1500)
+
+
+def test_discard_survives_restart(tmp_path):
+    spec = f"sqlite:{tmp_path / 'conversations.db'}"
+
+    async def start_then_discard():
+        store = create_conversation_store(spec)
+        await store.start(USER_ID, 1)
+        await store.discard(USER_ID)
+        store.close()
+
+    asyncio.run(start_then_discard())
+    assert stored_row(str(tmp_path / 'conversations.db')) is None
+
+
+def test_overlapping_flushes_keep_the_latest_row(tmp_path):
+    db_path = str(tmp_path / 'conversations.db')
+    backend = SQLiteConversationBackend(db_path, flush_interval=60)
+    backend._pending_lock = lock = PausingLock('older-flush')
+    backend.save(USER_ID, ConversationRecord(1, 'Phnom Penh', updated_at=time.time()).row())
+
+    # The older flush stops right after taking its batch; a newer save and flush then run
+    older = threading.Thread(target=backend.flush, name='older-flush')
+    older.start()
+    assert lock.paused.wait(timeout=5)
+    backend.save(USER_ID, ConversationRecord(2, 'Siem Reap', updated_at=time.time()).row())
+    newer = threading.Thread(target=backend.flush)
+    newer.start()
+    time.sleep(0.1)
+    lock.resume.set()
+    older.join()
+    newer.join()
+    backend.close()
+
+    assert stored_row(db_path) == (2, 'Siem Reap')
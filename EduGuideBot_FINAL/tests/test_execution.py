@@ -0,0 +1,62 @@
+import asyncio
+import datetime
+import random
+
+from telegram import Chat, Message, Update, User
+
+from src.bot.execution import InstrumentedExecutor, PerUserUpdateProcessor, generate_results
+
+
+def make_update(update_id: int, user_id: int) -> Update:
+    return Update(update_id, message=Message(update_id, datetime.datetime.now(), Chat(user_id, 'private'),
+                                             from_user=User(user_id, 'student', False)))
+
+
+def test_updates_from_one_user_run_in_order():
+    rng = random.Random(3)
+    handled = []
+    running = {'now': 0, 'peak': 0}
+
+    async def handle(update_id: int, user_id: int, fail: bool):
+        running['now'] += 1
+        running['peak'] = max(running['peak'], running['now'])
+        await asyncio.sleep(rng.random() / 100)
+        handled.append((user_id, update_id))
+        running['now'] -= 1
+        if fail:
+            raise RuntimeError("handler failed")
+
+    async def main():
+        processor = PerUserUpdateProcessor(8)
+        arrivals = [(update_id, update_id % 4) for update_id in range(40)]
+        await asyncio.gather(*(
+            processor.process_update(make_update(update_id, user_id), handle(update_id, user_id, update_id % 7 == 0))
+            for update_id, user_id in arrivals
+        ))
+        return arrivals, processor.stats()
+
+    arrivals, stats = asyncio.run(main())
+    for user_id in range(4):
+        assert [u for uid, u in handled if uid == user_id] == [u for u, uid in arrivals if uid == user_id]
+    # Users run alongside each other, and a failing update does not stall the ones queued behind it
+    assert running['peak'] > 1
+    assert stats['updates_processed'] == 40
+    assert stats['updates_queued'] == 0 and stats['users_active'] == 0
+
+
+class FailingGenerator:
+    def generate_results(self, user_profile, user_id):
+        raise ValueError("catalog is broken")
+
+
+def test_generate_results_returns_none_on_failure():
+    executor = InstrumentedExecutor('thread', 1)
+    try:
+        bot_data = {'executor': executor, 'result_generator': FailingGenerator()}
+        assert asyncio.run(generate_results(bot_data, {'location': 'Any'}, 7)) is None
+        executor.shutdown()
+        # A pool that is already shut down fails the same way
+        assert asyncio.run(generate_results(bot_data, {'location': 'Any'}, 7)) is None
+    finally:
+        executor.shutdown()
+    assert executor.stats()['executor_failed'] == 1
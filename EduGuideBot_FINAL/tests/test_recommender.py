@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+import pytest
+
+from benchmark import make_profiles
+from conftest import PROJECT_ROOT
+from generate_synthetic_catalog import CatalogGenerator, CatalogTemplate, write_catalog
+from src.core.data_loader import UniversityDataManager
+from src.core.recommender import UniversityRecommender
+
+REAL_CATALOG = os.path.join(PROJECT_ROOT, 'data', 'data.json')
+TOP_N = 5
+
+
+def synthetic_catalog(path: str, universities: int, seed: int = 7, **options) -> str:
+    with open(REAL_CATALOG, encoding='utf-8') as f:
+        template = CatalogTemplate(json.load(f))
+    write_catalog(CatalogGenerator(template, seed=seed, **options), universities, path)
+    return path
+
+
+def ranking(recommendations: list) -> list:
+    return [(rec['university']['id'], rec['total_score']) for rec in recommendations]
+
+
+@pytest.fixture(scope='module')
+def real_recommender():
+    return UniversityRecommender(UniversityDataManager(REAL_CATALOG))
+
+
+@pytest.fixture(scope='module')
+def synthetic_recommender(tmp_path_factory):
+    path = synthetic_catalog(str(tmp_path_factory.mktemp('catalog') / 'catalog.json'), 2000,
+                             size_skew=0.8, locations=8)
+    return UniversityRecommender(UniversityDataManager(path))
+
+
+@pytest.mark.parametrize('catalog', ['real_recommender', 'synthetic_recommender'])
+def test_recommend_matches_reference(catalog, request):
+    recommender = request.getfixturevalue(catalog)
+    for profile in make_profiles(recommender.data_manager, 500):
+        assert ranking(recommender.recommend(profile, top_n=TOP_N)) == \
+            ranking(recommender.recommend_reference(profile, top_n=TOP_N)), profile
+
+
+@pytest.mark.parametrize('catalog', ['real_recommender', 'synthetic_recommender'])
+def test_recommend_many_matches_reference(catalog, request):
+    recommender = request.getfixturevalue(catalog)
+    profiles = make_profiles(recommender.data_manager, 500, seed=43)
+    for profile, recommendations in zip(profiles, recommender.recommend_many(profiles, top_n=TOP_N)):
+        assert ranking(recommendations) == ranking(recommender.recommend_reference(profile, top_n=TOP_N)), profile
+
+
+@pytest.mark.parametrize('top_n', [1, 3, 40, 5000])
+def test_pruned_engine_matches_reference(synthetic_recommender, top_n):
+    # Large enough that every request goes to the engine, whose cutoff must not change the ranking
+    for profile in make_profiles(synthetic_recommender.data_manager, 100, seed=44):
+        assert ranking(synthetic_recommender.recommend(profile, top_n=top_n)) == \
+            ranking(synthetic_recommender.recommend_reference(profile, top_n=top_n)), profile
+
+
+def test_topk_stats_count_pruned_candidates(synthetic_recommender):
+    before = synthetic_recommender.get_topk_stats()
+    for profile in make_profiles(synthetic_recommender.data_manager, 100, seed=45):
+        synthetic_recommender.recommend(profile, top_n=TOP_N)
+    after = synthetic_recommender.get_topk_stats()
+    delta = {name: after[name] - before[name] for name in ('heap_requests', 'engine_requests', 'candidates', 'scored', 'pruned')}
+    assert delta['heap_requests'] + delta['engine_requests'] == 100
+    assert delta['candidates'] == delta['scored'] + delta['pruned']
+    assert delta['pruned'] > 0
+
+
+def test_recommend_with_no_slots(real_recommender):
+    profile = {'location': 'Siem Reap', 'max_budget': 1000, 'core_field': 'ច្បាប់',
+               'career_goal': 'វិស្វករ', 'english_proficiency': 3}
+    assert real_recommender.recommend(profile, top_n=0) == []
+
+
+@pytest.mark.latency
+def test_recommend_latency_50k_programs(tmp_path):
+    # About 4,600 universities x 11 majors on average
+    path = synthetic_catalog(str(tmp_path / 'catalog.json'), 4600)
+    recommender = UniversityRecommender(UniversityDataManager(path))
+    profiles = make_profiles(recommender.data_manager, 300)
+    timings = []
+    for profile in profiles:
+        started = time.perf_counter()
+        recommender.recommend(profile, top_n=TOP_N)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+    print(f"recommend over ~50k programs: p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+    # The reference scorer takes about 10 ms per profile here; the engine should stay well below that
+    assert p50 < 0.010
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import PROJECT_ROOT
+from src.bot.bot import reload_catalog_job
+from src.core.catalog_watcher import CatalogWatcher
+from src.core.lru_cache import TTLCache
+from src.web.result_generator import ResultGenerator
+
+PROFILE = {'location': 'Phnom Penh', 'max_budget': 1500, 'core_field': 'វិស្វកម្ម',
+           'career_goal': 'វិស្វករ', 'english_proficiency': 8}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    data_path = str(tmp_path / 'data.json')
+    shutil.copyfile(os.path.join(PROJECT_ROOT, 'data', 'data.json'), data_path)
+    return data_path
+
+
+@pytest.fixture
+def generator(catalog, tmp_path):
+    generator = ResultGenerator(catalog, results_dir=str(tmp_path / 'results'))
+    yield generator
+    generator.close()
+
+
+def count_recommend_calls(generator, monkeypatch) -> list:
+    calls = []
+    recommend = generator.recommender.recommend
+    monkeypatch.setattr(generator.recommender, 'recommend', lambda *args, **kwargs: calls.append(1) or recommend(*args, **kwargs))
+    return calls
+
+
+def edit_catalog(data_path: str) -> None:
+    with open(data_path, encoding='utf-8') as f:
+        universities = json.load(f)
+    for uni in universities:
+        uni['tuition_fees']['range_max'] += 1
+    with open(data_path, 'w', encoding='utf-8') as f:
+        json.dump(universities, f, ensure_ascii=False)
+    os.utime(data_path, ns=(0, 0))
+
+
+def test_equivalent_profiles_share_one_computation(generator, monkeypatch):
+    calls = count_recommend_calls(generator, monkeypatch)
+    first = generator.generate_results(PROFILE)
+    # A budget in the same tuition bracket ranks the same, so it is answered from the cache
+    budget = PROFILE['max_budget'] + 1
+    while generator.data_manager.budget_bracket(budget) != generator.data_manager.budget_bracket(PROFILE['max_budget']):
+        budget -= 2
+    second = generator.generate_results(dict(PROFILE, max_budget=budget))
+    assert first != second
+    assert len(calls) == 1
+    assert generator.cache_stats()['hits'] == 1
+
+
+def test_catalog_change_invalidates_cache(generator, catalog):
+    generator.generate_results(PROFILE)
+    edit_catalog(catalog)
+    generator.reload_catalog()
+    generator.generate_results(PROFILE)
+    stats = generator.cache_stats()
+    assert (stats['hits'], stats['misses']) == (0, 2)
+
+
+def test_resubmission_rewrites_a_swept_result(generator):
+    result_id = generator.generate_results(PROFILE, user_id=7)
+    path = generator.store._path(result_id)
+    os.unlink(path)
+    assert generator.generate_results(PROFILE, user_id=7) == result_id
+    assert os.path.exists(path)
+
+
+def test_reload_job_hands_the_new_catalog_to_the_generator(generator, catalog):
+    generator.generate_results(PROFILE)
+    old_version = generator.data_manager.version
+    bot_data = {'result_generator': generator,
+                'catalog_watcher': CatalogWatcher(catalog, current=generator.data_manager)}
+    edit_catalog(catalog)
+    asyncio.run(reload_catalog_job(SimpleNamespace(bot_data=bot_data)))
+
+    assert generator.data_manager is bot_data['catalog_watcher'].current
+    assert generator.data_manager.version != old_version
+    generator.generate_results(PROFILE)
+    assert generator.cache_stats()['misses'] == 2
+
+
+def test_ttl_cache_evicts_least_recently_used_and_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('src.core.lru_cache.time.monotonic', lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert (cache.get('b'), cache.get('a'), cache.get('c')) == (None, 1, 3)
+    now[0] += 11
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['evictions'], stats['expirations']) == (1, 1)
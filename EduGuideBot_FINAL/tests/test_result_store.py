@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+from conftest import PausingLock
+from src.web.result_store import FileResultStore, SQLiteResultStore, create_result_store
+
+RESULT_ID = 'abc123'
+
+
+def committed_payload(db_path: str, result_id: str = RESULT_ID):
+    store = SQLiteResultStore(db_path, flush_interval=60)
+    try:
+        with store._db_lock:
+            row = store._conn.execute("SELECT payload FROM results WHERE result_id = ?", (result_id,)).fetchone()
+        return row[0] if row else None
+    finally:
+        store.close()
+
+
+def test_sqlite_round_trip(tmp_path):
+    db_path = str(tmp_path / 'results.db')
+    store = create_result_store(f"sqlite:{db_path}")
+    store.put(RESULT_ID, '{"a": 1}')
+    # Queued rows are readable before the writer commits them
+    assert store.get(RESULT_ID) == '{"a": 1}'
+    store.put_many([('x', '{"x": 1}'), ('y', '{"y": 2}')])
+    store.close()
+
+    reopened = create_result_store(f"sqlite:{db_path}")
+    try:
+        assert [reopened.get(result_id) for result_id in (RESULT_ID, 'x', 'y', 'missing')] == \
+            ['{"a": 1}', '{"x": 1}', '{"y": 2}', None]
+    finally:
+        reopened.close()
+
+
+def test_overlapping_flushes_keep_the_latest_payload(tmp_path):
+    db_path = str(tmp_path / 'results.db')
+    store = SQLiteResultStore(db_path, flush_interval=60)
+    store._pending_lock = lock = PausingLock('older-flush')
+    store.put(RESULT_ID, 'old')
+
+    # The writer's flush stops right after taking its batch; put_many then replaces the row
+    older = threading.Thread(target=store.flush, name='older-flush')
+    older.start()
+    assert lock.paused.wait(timeout=5)
+    newer = threading.Thread(target=store.put_many, args=([(RESULT_ID, 'new')],))
+    newer.start()
+    time.sleep(0.1)
+    lock.resume.set()
+    older.join()
+    newer.join()
+    store.close()
+
+    assert committed_payload(db_path) == 'new'
+
+
+def test_sqlite_sweep_applies_ttl_and_cap(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / 'results.db'), ttl=60, max_results=2, flush_interval=60)
+    try:
+        store.put_many([('expired', '{}')])
+        with store._db_lock, store._conn:
+            store._conn.execute("UPDATE results SET created_at = created_at - 3600 WHERE result_id = 'expired'")
+        for result_id in ('first', 'second', 'third'):
+            store.put_many([(result_id, '{}')])
+        assert store.sweep() == 2
+        assert [store.get(result_id) for result_id in ('expired', 'first', 'second', 'third')] == \
+            [None, None, '{}', '{}']
+    finally:
+        store.close()
+
+
+def test_file_sweep_applies_ttl_and_cap(tmp_path):
+    store = FileResultStore(str(tmp_path), ttl=60, max_results=2)
+    now = time.time()
+    for age, result_id in enumerate(['newest', 'newer', 'older', 'expired']):
+        store.put(result_id, '{}')
+        mtime = now - (3600 if result_id == 'expired' else age)
+        os.utime(store._path(result_id), (mtime, mtime))
+    assert store.sweep() == 2
+    assert sorted(os.listdir(tmp_path)) == ['result_newer.json', 'result_newest.json']
+
+
+def test_spec_stores_use_configured_limits(tmp_path, monkeypatch):
+    monkeypatch.setattr('src.web.result_store.RESULT_TTL', 0)
+    monkeypatch.setattr('src.web.result_store.RESULT_MAX_COUNT', 10)
+    store = create_result_store(f"file:{tmp_path}")
+    assert (store.ttl, store.max_results) == (None, 10)
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from src.bot.serving import ChatRateLimiter
+
+
+def send_times(limiter: ChatRateLimiter, chat_ids: list) -> list:
+    async def send(chat_id):
+        async def callback():
+            return time.monotonic()
+
+        data = {} if chat_id is None else {'chat_id': chat_id}
+        return await limiter.process_request(callback, (), {}, 'sendMessage', data, None)
+
+    async def main():
+        start = time.monotonic()
+        times = []
+        for chat_id in chat_ids:
+            times.append(await send(chat_id) - start)
+        return times
+
+    return asyncio.run(main())
+
+
+def test_chat_burst_then_rate():
+    limiter = ChatRateLimiter(chat_max_rate=10, chat_burst=2, overall_max_rate=0, group_max_rate=0)
+    times = send_times(limiter, [7, 7, 7])
+    assert times[1] < 0.05
+    # The third message into the same chat waits for the bucket to leak one slot (0.1 s at 10/s)
+    assert times[2] >= 0.08
+
+
+def test_other_chats_are_not_held_back():
+    limiter = ChatRateLimiter(chat_max_rate=10, chat_burst=2, overall_max_rate=0, group_max_rate=0)
+    times = send_times(limiter, [7, 7, 8, 8, None, None, None, -100])
+    assert times[-1] < 0.05
+
+
+def test_zero_rate_disables_chat_limit():
+    limiter = ChatRateLimiter(chat_max_rate=0, chat_burst=1, overall_max_rate=0, group_max_rate=0)
+    assert send_times(limiter, [7] * 5)[-1] < 0.05